@@ -0,0 +1,159 @@
+import argparse
+import contextlib
+import json
+import platform
+import random
+import sys
+import time
+from typing import Any, Callable, ContextManager, Dict, Iterable, List, Optional, Tuple
+
+import quantumpseudocode as qp
+from benchmarks.workloads import WORKLOADS
+
+DEFAULT_SIZES = (8, 32, 128, 512, 2048)
+
+
+def _sim() -> List[ContextManager]:
+    return [qp.Sim()]
+
+
+def _count_nots() -> List[ContextManager]:
+    return [qp.RandomSim(measure_bias=1), qp.CountNots()]
+
+
+def _capture() -> List[ContextManager]:
+    return [qp.RandomSim(measure_bias=1), qp.CaptureLens([])]
+
+
+SINKS: Dict[str, Callable[[], List[ContextManager]]] = {
+    'sim': _sim,
+    'count_nots': _count_nots,
+    'capture': _capture,
+}
+
+
+def _run_once(program: Callable[[int], None], bits: int, sinks: List[ContextManager], seed: int) -> float:
+    random.seed(seed)
+    t0 = time.perf_counter()
+    with contextlib.ExitStack() as stack:
+        for s in sinks:
+            stack.enter_context(s)
+        program(bits)
+    return time.perf_counter() - t0
+
+
+def _count_toffolis(program: Callable[[int], None], bits: int, sinks: List[ContextManager], seed: int) -> int:
+    random.seed(seed)
+    with contextlib.ExitStack() as stack:
+        for s in sinks:
+            stack.enter_context(s)
+        cost = stack.enter_context(qp.CountCosts())
+        program(bits)
+    return cost.toffolis
+
+
+def run_benchmarks(workloads: Optional[Iterable[str]] = None,
+                   sizes: Iterable[int] = DEFAULT_SIZES,
+                   sinks: Optional[Iterable[str]] = None,
+                   *,
+                   repeat: int = 3,
+                   seed: int = 0,
+                   log: Optional[Callable[[str], Any]] = None) -> List[Dict[str, Any]]:
+    """Times each workload at each register size under each sink configuration.
+
+    Sizes above a workload's `max_bits` are skipped. Each measurement is the best of `repeat` runs, all using the
+    same random inputs. Toffolis are counted in one more run under the same sink configuration, so that they match
+    the circuit that was timed.
+
+    Returns:
+        One dict per measurement with the keys 'workload', 'bits', 'sink', 'seconds', 'toffolis' and
+        'toffolis_per_sec'.
+    """
+    workloads = list(WORKLOADS) if workloads is None else list(workloads)
+    sinks = list(SINKS) if sinks is None else list(sinks)
+    results = []
+    for name in workloads:
+        workload = WORKLOADS[name]
+        for bits in sizes:
+            if bits > workload.max_bits:
+                continue
+            for sink_name in sinks:
+                toffolis = _count_toffolis(workload.program, bits, SINKS[sink_name](), seed)
+                seconds = min(_run_once(workload.program, bits, SINKS[sink_name](), seed)
+                              for _ in range(repeat))
+                result = {
+                    'workload': name,
+                    'bits': bits,
+                    'sink': sink_name,
+                    'seconds': seconds,
+                    'toffolis': toffolis,
+                    'toffolis_per_sec': toffolis / seconds if seconds else float('inf'),
+                }
+                if log is not None:
+                    log('{workload:>32} {bits:>5} bits {sink:>10}: {seconds:.4f}s ({toffolis_per_sec:,.0f} toffolis/s)'.format(
+                        **result))
+                results.append(result)
+    return results
+
+
+def _key(result: Dict[str, Any]) -> Tuple[str, int, str]:
+    return result['workload'], result['bits'], result['sink']
+
+
+def compare_to_baseline(results: List[Dict[str, Any]],
+                        baseline: List[Dict[str, Any]],
+                        threshold: float = 0.2) -> List[Dict[str, Any]]:
+    """Returns the results that are more than `threshold` (as a fraction) slower than the matching baseline entry.
+
+    Each returned entry is the result with 'baseline_seconds' and 'slowdown' keys added. Results without a matching
+    baseline entry are ignored.
+    """
+    old = {_key(e): e for e in baseline}
+    regressions = []
+    for result in results:
+        match = old.get(_key(result))
+        if match is None or not match['seconds']:
+            continue
+        slowdown = result['seconds'] / match['seconds'] - 1
+        if slowdown > threshold:
+            regressions.append({**result, 'baseline_seconds': match['seconds'], 'slowdown': slowdown})
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmarks simulation and resource estimation throughput.')
+    parser.add_argument('--workloads', nargs='*', choices=sorted(WORKLOADS), default=None)
+    parser.add_argument('--sizes', nargs='*', type=int, default=list(DEFAULT_SIZES),
+                        help='Register sizes in bits. Sizes above a workload\'s cap are skipped (128 bits for the '
+                             'exponentiation and Montgomery workloads, 512 for the windowed modular product).')
+    parser.add_argument('--sinks', nargs='*', choices=sorted(SINKS), default=None)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--out', help='Json file to write the results into.')
+    parser.add_argument('--baseline', help='Json file of earlier results to compare against.')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Fractional slowdown relative to the baseline that counts as a regression.')
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.workloads, args.sizes, args.sinks, repeat=args.repeat, log=print)
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump({
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'results': results,
+            }, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+        regressions = compare_to_baseline(results, baseline, args.threshold)
+        for r in regressions:
+            print('REGRESSION {workload} {bits} bits {sink}: {seconds:.4f}s vs {baseline_seconds:.4f}s '
+                  '(+{slowdown:.0%})'.format(**r))
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,41 @@
+from .runner import compare_to_baseline, main, run_benchmarks
+from .workloads import WORKLOADS
+
+
+def test_run_benchmarks():
+    results = run_benchmarks(sizes=[8], repeat=1)
+    assert {(r['workload'], r['sink']) for r in results} == {
+        (w, s) for w in WORKLOADS for s in ['sim', 'count_nots', 'capture']}
+    for r in results:
+        assert r['bits'] == 8
+        assert r['seconds'] > 0
+        assert r['toffolis'] > 0
+        assert r['toffolis_per_sec'] > 0
+
+
+def test_skips_sizes_above_max_bits():
+    results = run_benchmarks(['times_equal_exp_mod'], sizes=[8, 4096], sinks=['count_nots'], repeat=1)
+    assert [r['bits'] for r in results] == [8]
+
+
+def test_compare_to_baseline():
+    baseline = [
+        {'workload': 'addition', 'bits': 8, 'sink': 'sim', 'seconds': 1.0},
+        {'workload': 'addition', 'bits': 32, 'sink': 'sim', 'seconds': 1.0},
+    ]
+    results = [
+        {'workload': 'addition', 'bits': 8, 'sink': 'sim', 'seconds': 1.1},
+        {'workload': 'addition', 'bits': 32, 'sink': 'sim', 'seconds': 1.5},
+        {'workload': 'lookup', 'bits': 8, 'sink': 'sim', 'seconds': 9.0},
+    ]
+    regressions = compare_to_baseline(results, baseline, threshold=0.2)
+    assert [(r['bits'], r['baseline_seconds']) for r in regressions] == [(32, 1.0)]
+    assert abs(regressions[0]['slowdown'] - 0.5) < 1e-9
+    assert compare_to_baseline(results, baseline, threshold=0.05)[0]['bits'] == 8
+
+
+def test_main(tmp_path):
+    out = tmp_path / 'results.json'
+    args = ['--workloads', 'addition', '--sizes', '8', '--sinks', 'count_nots', '--repeat', '1']
+    assert main(args + ['--out', str(out)]) == 0
+    assert main(args + ['--baseline', str(out), '--threshold', '1000']) == 0
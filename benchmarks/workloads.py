@@ -0,0 +1,105 @@
+import dataclasses
+import math
+import random
+from typing import Callable, Dict
+
+import quantumpseudocode as qp
+from examples.plus_equal_product_mod import plus_equal_product_mod_windowed
+from examples.times_equal_exp_mod import times_equal_exp_mod
+from quantumpseudocode.shor.measure_pow_mod import measure_pow_mod
+
+
+@dataclasses.dataclass(frozen=True)
+class Workload:
+    """A program to benchmark, parameterized by its register size in bits."""
+    name: str
+    program: Callable[[int], None]
+    max_bits: int
+
+
+def _modulus(bits: int) -> int:
+    return (1 << (bits - 1)) | 1 | (random.getrandbits(bits - 1) if bits > 1 else 0)
+
+
+def _base(modulus: int) -> int:
+    k = 3
+    while math.gcd(k, modulus) != 1:
+        k += 2
+    return k
+
+
+def addition(bits: int):
+    a = qp.qalloc(len=bits, name='a')
+    b = qp.qalloc(len=bits, name='b')
+    a.init(random.getrandbits(bits))
+    b.init(random.getrandbits(bits))
+    b += a
+    qp.qfree(a, dirty=True)
+    qp.qfree(b, dirty=True)
+
+
+def lookup(bits: int):
+    address_len = min(qp.ceil_lg2(bits) + 2, 10)
+    table = qp.LookupTable([random.getrandbits(bits) for _ in range(1 << address_len)])
+    address = qp.qalloc(len=address_len, name='address')
+    out = qp.qalloc(len=bits, name='out')
+    address.init(random.getrandbits(address_len))
+    qp.arithmetic.do_xor_lookup(lvalue=out, table=table, address=address)
+    qp.qfree(address, dirty=True)
+    qp.qfree(out, dirty=True)
+
+
+def plus_equal_product_mod(bits: int):
+    modulus = _modulus(bits)
+    target = qp.qalloc(modulus=modulus, name='target')
+    y = qp.qalloc(len=bits, name='y')
+    target.init(random.randrange(modulus))
+    y.init(random.getrandbits(bits))
+    plus_equal_product_mod_windowed(target, _base(modulus), y, max(1, qp.ceil_lg2(bits)))
+    qp.qfree(target, dirty=True)
+    qp.qfree(y, dirty=True)
+
+
+def plus_equal_product_montgomery(bits: int):
+    """The same multiply-add as `plus_equal_product_mod`, using the bit-serial Montgomery reduction instead."""
+    modulus = _modulus(bits)
+    r = qp.arithmetic_mod.montgomery_radix(modulus)
+    target = qp.qalloc(modulus=modulus, name='target')
+    y = qp.qalloc(len=bits, name='y')
+    target.init(random.randrange(modulus))
+    y.init(random.getrandbits(bits))
+    qp.arithmetic_mod.plus_product_montgomery(target, y, _base(modulus) * r % modulus)
+    qp.qfree(target, dirty=True)
+    qp.qfree(y, dirty=True)
+
+
+def exp_mod(bits: int):
+    modulus = _modulus(bits)
+    target = qp.qalloc(modulus=modulus, name='target')
+    e = qp.qalloc(len=8, name='e')
+    target.init(1)
+    e.init(random.getrandbits(8))
+    times_equal_exp_mod(target, _base(modulus), e, 2, max(1, qp.ceil_lg2(bits) // 2))
+    qp.qfree(target, dirty=True)
+    qp.qfree(e, dirty=True)
+
+
+def pow_mod(bits: int):
+    modulus = _modulus(bits)
+    exponent = qp.qalloc(len=8, name='exponent')
+    exponent.init(random.getrandbits(8))
+    measure_pow_mod(_base(modulus), exponent, modulus)
+    qp.qfree(exponent, dirty=True)
+
+
+WORKLOADS: Dict[str, Workload] = {
+    w.name: w
+    for w in [
+        Workload('addition', addition, max_bits=2048),
+        Workload('lookup', lookup, max_bits=2048),
+        Workload('plus_equal_product_mod_windowed', plus_equal_product_mod, max_bits=512),
+        Workload('plus_equal_product_montgomery', plus_equal_product_montgomery, max_bits=128),
+        Workload('times_equal_exp_mod', exp_mod, max_bits=128),
+        Workload('measure_pow_mod', pow_mod, max_bits=128),
+    ]
+}
@@ -1,3 +1,5 @@
+from typing import Dict, Optional
+
 from quantumpseudocode import *
 
 
@@ -63,3 +65,29 @@ def times_equal_exp_mod_window_2_3(target: QuintMod,
                                    k: int,
                                    e: Quint):
     return times_equal_exp_mod(target, k, e, 2, 3)
+
+
+def tune_times_equal_exp_mod_windows(modulus: int,
+                                     exponent_len: int,
+                                     objective: str = 'toffolis',
+                                     cache_path: Optional[str] = None) -> Dict[str, int]:
+    """Picks `e_window` and `m_window` arguments for `times_equal_exp_mod`.
+
+    The result is memoized in the json file at `cache_path`, if one is given.
+    """
+    max_window = ceil_lg2(modulus.bit_length()) + 1
+    k = 3 if modulus % 3 else 5
+
+    def program(e_window: int, m_window: int):
+        target = qalloc(modulus=modulus)
+        e = qalloc(len=exponent_len)
+        times_equal_exp_mod(target, k, e, e_window, m_window)
+        qfree(target, dirty=True)
+        qfree(e, dirty=True)
+
+    return tune_windows(
+        program,
+        {'e_window': range(1, max_window + 1), 'm_window': range(1, max_window + 1)},
+        objective,
+        cache_key='times_equal_exp_mod:{}:{}'.format(modulus, exponent_len),
+        cache_path=cache_path)
@@ -41,3 +41,9 @@ def test_correct_result(method, case):
         'k': k,
         'e': e
     })
+
+
+def test_tune_windows(tmp_path):
+    windows = tune_times_equal_exp_mod_windows(modulus=11, exponent_len=3, cache_path=str(tmp_path / 'windows.json'))
+    assert set(windows) == {'e_window', 'm_window'}
+    assert all(1 <= w <= 3 for w in windows.values())
@@ -1,3 +1,7 @@
+from quantumpseudocode.rng import (
+    Rng,
+)
+
 from quantumpseudocode.sink import (
     capture,
     CaptureLens,
@@ -12,7 +16,11 @@ from quantumpseudocode.buf import (
     IntBuf,
     RawConcatBuffer,
     RawIntBuffer,
+    RawRopeBuffer,
+    RawUncheckedIntBuffer,
+    RawUncheckedWindowBuffer,
     RawWindowBuffer,
+    UncheckedIntBuf,
 )
 
 from quantumpseudocode.rvalue import (
@@ -30,6 +38,7 @@ from quantumpseudocode.rvalue import (
 )
 
 from quantumpseudocode.lvalue import (
+    ConcatQureg,
     NamedQureg,
     RangeQureg,
     RawQureg,
@@ -38,6 +47,7 @@ from quantumpseudocode.lvalue import (
     PaddedQureg,
     Qubit,
     Quint,
+    QuintCoset,
     QuintMod,
     Qureg,
 )
@@ -66,6 +76,11 @@ from quantumpseudocode.control import (
 
 from quantumpseudocode.sim import (
     Sim,
+    SimCheckpoint,
+)
+
+from quantumpseudocode.sparse_sim import (
+    SparseSim,
 )
 
 from quantumpseudocode.log_cirq import (
@@ -73,6 +88,32 @@ from quantumpseudocode.log_cirq import (
     CountNots,
 )
 
+from quantumpseudocode.log_qasm import (
+    LogQasm3,
+)
+
+from quantumpseudocode.async_sink import (
+    AsyncSink,
+)
+
+from quantumpseudocode.trace import (
+    TraceReader,
+    TraceWriter,
+)
+
+from quantumpseudocode.cost import (
+    CircuitCost,
+    count_costs,
+    CountCosts,
+    sweep,
+    tune_windows,
+)
+
+from quantumpseudocode.profiler import (
+    ProfileNode,
+    Profiler,
+)
+
 from quantumpseudocode.ops import (
     semi_quantum,
     ClassicalSimState,
@@ -4,13 +4,16 @@ from .xor import (
 )
 
 from .add import (
+    default_addition_strategy,
     do_addition,
+    do_plus_const,
 )
 
 from .cmp import (
     IfLessThanRVal,
     QuintEqConstRVal,
     do_if_less_than,
+    do_if_less_than_const,
 )
 
 from .mul import (
@@ -28,7 +31,9 @@ from .measure import (
 
 from .lookup import (
     LookupRValue,
+    choose_swap_registers,
     do_xor_lookup,
+    do_xor_lookup_select_swap,
     del_xor_lookup,
 )
 
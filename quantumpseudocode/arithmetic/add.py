@@ -1,31 +1,86 @@
-from typing import List, Union
+import contextlib
+import contextvars
+from typing import Iterator, List, Optional, Tuple, Union
 
 import quantumpseudocode as qp
 from quantumpseudocode.ops import semi_quantum
+from quantumpseudocode import sink
+
+
+ADDITION_STRATEGIES = ('ripple', 'temp_and', 'lookahead', 'hybrid')
+# The strategies set by `default_addition_strategy`, innermost last. Each thread and asyncio task has its own.
+_default_strategies: 'contextvars.ContextVar[Tuple[str, ...]]' = contextvars.ContextVar(
+    'qp_default_addition_strategies', default=())
+
+
+@contextlib.contextmanager
+def default_addition_strategy(strategy: str) -> Iterator[None]:
+    """Sets the strategy used by additions (e.g. `a += b`) that don't specify one, within a `with` block."""
+    assert strategy in ADDITION_STRATEGIES, strategy
+    token = _default_strategies.set(_default_strategies.get() + (strategy,))
+    try:
+        yield
+    finally:
+        _default_strategies.reset(token)
+
+
+def _default_addition_strategy() -> str:
+    strategies = _default_strategies.get()
+    if strategies:
+        return strategies[-1]
+    if sink.global_sink.supports_measurement_based_uncomputation():
+        return 'temp_and'
+    return 'ripple'
 
 
 def do_addition_classical(*,
                           lvalue: qp.IntBuf,
                           offset: int,
                           carry_in: bool = False,
-                          forward: bool = True):
+                          forward: bool = True,
+                          strategy: Optional[str] = None):
     if forward:
         lvalue += offset + carry_in
     else:
         lvalue -= offset + carry_in
 
 
+def do_plus_const_classical(*,
+                            lvalue: qp.IntBuf,
+                            offset: int,
+                            forward: bool = True):
+    if forward:
+        lvalue += offset
+    else:
+        lvalue -= offset
+
+
 @semi_quantum(classical=do_addition_classical)
 def do_addition(*,
                 control: qp.Qubit.Control = True,
                 lvalue: qp.Quint,
                 offset: qp.Quint.Borrowed,
                 carry_in: qp.Qubit.Borrowed = False,
-                forward: bool = True):
+                forward: bool = True,
+                strategy: Optional[str] = None):
+    """Adds (or subtracts) an offset and a carry bit into a quint.
+
+    Args:
+        strategy: How carries are propagated. 'ripple' uses a linear depth ripple-carry adder with no ancillae.
+            'temp_and' computes carries into ancillae with temporary logical-ANDs and clears them with measurement
+            based uncomputation, costing n Toffolis instead of 2n. 'lookahead' computes all carries into an
+            ancilla register using a Brent-Kung prefix network, giving logarithmic depth. 'hybrid' ripples carries
+            within blocks of about lg(n) bits and uses the prefix network across blocks, trading some depth for
+            fewer ancillae. Defaults to the strategy set by `default_addition_strategy` or, if there is none,
+            to 'temp_and' when the primary sink supports measurement based uncomputation and 'ripple' otherwise.
+    """
     assert isinstance(control, qp.QubitIntersection) and len(control.qubits) <= 1
     assert isinstance(lvalue, qp.Quint)
     assert isinstance(offset, qp.Quint)
     assert isinstance(carry_in, qp.Qubit)
+    if strategy is None:
+        strategy = _default_addition_strategy()
+    assert strategy in ADDITION_STRATEGIES, strategy
 
     out_len = len(lvalue)
 
@@ -41,6 +96,27 @@ def do_addition(*,
     if not forward:
         lvalue ^= -1
 
+    if strategy == 'temp_and':
+        with offset[:out_len].hold_padded_to(out_len) as offset:
+            _temp_and_add(lvalue, offset, carry_in, control)
+        if not forward:
+            lvalue ^= -1
+        return
+
+    if strategy != 'ripple':
+        block = 1 if strategy == 'lookahead' else qp.ceil_lg2(out_len)
+        offset = offset[:out_len]
+        with offset.hold_padded_to(out_len) as offset:
+            if control == qp.QubitIntersection.ALWAYS:
+                _lookahead_add(lvalue, offset, carry_in, block)
+            else:
+                with qp.hold(offset & qp.controlled_by(control), name='_add_offset') as held_offset:
+                    with qp.hold(carry_in & control, name='_add_carry_in') as held_carry_in:
+                        _lookahead_add(lvalue, held_offset, held_carry_in, block)
+        if not forward:
+            lvalue ^= -1
+        return
+
     with offset.hold_padded_to(out_len - 1) as offset:
         in_len = min(out_len, len(offset))
 
@@ -65,15 +141,17 @@ def maj_sweep(lvalue: Union[qp.Quint, List[qp.Qubit], qp.Qureg],
     carry_then_offset = [carry] + list(offset)
     in_len = min(out_len, len(offset))
 
+    ops = []
     for i in range(in_len):
         a = carry_then_offset[i]
         b = lvalue[i]
         c = offset[i]
 
         # Maj.
-        a ^= c
-        b ^= c
-        c ^= a & b
+        ops.append((a.qureg, qp.QubitIntersection((c,))))
+        ops.append((b.qureg, qp.QubitIntersection((c,))))
+        ops.append((c.qureg, a & b))
+    sink.global_sink.do_toggle_batch(ops)
 
 
 def uma_sweep(lvalue: Union[qp.Quint, List[qp.Qubit], qp.Qureg],
@@ -84,13 +162,215 @@ def uma_sweep(lvalue: Union[qp.Quint, List[qp.Qubit], qp.Qureg],
     carry_then_offset = [carry] + list(offset)
     in_len = min(out_len, len(offset))
 
+    ops = []
     for i in range(in_len)[::-1]:
         a = carry_then_offset[i]
         b = lvalue[i]
         c = offset[i]
 
         # Uma.
-        c ^= a & b
-        b ^= a & controls
-        b ^= c
-        a ^= c
+        ops.append((c.qureg, a & b))
+        ops.append((b.qureg, a & controls))
+        ops.append((b.qureg, qp.QubitIntersection((c,))))
+        ops.append((a.qureg, qp.QubitIntersection((c,))))
+    sink.global_sink.do_toggle_batch(ops)
+
+
+@semi_quantum(alloc_prefix='_plus_const_', classical=do_plus_const_classical)
+def do_plus_const(*,
+                  control: qp.Qubit.Control = True,
+                  lvalue: qp.Quint,
+                  offset: int,
+                  forward: bool = True):
+    """Adds a classical constant into a quint without holding the constant in a register.
+
+    The (controlled) bits of the constant are folded directly into the carry computation, so the only workspace
+    is a register of carries. Each carry is computed into a clean qubit, the sum bits are written from the top
+    down, and each carry is uncomputed right after the sum bit above it has been written.
+    """
+    assert isinstance(control, qp.QubitIntersection) and len(control.qubits) <= 1
+    assert isinstance(lvalue, qp.Quint)
+    assert isinstance(offset, int)
+
+    if not forward:
+        offset = -offset
+    offset &= ~(-1 << len(lvalue))
+    if offset == 0 or not control.bit:
+        return
+    k = qp.leading_zero_bit_count(offset)
+    lvalue = lvalue[k:]
+    offset >>= k
+    n = len(lvalue)
+    ctl = control.qubits[0] if control.qubits else None
+
+    # When uncontrolled, the first carry (lvalue[0] & 1) is just lvalue[0].
+    num_ancilla = n - 1 if ctl is not None else max(n - 2, 0)
+    with qp.qalloc(len=num_ancilla, name='_plus_const_carry') as workspace:
+        carries = [None] + ([] if ctl is not None else [lvalue[0]]) + list(workspace)
+        carries = carries[:n]
+
+        ops = []
+        for i in range(1, n):
+            if ctl is not None or i > 1:
+                _xor_const_carry(ops, carries[i], lvalue[i - 1], carries[i - 1], offset >> (i - 1) & 1, ctl)
+        for i in range(n)[::-1]:
+            if i:
+                ops.append((lvalue[i].qureg, qp.QubitIntersection((carries[i],))))
+            if offset >> i & 1:
+                ops.append((lvalue[i].qureg, control))
+            if i and (ctl is not None or i > 1):
+                _xor_const_carry(ops, carries[i], lvalue[i - 1], carries[i - 1], offset >> (i - 1) & 1, ctl)
+        sink.global_sink.do_toggle_batch(ops)
+
+
+def _xor_const_carry(ops: List,
+                     target: qp.Qubit,
+                     bit: qp.Qubit,
+                     carry: Optional[qp.Qubit],
+                     offset_bit: int,
+                     ctl: Optional[qp.Qubit]):
+    """Appends toggles xoring the carry out of a position where the offset has a known (controlled) bit."""
+    if carry is None:
+        # Carry in is zero, so carry out is just `bit & offset_bit`.
+        assert offset_bit and ctl is not None
+        ops.append((target.qureg, bit & ctl))
+    elif not offset_bit:
+        ops.append((target.qureg, bit & carry))
+    elif ctl is None:
+        # Carry out is `bit | carry`.
+        flip = [(bit.qureg, qp.QubitIntersection.ALWAYS), (carry.qureg, qp.QubitIntersection.ALWAYS)]
+        ops.extend(flip)
+        ops.append((target.qureg, bit & carry))
+        ops.append((target.qureg, qp.QubitIntersection.ALWAYS))
+        ops.extend(flip)
+    else:
+        # Carry out is the majority of bit, ctl, and carry.
+        mix = [(bit.qureg, qp.QubitIntersection((carry,))), (ctl.qureg, qp.QubitIntersection((carry,)))]
+        ops.extend(mix)
+        ops.append((target.qureg, bit & ctl))
+        ops.append((target.qureg, qp.QubitIntersection((carry,))))
+        ops.extend(mix)
+
+
+def _temp_and_add(lvalue: qp.Quint, offset: qp.Quint, carry_in: qp.Qubit, control: qp.QubitIntersection):
+    """Adds an equal-length offset (and a carry bit) into lvalue, with carries stored in temporary ANDs.
+
+    Each carry is computed as `maj(a, b, c) = ((a ^ c) & (b ^ c)) ^ c` into a fresh ancilla, costing one
+    Toffoli. Going back down, each carry is cleared by an X basis measurement (with a CZ fixup instead of a
+    Toffoli), and the control only gates the xor that writes each sum bit.
+    """
+    n = len(lvalue)
+    a = list(lvalue)
+    b = list(offset)
+
+    with qp.qalloc(len=n - 1, name='_add_carries') as carries:
+        c = [carry_in] + list(carries)
+
+        ops = []
+        for i in range(n):
+            ops.append((a[i].qureg, qp.QubitIntersection((c[i],))))
+            ops.append((b[i].qureg, qp.QubitIntersection((c[i],))))
+            if i < n - 1:
+                ops.append((c[i + 1].qureg, a[i] & b[i]))
+                ops.append((c[i + 1].qureg, qp.QubitIntersection((c[i],))))
+        sink.global_sink.do_toggle_batch(ops)
+
+        for i in range(n)[::-1]:
+            if i < n - 1:
+                c[i + 1] ^= c[i]
+                c[i + 1].clear(a[i] & b[i])
+            sink.global_sink.do_toggle_batch([
+                (a[i].qureg, qp.QubitIntersection((c[i],))),
+                (a[i].qureg, b[i] & control),
+                (b[i].qureg, qp.QubitIntersection((c[i],))),
+            ])
+
+
+def _lookahead_add(lvalue: qp.Quint, offset: qp.Quint, carry_in: qp.Qubit, block: int):
+    """Adds an equal-length offset (and a carry bit) into lvalue, using a parallel prefix carry network.
+
+    The carries are computed into an ancilla register from the generate (a & b) and propagate (a ^ b) bits, and
+    xored into the propagate bits to form the sum. Afterwards the sum and the complemented offset and carry bit
+    are the inputs of an addition whose carries are exactly the complements of the carries being held, so
+    running the prefix network backwards on those inputs clears the ancilla register.
+    """
+    n = len(lvalue)
+    a = list(lvalue)
+    b = list(offset)
+    steps = _prefix_steps(n - 1, block)
+    not_all = lambda qubits: [(q.qureg, qp.QubitIntersection.ALWAYS) for q in qubits]
+    xor_all = lambda dst, src: [(d.qureg, qp.QubitIntersection((s,))) for d, s in zip(dst, src)]
+
+    with qp.qalloc(len=n - 1, name='_add_carries') as carries:
+        g = list(carries)
+
+        # Generate and propagate bits, with the carry in folded into the first generate bit.
+        sink.global_sink.do_toggle_batch([(g[i].qureg, a[i] & b[i]) for i in range(n - 1)])
+        sink.global_sink.do_toggle_batch(xor_all(a, b))
+        sink.global_sink.do_toggle_batch([(g[0].qureg, a[0] & carry_in)])
+
+        # Prefix network turns generate bits into carries, which are then used to turn propagate bits into sums.
+        _prefix_sweep(g, a[:n - 1], steps, reverse=False)
+        sink.global_sink.do_toggle_batch(xor_all(a, [carry_in] + g))
+
+        # Uncompute carries as the complemented carries of (sum, ~offset, ~carry_in).
+        sink.global_sink.do_toggle_batch(not_all(g) + xor_all(a, b) + not_all(a))
+        _prefix_sweep(g, a[:n - 1], steps, reverse=True)
+        sink.global_sink.do_toggle_batch(
+            not_all([carry_in]) + [(g[0].qureg, a[0] & carry_in)] + not_all([carry_in]))
+        sink.global_sink.do_toggle_batch(not_all(a) + xor_all(a, b) + not_all(b))
+        sink.global_sink.do_toggle_batch([(g[i].qureg, a[i] & b[i]) for i in range(n - 1)])
+        sink.global_sink.do_toggle_batch(not_all(b))
+
+
+def _prefix_steps(m: int, block: int) -> List[Tuple[int, int]]:
+    """Lists the (i, j) combine steps of a prefix network over m positions.
+
+    A step (i, j) merges the span ending at j into the span ending at i, whose start is just past j. Positions
+    are grouped into blocks which are scanned serially, a Brent-Kung network combines the block ends, and then
+    the remaining positions of each block pick up the prefix ending just before their block.
+    """
+    ends = []
+    steps = []
+    for start in range(0, m, block):
+        stop = min(start + block, m)
+        steps.extend((i, i - 1) for i in range(start + 1, stop))
+        ends.append(stop - 1)
+
+    d = 1
+    while d < len(ends):
+        steps.extend((ends[i], ends[i - d]) for i in range(2 * d - 1, len(ends), 2 * d))
+        d *= 2
+    while d > 1:
+        d //= 2
+        steps.extend((ends[i], ends[i - d]) for i in range(3 * d - 1, len(ends), 2 * d))
+
+    for k in range(1, len(ends)):
+        steps.extend((i, ends[k - 1]) for i in range(ends[k - 1] + 1, ends[k]))
+    return steps
+
+
+def _prefix_sweep(g: List[qp.Qubit], p: List[qp.Qubit], steps: List[Tuple[int, int]], reverse: bool):
+    """Applies (or unapplies) the prefix combine steps to generate bits, given propagate bits that don't change."""
+    # Propagate bits of combined spans, for steps whose span is combined again later.
+    last_use = {}
+    for k, (i, j) in enumerate(steps):
+        last_use[i] = k
+        last_use[j] = k
+    num_kept = sum(last_use[i] > k for k, (i, j) in enumerate(steps))
+
+    with qp.qalloc(len=num_kept, name='_add_propagates') as workspace:
+        spans = list(p)
+        span_ops = []
+        g_ops = []
+        anc = iter(workspace)
+        for k, (i, j) in enumerate(steps):
+            g_ops.append((g[i].qureg, spans[i] & g[j]))
+            if last_use[i] > k:
+                q = next(anc)
+                span_ops.append((q.qureg, spans[i] & spans[j]))
+                spans[i] = q
+
+        sink.global_sink.do_toggle_batch(span_ops)
+        sink.global_sink.do_toggle_batch(g_ops[::-1] if reverse else g_ops)
+        sink.global_sink.do_toggle_batch(span_ops[::-1])
@@ -1,4 +1,5 @@
 import random
+import threading
 
 import cirq
 
@@ -11,7 +12,7 @@ def test_plus_equal_gate_circuit():
         t = qp.qalloc(len=4, name='t')
         c = qp.qalloc(name='_c')
         with qp.LogCirqCircuit() as circuit:
-            qp.arithmetic.do_addition(lvalue=t, offset=a, carry_in=c)
+            qp.arithmetic.do_addition(lvalue=t, offset=a, carry_in=c, strategy='ripple')
 
     cirq.testing.assert_has_diagram(circuit, r"""
 _c: -----X-------@---------------------------------------------------------------@---@-------X---
@@ -43,6 +44,17 @@ def test_quantum_classical_consistent():
         },
         fuzz_count=100)
 
+    qp.testing.assert_semi_quantum_func_is_consistent(
+        qp.arithmetic.do_addition,
+        fuzz_space={
+            'lvalue': lambda: qp.IntBuf.random(range(0, 12)),
+            'offset': lambda: random.randint(0, 4095),
+            'carry_in': [False, True],
+            'forward': [False, True],
+            'strategy': ['temp_and', 'lookahead', 'hybrid'],
+        },
+        fuzz_count=200)
+
     qp.testing.assert_semi_quantum_func_is_consistent(
         qp.arithmetic.do_addition,
         fixed=[{
@@ -50,3 +62,74 @@ def test_quantum_classical_consistent():
             'offset': 2,
             'forward': True,
         }])
+
+
+def test_temp_and_halves_toffolis():
+    def add(n: int, strategy: str):
+        a = qp.qalloc(len=n, name='a')
+        b = qp.qalloc(len=n, name='b')
+        qp.arithmetic.do_addition(lvalue=a, offset=b, strategy=strategy)
+
+    assert qp.count_costs(add, 32, 'ripple').toffolis == 64
+    assert qp.count_costs(add, 32, 'temp_and').toffolis == 31
+
+    # Used by default when the primary sink supports measurement based uncomputation.
+    assert qp.count_costs(add, 32, None).toffolis == 31
+
+    # Observers record the same circuit.
+    with qp.RandomSim(measure_bias=1):
+        with qp.capture() as out:
+            add(32, None)
+    assert qp.ccz_count(out) == 31
+
+    class NoMbuSim(qp.RandomSim):
+        def supports_measurement_based_uncomputation(self):
+            return False
+
+    with NoMbuSim(measure_bias=1):
+        with qp.capture() as out:
+            add(32, None)
+    assert qp.ccz_count(out) == 64
+
+
+def test_lookahead_has_logarithmic_depth():
+    def add(n: int, strategy: str):
+        a = qp.qalloc(len=n, name='a')
+        b = qp.qalloc(len=n, name='b')
+        qp.arithmetic.do_addition(lvalue=a, offset=b, strategy=strategy)
+
+    ripple = qp.count_costs(add, 64, 'ripple')
+    lookahead = qp.count_costs(add, 64, 'lookahead')
+    hybrid = qp.count_costs(add, 64, 'hybrid')
+    assert lookahead.depth * 4 < ripple.depth
+    assert hybrid.depth * 2 < ripple.depth
+    assert hybrid.qubits < lookahead.qubits
+
+    with qp.arithmetic.default_addition_strategy('lookahead'):
+        assert qp.count_costs(add, 64, None) == lookahead
+
+
+def test_default_addition_strategy_is_per_thread():
+    seen = []
+
+    def other():
+        seen.append(qp.arithmetic.add._default_addition_strategy())
+
+    with qp.Sim():
+        with qp.arithmetic.default_addition_strategy('lookahead'):
+            assert qp.arithmetic.add._default_addition_strategy() == 'lookahead'
+            thread = threading.Thread(target=other)
+            thread.start()
+            thread.join()
+    assert seen and seen[0] != 'lookahead'
+
+
+def test_plus_const_quantum_classical_consistent():
+    qp.testing.assert_semi_quantum_func_is_consistent(
+        qp.arithmetic.do_plus_const,
+        fuzz_space={
+            'lvalue': lambda: qp.IntBuf.random(range(0, 8)),
+            'offset': lambda: random.randint(-511, 511),
+            'forward': [False, True],
+        },
+        fuzz_count=200)
@@ -1,4 +1,4 @@
-from typing import Any, Optional, Union, Callable
+from typing import Any, Optional, Tuple, Union, Callable
 
 import quantumpseudocode as qp
 from quantumpseudocode import semi_quantum
@@ -57,6 +57,70 @@ def do_if_less_than(*,
         _backward_sweep(lhs=pad_lhs, rhs=pad_rhs, carry=or_equal)
 
 
+@semi_quantum(alloc_prefix='_less_than_const_')
+def do_if_less_than_const(*,
+                          control: 'qp.Qubit.Control' = True,
+                          lhs: 'qp.Quint.Borrowed',
+                          rhs: int,
+                          invert: bool = False,
+                          effect: Callable[['qp.QubitIntersection'], None]):
+    """Performs an effect controlled by whether a quantum integer is less than a classical integer (or not).
+
+    `lhs >= rhs` is the carry out of `lhs + 2**n - rhs`. Each bit of that constant decides whether the next carry
+    is the AND or the OR of the current carry and the next bit of `lhs`, so the constant never needs a register.
+    Carries are computed into temporary ANDs and cleared with measurement based uncomputation.
+    """
+    n = len(lhs)
+    if rhs <= 0 or rhs >= 1 << n:
+        if (rhs > 0) != invert:
+            effect(control)
+        return
+
+    offset = (1 << n) - rhs
+    t = qp.leading_zero_bit_count(offset)
+
+    with qp.qalloc(len=n - t - 1, name='_less_than_const_carry') as workspace:
+        # The first carry past the constant's trailing zeros is just an lhs bit.
+        carries = [lhs[t]] + list(workspace)
+        for i in range(t + 1, n):
+            _init_const_carry(carries[i - t], lhs[i], carries[i - t - 1], offset >> i & 1)
+
+        top = carries[-1]
+        if not invert:
+            top ^= True
+        effect(control & top)
+        if not invert:
+            top ^= True
+
+        for i in range(t + 1, n)[::-1]:
+            _clear_const_carry(carries[i - t], lhs[i], carries[i - t - 1], offset >> i & 1)
+
+
+def _init_const_carry(target: 'qp.Qubit', bit: 'qp.Qubit', carry: 'qp.Qubit', offset_bit: int):
+    if offset_bit:
+        # OR via De Morgan.
+        bit ^= True
+        carry ^= True
+        target ^= bit & carry
+        target ^= True
+        bit ^= True
+        carry ^= True
+    else:
+        target ^= bit & carry
+
+
+def _clear_const_carry(target: 'qp.Qubit', bit: 'qp.Qubit', carry: 'qp.Qubit', offset_bit: int):
+    if offset_bit:
+        target ^= True
+        bit ^= True
+        carry ^= True
+        target.clear(bit & carry)
+        bit ^= True
+        carry ^= True
+    else:
+        target.clear(bit & carry)
+
+
 class QuintEqConstRVal(RValue[bool]):
     """An equality comparison between a quantum integer and a classical integer."""
 
@@ -129,12 +193,7 @@ class IfLessThanRVal(RValue[bool]):
         with qp.measurement_based_uncomputation(location) as b:
             c = controls & b
             if c.bit:
-                do_if_less_than(
-                    control=c,
-                    lhs=self.lhs,
-                    rhs=self.rhs,
-                    or_equal=self.or_equal,
-                    effect=qp.phase_flip)
+                self._do_if(c, qp.phase_flip)
 
     def __rixor__(self, other):
         other, controls = qp.ControlledLValue.split(other)
@@ -142,16 +201,43 @@ class IfLessThanRVal(RValue[bool]):
             return other
 
         if isinstance(other, qp.Qubit):
-            do_if_less_than(
-                control=controls,
-                lhs=self.lhs,
-                rhs=self.rhs,
-                or_equal=self.or_equal,
-                effect=other.__ixor__)
+            self._do_if(controls, other.__ixor__)
             return other
 
         return NotImplemented
 
+    def _do_if(self, control: 'qp.QubitIntersection', effect: Callable[['qp.QubitIntersection'], None]):
+        const_form = self._const_form()
+        if const_form is not None:
+            quint, bound, invert = const_form
+            do_if_less_than_const(
+                control=control,
+                lhs=quint,
+                rhs=bound,
+                invert=invert,
+                effect=effect)
+            return
+
+        do_if_less_than(
+            control=control,
+            lhs=self.lhs,
+            rhs=self.rhs,
+            or_equal=self.or_equal,
+            effect=effect)
+
+    def _const_form(self) -> Optional[Tuple['qp.Quint', int, bool]]:
+        """Rewrites comparisons between a quint and a classical int as `(quint < bound) != invert`, if possible."""
+        lhs = qp.rval(self.lhs).trivial_unwrap()
+        rhs = qp.rval(self.rhs).trivial_unwrap()
+        or_equal = qp.rval(self.or_equal).trivial_unwrap()
+        if not isinstance(or_equal, bool):
+            return None
+        if isinstance(lhs, qp.Quint) and isinstance(rhs, int):
+            return lhs, rhs + or_equal, False
+        if isinstance(lhs, int) and isinstance(rhs, qp.Quint):
+            return rhs, lhs + (not or_equal), True
+        return None
+
     def __str__(self):
         if isinstance(self.or_equal, qp.BoolRValue):
             return '{} {} {}'.format(
@@ -16,6 +16,40 @@ def test_cmp():
             assert qp.measure(t, reset=True) == 5
 
 
+def test_if_less_than_const():
+    for x in range(16):
+        for k in range(-2, 19):
+            for invert in [False, True]:
+                for c in [False, True]:
+                    with qp.Sim():
+                        with qp.hold(x, name='x') as t:
+                            with qp.hold(c, name='c') as control:
+                                with qp.qalloc(name='target') as target:
+                                    qp.arithmetic.do_if_less_than_const(
+                                        control=control,
+                                        lhs=t[:4],
+                                        rhs=k,
+                                        invert=invert,
+                                        effect=target.__ixor__)
+                                    expected = c and ((x < k) != invert)
+                                    assert qp.measure(target, reset=True) == expected
+
+
+def test_cmp_const_toffoli_count():
+    def compare(rhs):
+        with qp.RandomSim(measure_bias=1):
+            with qp.capture() as out:
+                a = qp.Quint(qp.NamedQureg('a', 10))
+                with qp.hold(a < rhs):
+                    pass
+        return qp.ccz_count(out)
+
+    # One temporary AND per bit above the lowest set bit of 2**10 - rhs, for both the init and the fixup.
+    assert compare(100) == 14
+    assert compare(512) == 0
+    assert compare(qp.Quint(qp.NamedQureg('b', 10))) == 40
+
+
 def test_eq():
     with qp.Sim():
         with qp.qalloc(len=4) as t:
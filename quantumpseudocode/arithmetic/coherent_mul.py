@@ -1,4 +1,12 @@
+from typing import Callable, List, Optional
+
 import quantumpseudocode as qp
+from quantumpseudocode.ops import semi_quantum
+
+# Factor sizes (in bits) below which Karatsuba uses more Toffolis than schoolbook multiplication, according to
+# `qp.count_costs` with the default addition strategy.
+KARATSUBA_MUL_CROSSOVER = 192
+KARATSUBA_SQUARE_CROSSOVER = 224
 
 
 def init_mul(*,
@@ -22,11 +30,189 @@ def init_square(*,
     for k in range(n):
         rval = factor[k+1:] & qp.controlled_by(factor[k])
         with qp.hold(rval, name='_sqr_offset') as partial_offset:
-            offset = qp.Quint(qp.RawQureg([
+            offset = qp.Quint(qp.ConcatQureg([
                 factor[k],
                 zero,
-                *partial_offset.qureg
+                partial_offset.qureg
             ]))
             clean_out[2*k:2*k+len(offset)+1] += offset
     qp.qfree(zero)
     return clean_out
+
+
+def init_mul_karatsuba_classical(*,
+                                 factor1: int,
+                                 factor2: int,
+                                 clean_out: qp.IntBuf,
+                                 cutoff: int = 16,
+                                 crossover: int = KARATSUBA_MUL_CROSSOVER):
+    clean_out ^= factor1 * factor2
+
+
+def init_square_karatsuba_classical(*,
+                                    factor: int,
+                                    clean_out: qp.IntBuf,
+                                    cutoff: int = 16,
+                                    crossover: int = KARATSUBA_SQUARE_CROSSOVER):
+    clean_out ^= factor * factor
+
+
+@semi_quantum(alloc_prefix='_mul_karatsuba_', classical=init_mul_karatsuba_classical)
+def init_mul_karatsuba(*,
+                       factor1: qp.Quint.Borrowed,
+                       factor2: qp.Quint.Borrowed,
+                       clean_out: qp.Quint,
+                       cutoff: int = 16,
+                       crossover: int = KARATSUBA_MUL_CROSSOVER):
+    """Initializes a zero'd quint to store the product of two quints, using Karatsuba multiplication.
+
+    Factors are split in half until one of them is at most `cutoff` bits long, at which point schoolbook
+    multiplication is used. Each level keeps its three sub-products alive until the full product has been copied
+    into `clean_out`, and then everything is uncomputed in reverse order. This costs O(n^lg(3)) Toffolis and
+    O(n^lg(3)) ancilla qubits.
+
+    When a factor is shorter than `crossover` bits, the product is computed by `init_mul` instead, because the
+    copy and uncompute steps make Karatsuba more expensive at those sizes.
+    """
+    assert cutoff >= 3, "Smaller cutoffs never terminate (the half sums are one bit longer than the halves)."
+    if min(len(factor1), len(factor2)) < crossover:
+        init_mul(factor1=factor1, factor2=factor2, clean_out=clean_out)
+        return
+    tape = []
+    product = _karatsuba_mul(factor1, factor2, cutoff, tape)
+    _copy_into(clean_out, product)
+    _undo(tape)
+
+
+@semi_quantum(alloc_prefix='_square_karatsuba_', classical=init_square_karatsuba_classical)
+def init_square_karatsuba(*,
+                          factor: qp.Quint.Borrowed,
+                          clean_out: qp.Quint,
+                          cutoff: int = 16,
+                          crossover: int = KARATSUBA_SQUARE_CROSSOVER):
+    """Initializes a zero'd quint to store the square of a quint, using Karatsuba multiplication.
+
+    Same strategy as `init_mul_karatsuba`, but with the base case and all three sub-products being squares.
+    """
+    assert cutoff >= 3, "Smaller cutoffs never terminate (the half sums are one bit longer than the halves)."
+    if len(factor) < crossover:
+        init_square(factor=factor, clean_out=clean_out)
+        return
+    tape = []
+    product = _karatsuba_mul(factor, None, cutoff, tape)
+    _copy_into(clean_out, product)
+    _undo(tape)
+
+
+def _karatsuba_mul(a: qp.Quint,
+                   b: Optional[qp.Quint],
+                   cutoff: int,
+                   tape: List[Callable[[], None]]) -> qp.Quint:
+    """Computes `a*b` (or `a*a` when b is None) into a fresh register, appending undo actions onto the tape."""
+    square = b is None
+    if square:
+        b = a
+    n = len(a) + len(b)
+    out = qp.qalloc(len=n, name='_karatsuba_out')
+
+    if min(len(a), len(b)) <= cutoff:
+        if square:
+            init_square(factor=a, clean_out=out)
+        else:
+            init_mul(factor1=a, factor2=b, clean_out=out)
+
+        def undo_base():
+            if square:
+                _del_square(factor=a, dirty_out=out)
+            else:
+                _del_mul(factor1=a, factor2=b, dirty_out=out)
+            qp.qfree(out)
+        tape.append(undo_base)
+        return out
+
+    # Split both factors at the same bit position.
+    h = min(len(a), len(b)) // 2
+    a0, a1 = a[:h], a[h:]
+    b0, b1 = b[:h], b[h:]
+
+    # Compute the sums of the halves.
+    sa = _alloc_sum(a0, a1, tape)
+    sb = sa if square else _alloc_sum(b0, b1, tape)
+
+    # Recursively compute the three sub-products.
+    z0 = _karatsuba_mul(a0, None if square else b0, cutoff, tape)
+    z2 = _karatsuba_mul(a1, None if square else b1, cutoff, tape)
+    z1 = _karatsuba_mul(sa, None if square else sb, cutoff, tape)
+
+    # Combine: a*b = z0 + (z1 - z0 - z2) * 2**h + z2 * 2**(2h).
+    _combine(out, h, z0, z1, z2, forward=True)
+    tape.append(lambda: (_combine(out, h, z0, z1, z2, forward=False), qp.qfree(out)))
+    return out
+
+
+def _alloc_sum(low: qp.Quint, high: qp.Quint, tape: List[Callable[[], None]]) -> qp.Quint:
+    total = qp.qalloc(len=max(len(low), len(high)) + 1, name='_karatsuba_sum')
+    total[:len(low)] ^= low
+    total += high
+
+    def undo():
+        qp.arithmetic.do_addition(lvalue=total, offset=high, forward=False)
+        total[:len(low)] ^= low
+        qp.qfree(total)
+    tape.append(undo)
+    return total
+
+
+def _combine(out: qp.Quint, h: int, z0: qp.Quint, z1: qp.Quint, z2: qp.Quint, forward: bool):
+    mid = out[h:]
+    if forward:
+        _copy_into(out, z0)
+        _copy_into(out[2 * h:], z2)
+        mid += z1
+        mid -= z0
+        mid -= z2
+    else:
+        mid += z2
+        mid += z0
+        mid -= z1
+        _copy_into(out[2 * h:], z2)
+        _copy_into(out, z0)
+
+
+def _copy_into(dst: qp.Quint, src: qp.Quint):
+    k = min(len(dst), len(src))
+    dst[:k] ^= src[:k]
+
+
+def _undo(tape: List[Callable[[], None]]):
+    for action in tape[::-1]:
+        action()
+
+
+def _del_mul(*,
+             factor1: qp.Quint,
+             factor2: qp.Quint,
+             dirty_out: qp.Quint):
+    """Inverse of `init_mul`."""
+    n = len(factor1)
+    m = len(factor2)
+    for k in range(n)[::-1]:
+        dirty_out[k:k+m+1] -= factor2 & qp.controlled_by(factor1[k])
+
+
+def _del_square(*,
+                factor: qp.Quint,
+                dirty_out: qp.Quint):
+    """Inverse of `init_square`."""
+    n = len(factor)
+    zero = qp.qalloc(name='_sqr_zero')
+    for k in range(n)[::-1]:
+        rval = factor[k+1:] & qp.controlled_by(factor[k])
+        with qp.hold(rval, name='_sqr_offset') as partial_offset:
+            offset = qp.Quint(qp.ConcatQureg([
+                factor[k],
+                zero,
+                partial_offset.qureg
+            ]))
+            dirty_out[2*k:2*k+len(offset)+1] -= offset
+    qp.qfree(zero)
@@ -3,7 +3,7 @@ import random
 import cirq
 
 import quantumpseudocode as qp
-from .coherent_mul import init_mul, init_square
+from .coherent_mul import init_mul, init_square, init_mul_karatsuba, init_square_karatsuba
 
 
 def assert_squares_correctly(n1: int, n2: int, v: int):
@@ -50,12 +50,65 @@ def test_init_mul():
         assert_multiplies_correctly(n1, n2, n3, v1, v2)
 
 
+def test_karatsuba_quantum_classical_consistent():
+    qp.testing.assert_semi_quantum_func_is_consistent(
+        init_mul_karatsuba,
+        fuzz_space={
+            'factor1': lambda: random.randint(0, 2**random.randint(0, 20) - 1),
+            'factor2': lambda: random.randint(0, 2**random.randint(0, 20) - 1),
+            'clean_out': lambda: qp.IntBuf.random(range(0, 45)),
+            'cutoff': [3, 4, 8],
+            'crossover': [0],
+        },
+        fuzz_count=30)
+    qp.testing.assert_semi_quantum_func_is_consistent(
+        init_square_karatsuba,
+        fuzz_space={
+            'factor': lambda: random.randint(0, 2**random.randint(0, 20) - 1),
+            'clean_out': lambda: qp.IntBuf.random(range(0, 45)),
+            'cutoff': [3, 4, 8],
+            'crossover': [0],
+        },
+        fuzz_count=30)
+
+
+def test_karatsuba_scales_sub_quadratically():
+    def schoolbook(n):
+        init_mul(factor1=qp.qalloc(len=n), factor2=qp.qalloc(len=n), clean_out=qp.qalloc(len=2*n))
+
+    def karatsuba(n):
+        init_mul_karatsuba(factor1=qp.qalloc(len=n), factor2=qp.qalloc(len=n), clean_out=qp.qalloc(len=2*n), cutoff=8, crossover=0)
+
+    s32 = qp.count_costs(schoolbook, 32).toffolis
+    s64 = qp.count_costs(schoolbook, 64).toffolis
+    k32 = qp.count_costs(karatsuba, 32).toffolis
+    k64 = qp.count_costs(karatsuba, 64).toffolis
+    assert s64 > 3.9 * s32
+    assert k64 < 3.5 * k32
+
+
+def test_karatsuba_dispatches_to_schoolbook_below_crossover():
+    def schoolbook(n):
+        init_mul(factor1=qp.qalloc(len=n), factor2=qp.qalloc(len=n), clean_out=qp.qalloc(len=2*n))
+
+    def karatsuba(n, crossover):
+        init_mul_karatsuba(factor1=qp.qalloc(len=n),
+                           factor2=qp.qalloc(len=n),
+                           clean_out=qp.qalloc(len=2*n),
+                           crossover=crossover)
+
+    s64 = qp.count_costs(schoolbook, 64).toffolis
+    assert qp.count_costs(karatsuba, 64, qp.arithmetic.coherent_mul.KARATSUBA_MUL_CROSSOVER).toffolis == s64
+    assert qp.count_costs(karatsuba, 64, 0).toffolis > s64
+
+
 def test_init_square_circuit():
     with qp.Sim(phase_fixup_bias=True, enforce_release_at_zero=False):
         factor = qp.qalloc(len=2, name='f')
         out = qp.qalloc(len=4, name='s')
         with qp.LogCirqCircuit() as circuit:
-            init_square(factor=factor, clean_out=out)
+            with qp.arithmetic.default_addition_strategy('ripple'):
+                init_square(factor=factor, clean_out=out)
     cirq.testing.assert_has_diagram(circuit, r"""
 _do_addition_carry_in: -----------------------alloc---X-------@---------------------------------------------------------------@---@-------X---Mxc---cxM---release-----------------alloc---X-------@-------------------------------@---@-------X---Mxc---cxM---release-------------
                                                       |       |                                                               |   |       |                                               |       |                               |   |       |
@@ -110,6 +110,91 @@ def del_xor_lookup(*,
         unary_storage.clear(1 << low)
 
 
+def do_classical_xor_lookup_select_swap(sim_state: 'qp.ClassicalSimState',
+                                        *,
+                                        lvalue: 'qp.IntBuf',
+                                        table: 'qp.LookupTable',
+                                        address: int,
+                                        swap_registers: int):
+    do_classical_xor_lookup(sim_state, lvalue=lvalue, table=table, address=address)
+
+
+@semi_quantum(classical=do_classical_xor_lookup_select_swap, alloc_prefix='_qrom_')
+def do_xor_lookup_select_swap(*,
+                              lvalue: 'qp.Quint',
+                              table: 'qp.LookupTable',
+                              address: 'qp.Quint.Borrowed',
+                              swap_registers: int,
+                              control: 'qp.Qubit.Control' = True):
+    """Xors a table entry into `lvalue` using a SELECT-SWAP lookup.
+
+    The table is reshaped into rows of `swap_registers` entries. One unary-iteration lookup over the high address
+    bits loads a whole row into that many output registers, and a swap network addressed by the low bits moves the
+    addressed entry into the first register. This costs about `len(table)/swap_registers` Toffolis for the lookup
+    plus `2*swap_registers*table.output_len()` for the swaps, instead of `len(table)`.
+    """
+    assert isinstance(lvalue, qp.Quint)
+    assert isinstance(address, qp.Quint)
+    assert isinstance(control, qp.QubitIntersection) and len(control.qubits) <= 1
+    assert swap_registers >= 1 and not swap_registers & (swap_registers - 1), 'swap_registers must be a power of 2.'
+    table = table[:1 << len(address)]
+    address = address[:qp.ceil_lg2(len(table))]
+    k = min(qp.floor_lg2(swap_registers), len(address))
+    word = table.output_len()
+    assert word <= len(lvalue)
+    if k == 0 or word == 0:
+        do_xor_lookup(lvalue=lvalue, table=table, address=address, control=control)
+        return
+
+    lam = 1 << k
+    low = address[:k]
+    high = address[k:]
+    rows = qp.LookupTable([
+        sum(table[r + j] << (j * word) for j in range(lam) if r + j < len(table))
+        for r in range(0, len(table), lam)
+    ])
+
+    with qp.qalloc(len=lam * word, name='_qrom_swap') as regs:
+        registers = [regs[j * word:(j + 1) * word] for j in range(lam)]
+        do_xor_lookup(lvalue=regs, table=rows, address=high, control=control)
+        _swap_network(registers, low, forward=True)
+        lvalue[:word] ^= registers[0]
+        _swap_network(registers, low, forward=False)
+        del_xor_lookup(lvalue=regs, table=rows, address=high, control=control)
+
+
+def _swap_network(registers: List['qp.Quint'], address: 'qp.Quint', forward: bool):
+    """Controlled swaps moving `registers[address]` into `registers[0]` (or back, when not `forward`)."""
+    steps = range(len(address)) if forward else range(len(address))[::-1]
+    for t in steps:
+        stride = 1 << t
+        for j in range(0, len(registers), 2 * stride):
+            a = registers[j]
+            b = registers[j + stride]
+            a ^= b
+            b ^= a & qp.controlled_by(address[t])
+            a ^= b
+
+
+def choose_swap_registers(table_len: int, word_len: int, ancilla_budget: Optional[int] = None) -> int:
+    """Picks the power-of-2 number of SELECT-SWAP output registers minimizing estimated Toffoli count.
+
+    Args:
+        table_len: Number of entries in the table.
+        word_len: Bit length of the entries.
+        ancilla_budget: Maximum number of qubits the output registers may use. Unlimited when None.
+    """
+    best = 1
+    lam = 1
+    while lam <= table_len:
+        if ancilla_budget is not None and lam * word_len > ancilla_budget:
+            break
+        if -(-table_len // lam) + 2 * lam * word_len < -(-table_len // best) + 2 * best * word_len:
+            best = lam
+        lam <<= 1
+    return best
+
+
 def _chunk_bits(bits: List[bool], size: int) -> List[int]:
     return [
         qp.little_endian_int(bits[k:k + size])
@@ -118,9 +203,21 @@ def _chunk_bits(bits: List[bool], size: int) -> List[int]:
 
 
 class LookupRValue(qp.RValue[int]):
-    """Represents the temporary result of a table lookup."""
+    """Represents the temporary result of a table lookup.
+
+    Args:
+        table: The table to read from.
+        address: The quantum address to read at.
+        swap_registers: When larger than 1, lookups use `do_xor_lookup_select_swap` with this many output registers.
+        ancilla_budget: When `swap_registers` isn't given, picks it (via `choose_swap_registers`) so that the
+            SELECT-SWAP registers use at most this many qubits. When both are None, unary iteration is used.
+    """
 
-    def __init__(self, table: qp.LookupTable, address: 'qp.Quint'):
+    def __init__(self,
+                 table: qp.LookupTable,
+                 address: 'qp.Quint',
+                 swap_registers: Optional[int] = None,
+                 ancilla_budget: Optional[int] = None):
         # Drop high bits that would place us beyond the range of the table.
         max_address_len = qp.ceil_lg2(len(table))
         # Drop inaccessible parts of table.
@@ -128,6 +225,25 @@ class LookupRValue(qp.RValue[int]):
 
         self.table = table[:max_table_len]
         self.address = address[:max_address_len]
+        if swap_registers is None and ancilla_budget is not None:
+            swap_registers = choose_swap_registers(len(self.table), self.table.output_len(), ancilla_budget)
+        self.swap_registers = swap_registers or 1
+
+    def _do_xor_into(self, lvalue: 'qp.Quint', controls: 'qp.QubitIntersection'):
+        if self.swap_registers > 1:
+            do_xor_lookup_select_swap(
+                lvalue=lvalue,
+                table=self.table,
+                address=self.address,
+                swap_registers=self.swap_registers,
+                control=controls)
+        else:
+            do_xor_lookup(
+                lvalue=lvalue,
+                table=self.table,
+                address=self.address,
+                phase_instead_of_toggle=False,
+                control=controls)
 
     def resolve(self, sim_state: 'qp.ClassicalSimState', allow_mutate: bool):
         address = self.address.resolve(sim_state, False)
@@ -139,12 +255,7 @@ class LookupRValue(qp.RValue[int]):
             return other
 
         if isinstance(other, qp.Quint):
-            qp.arithmetic.do_xor_lookup(
-                lvalue=other,
-                table=self.table,
-                address=self.address,
-                phase_instead_of_toggle=False,
-                control=controls)
+            self._do_xor_into(other, controls)
             return other
 
         return NotImplemented
@@ -155,12 +266,7 @@ class LookupRValue(qp.RValue[int]):
     def init_storage_location(self,
                               location: 'qp.Quint',
                               controls: 'qp.QubitIntersection'):
-        do_xor_lookup(
-            lvalue=location,
-            table=self.table,
-            address=self.address,
-            phase_instead_of_toggle=False,
-            control=controls)
+        self._do_xor_into(location, controls)
 
     def clear_storage_location(self,
                                location: 'qp.Quint',
@@ -175,4 +281,7 @@ class LookupRValue(qp.RValue[int]):
         return 'T(len={})[{}]'.format(len(self.table), self.address)
 
     def __repr__(self):
+        if self.swap_registers > 1:
+            return 'qp.LookupRValue({!r}, {!r}, swap_registers={!r})'.format(
+                self.table, self.address, self.swap_registers)
         return 'qp.LookupRValue({!r}, {!r})'.format(self.table, self.address)
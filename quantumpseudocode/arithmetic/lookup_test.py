@@ -145,3 +145,47 @@ def test_do():
                                                                         val=table.values[address] if control else 0),
             },
             fuzz_count=10)
+
+
+def test_do_select_swap():
+    for n in [1, 2, 5, 8, 13]:
+        qp.testing.assert_semi_quantum_func_is_consistent(
+            qp.arithmetic.do_xor_lookup_select_swap,
+            fuzz_space={
+                'control': [False, True],
+                'swap_registers': [1, 2, 4, 8],
+                'table': lambda: qp.LookupTable.random(n, range(0, 6)),
+                'address': lambda table: random.randint(0, len(table) - 1),
+                'lvalue': lambda table: qp.IntBuf.random(length=table.output_len()),
+            },
+            fuzz_count=10)
+
+
+def test_select_swap_lookup_rvalue():
+    table = qp.LookupTable.random(64, 4)
+    for budget, expected in [(1000, 2), (8, 2), (7, 1), (0, 1)]:
+        with qp.Sim():
+            with qp.hold(37, name='addr') as addr:
+                rval = qp.LookupRValue(table, addr, ancilla_budget=budget)
+                assert rval.swap_registers == expected
+                with qp.hold(rval, name='out') as out:
+                    assert qp.measure(out) == table[37]
+
+
+def test_select_swap_uses_fewer_toffolis():
+    table = qp.LookupTable.random(256, 4)
+
+    def lookup(swap_registers: int):
+        addr = qp.qalloc(len=8, name='addr')
+        out = qp.qalloc(len=4, name='out')
+        with qp.CountCosts() as during:
+            out ^= qp.LookupRValue(table, addr, swap_registers=swap_registers)
+        qp.qfree(out, dirty=True)
+        qp.qfree(addr, dirty=True)
+        return during
+
+    costs = {}
+    for lam in [1, 4]:
+        qp.count_costs(lambda: costs.setdefault(lam, lookup(lam)))
+    assert costs[1].toffolis > 200
+    assert costs[4].toffolis < costs[1].toffolis / 2
@@ -43,6 +43,9 @@ def measure(val: Union[qp.RValue[T], qp.Quint, qp.Qureg, qp.Qubit],
     elif isinstance(val, (qp.Quint, qp.QuintMod)):
         qureg = val.qureg
         wrap = lambda e: e
+    elif isinstance(val, qp.QuintCoset):
+        qureg = val.qureg
+        wrap = lambda e: e % val.modulus
     else:
         raise NotImplementedError(f"Don't know how to measure {val!r}.")
 
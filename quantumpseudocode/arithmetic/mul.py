@@ -1,11 +1,15 @@
+from typing import Optional
+
 import quantumpseudocode as qp
 from quantumpseudocode.ops import semi_quantum
+from .mult_add import default_window_size
 
 
 def do_multiplication_classical(*,
                                 lvalue: qp.IntBuf,
                                 factor: int,
-                                forward: bool = True):
+                                forward: bool = True,
+                                window: Optional[int] = None):
     assert factor % 2 == 1
     if forward:
         lvalue *= factor
@@ -18,16 +22,44 @@ def do_multiplication(*,
                       control: qp.Qubit.Control = True,
                       lvalue: qp.Quint,
                       factor: int,
-                      forward: bool = True):
+                      forward: bool = True,
+                      window: Optional[int] = None):
+    """Multiplies `lvalue` by an odd constant (or its inverse), modulo 2**len(lvalue).
+
+    When `window` is larger than 1, windows of `lvalue` are processed from the top down. Each window addresses
+    a lookup of the high part of its product into the bits above it, and is then multiplied in place bit by bit.
+    When `window` is None, a size is chosen based on the length of `lvalue`.
+    """
     assert isinstance(control, qp.QubitIntersection) and len(control.qubits) <= 1
     assert isinstance(lvalue, qp.Quint)
     assert isinstance(factor, int)
     assert factor % 2 == 1
-    if forward:
-        for i in range(len(lvalue))[::-1]:
-            c = control & lvalue[i]
-            lvalue[i+1:] += (factor >> 1) & qp.controlled_by(c)
-    else:
-        for i in range(len(lvalue)):
-            c = control & lvalue[i]
-            lvalue[i+1:] -= (factor >> 1) & qp.controlled_by(c)
+    if window is None:
+        window = default_window_size(len(lvalue))
+    assert window >= 1
+
+    if window == 1:
+        if forward:
+            for i in range(len(lvalue))[::-1]:
+                c = control & lvalue[i]
+                lvalue[i+1:] += (factor >> 1) & qp.controlled_by(c)
+        else:
+            for i in range(len(lvalue)):
+                c = control & lvalue[i]
+                lvalue[i+1:] -= (factor >> 1) & qp.controlled_by(c)
+        return
+
+    starts = range(0, len(lvalue), window)
+    for i in (starts[::-1] if forward else starts):
+        w = lvalue[i:i + window]
+        rest = lvalue[i + len(w):]
+        table = qp.LookupTable([
+            (j * factor >> len(w)) % 2**len(rest)
+            for j in range(2**len(w))
+        ])
+        if forward:
+            rest += table[w] & qp.controlled_by(control)
+            do_multiplication(lvalue=w, factor=factor, forward=True, window=1, control=control)
+        else:
+            do_multiplication(lvalue=w, factor=factor, forward=False, window=1, control=control)
+            rest -= table[w] & qp.controlled_by(control)
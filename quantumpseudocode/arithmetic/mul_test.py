@@ -43,5 +43,6 @@ def test_quantum_classical_consistent():
             'lvalue': lambda: qp.IntBuf.random(range(0, 6)),
             'factor': lambda: random.randint(0, 31) * 2 + 1,
             'forward': [False, True],
+            'window': [None, 1, 2, 3],
         },
         fuzz_count=100)
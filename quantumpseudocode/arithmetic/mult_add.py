@@ -1,3 +1,5 @@
+from typing import Optional
+
 import quantumpseudocode as qp
 from quantumpseudocode.ops import semi_quantum
 
@@ -6,7 +8,8 @@ def do_plus_product_classical(*,
                               lvalue: qp.IntBuf,
                               quantum_factor: qp.IntBuf,
                               const_factor: int,
-                              forward: bool = True):
+                              forward: bool = True,
+                              window: Optional[int] = None):
     if forward:
         lvalue += int(quantum_factor) * const_factor
     else:
@@ -19,14 +22,45 @@ def do_plus_product(*,
                     lvalue: qp.Quint,
                     quantum_factor: qp.Quint.Borrowed,
                     const_factor: int,
-                    forward: bool = True):
+                    forward: bool = True,
+                    window: Optional[int] = None):
+    """Adds (or subtracts) `quantum_factor * const_factor` into `lvalue`.
+
+    When `window` is larger than 1, each `window` bits of the quantum factor are used to address a lookup of
+    their multiple of the constant, so only one addition is performed per window instead of one per bit. When
+    `window` is None, a size is chosen based on the length of `lvalue`.
+    """
     assert isinstance(control, qp.QubitIntersection) and len(control.qubits) <= 1
     assert isinstance(lvalue, qp.Quint)
     assert isinstance(quantum_factor, qp.Quint)
     assert isinstance(const_factor, int)
-    for i, q in enumerate(quantum_factor):
-        with qp.hold(const_factor & qp.controlled_by(q & control)) as offset:
-            if forward:
-                lvalue[i:] += offset
-            else:
-                lvalue[i:] -= offset
+    if window is None:
+        window = default_window_size(len(lvalue))
+    assert window >= 1
+
+    if window == 1:
+        for i, q in enumerate(quantum_factor):
+            qp.arithmetic.do_plus_const(
+                lvalue=lvalue[i:],
+                offset=const_factor,
+                control=q & control,
+                forward=forward)
+        return
+
+    for i in range(0, min(len(quantum_factor), len(lvalue)), window):
+        w = quantum_factor[i:i + window]
+        target = lvalue[i:]
+        table = qp.LookupTable([
+            j * const_factor % 2**len(target)
+            for j in range(2**len(w))
+        ])
+        if forward:
+            target += table[w] & qp.controlled_by(control)
+        else:
+            target -= table[w] & qp.controlled_by(control)
+
+
+def default_window_size(register_len: int) -> int:
+    """Picks the window minimizing estimated Toffolis (lookup plus addition) per bit of the quantum factor."""
+    return min(range(1, max(1, qp.ceil_lg2(register_len)) + 1),
+               key=lambda w: (2**w + 2 * register_len) / w)
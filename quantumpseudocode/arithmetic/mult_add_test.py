@@ -11,5 +11,23 @@ def test_quantum_classical_consistent():
             'quantum_factor': lambda: random.randint(0, 99),
             'const_factor': lambda: random.randint(0, 99),
             'forward': [False, True],
+            'window': [None, 1, 2, 3],
         },
         fuzz_count=100)
+
+
+def test_windowed_uses_fewer_toffolis():
+    def count(window):
+        lvalue = qp.Quint(qp.NamedQureg('lvalue', 16))
+        factor = qp.Quint(qp.NamedQureg('factor', 16))
+        with qp.RandomSim(measure_bias=0.5):
+            with qp.capture() as out:
+                qp.arithmetic.do_plus_product(
+                    lvalue=lvalue,
+                    quantum_factor=factor,
+                    const_factor=0xBEEF,
+                    window=window)
+        return qp.ccz_count(out)
+
+    assert count(None) < count(1)
+    assert count(4) < count(1)
@@ -1,6 +1,7 @@
 from typing import Iterable, Tuple, Optional
 
 import quantumpseudocode as qp
+from quantumpseudocode import sink
 
 
 class UnaryRValue(qp.RValue[int]):
@@ -29,11 +30,13 @@ class UnaryRValue(qp.RValue[int]):
                               controls: 'qp.QubitIntersection'):
         assert len(location) >= 1 << len(self.binary)
         location[0].init(controls)
+        ops = []
         for i, q in enumerate(self.binary):
             s = 1 << i
             for j in range(s):
-                location[j + s].init(location[j] & q)
-                location[j] ^= location[j + s]
+                ops.append((location[j + s].qureg, location[j] & q))
+                ops.append((location[j].qureg, qp.QubitIntersection((location[j + s],))))
+        sink.global_sink.do_toggle_batch(ops)
 
     def clear_storage_location(self,
                                location: 'qp.Quint',
@@ -35,5 +35,7 @@ def do_xor(*,
     assert isinstance(control, qp.QubitIntersection) and len(control.qubits) <= 1
     assert isinstance(lvalue, qp.Quint)
     assert isinstance(mask, qp.Quint)
-    for q, m in zip(lvalue, mask):
-        sink.global_sink.do_toggle(q.qureg, control & m)
+    sink.global_sink.do_toggle_batch([
+        (q.qureg, control & m)
+        for q, m in zip(lvalue, mask)
+    ])
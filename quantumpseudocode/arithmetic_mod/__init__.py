@@ -2,3 +2,11 @@ from .add_mod import (
     do_plus_const_mod,
     do_plus_mod,
 )
+
+from .montgomery import (
+    do_plus_product_montgomery,
+    do_to_montgomery,
+    montgomery_radix,
+    plus_product_montgomery,
+    to_montgomery,
+)
@@ -0,0 +1,187 @@
+from typing import Union
+
+import quantumpseudocode as qp
+from quantumpseudocode.ops import semi_quantum
+
+
+def montgomery_radix(modulus: int) -> int:
+    """The `R` used to represent values modulo `modulus` in Montgomery form (`x` is stored as `x*R % modulus`)."""
+    return 1 << (modulus - 1).bit_length()
+
+
+def do_plus_product_montgomery_classical(*,
+                                         lvalue: qp.IntBuf,
+                                         factor1: int,
+                                         factor2: int,
+                                         modulus: int,
+                                         forward: bool = True):
+    r_inv = qp.modular_multiplicative_inverse(montgomery_radix(modulus), modulus)
+    offset = int(factor1) * int(factor2) * r_inv
+    if not forward:
+        offset *= -1
+    lvalue[:] = (int(lvalue) + offset) % modulus
+
+
+def do_to_montgomery_classical(*,
+                               lvalue: qp.IntBuf,
+                               modulus: int,
+                               forward: bool = True):
+    r = montgomery_radix(modulus)
+    if not forward:
+        r = qp.modular_multiplicative_inverse(r, modulus)
+    lvalue[:] = int(lvalue) * r % modulus
+
+
+@semi_quantum(alloc_prefix='_plus_mont_', classical=do_plus_product_montgomery_classical)
+def do_plus_product_montgomery(*,
+                               control: qp.Qubit.Control = True,
+                               lvalue: qp.Quint,
+                               factor1: qp.Quint.Borrowed,
+                               factor2: qp.Quint.Borrowed,
+                               modulus: int,
+                               forward: bool = True):
+    """Adds (or subtracts) `factor1 * factor2 / R` into `lvalue`, modulo an odd modulus.
+
+    When both factors are in Montgomery form, the added value is their product in Montgomery form. `factor2` must
+    be less than the modulus.
+
+    The reduction is bit-serial: about 2n controlled additions, then a comparison and a modular addition. This is
+    meant for products of two quantum values. When a factor is classical, windowed lookup additions (see
+    `examples.plus_equal_product_mod`) use several times fewer Toffolis.
+    """
+    assert isinstance(control, qp.QubitIntersection) and len(control.qubits) <= 1
+    assert isinstance(lvalue, qp.Quint)
+    assert isinstance(factor1, qp.Quint)
+    assert isinstance(factor2, qp.Quint)
+    _plus_product_montgomery(
+        control=control,
+        lvalue=lvalue,
+        factor1=factor1,
+        factor2=factor2,
+        modulus=modulus,
+        forward=forward)
+
+
+@semi_quantum(alloc_prefix='_to_mont_', classical=do_to_montgomery_classical)
+def do_to_montgomery(*,
+                     lvalue: qp.Quint,
+                     modulus: int,
+                     forward: bool = True):
+    """Converts `lvalue` into Montgomery form (multiplies it by R), or out of it when `forward` is False.
+
+    The value must be less than the (odd) modulus.
+    """
+    assert isinstance(lvalue, qp.Quint)
+    n = (modulus - 1).bit_length()
+    assert len(lvalue) == n
+    r2 = montgomery_radix(modulus)**2 % modulus
+    into, back = (r2, 1) if forward else (1, r2)
+    with qp.qalloc(len=n, name='_mont_out') as out:
+        # Maps x into (x, x*R**±1).
+        _plus_product_montgomery(
+            control=qp.QubitIntersection.ALWAYS,
+            lvalue=out,
+            factor1=lvalue,
+            factor2=into,
+            modulus=modulus,
+            forward=True)
+        # Maps (x, x*R**±1) into (0, x*R**±1).
+        _plus_product_montgomery(
+            control=qp.QubitIntersection.ALWAYS,
+            lvalue=lvalue,
+            factor1=out,
+            factor2=back,
+            modulus=modulus,
+            forward=False)
+        lvalue ^= out
+        out ^= lvalue
+
+
+def plus_product_montgomery(target: 'qp.QuintMod',
+                            factor1: Union['qp.Quint', 'qp.QuintMod'],
+                            factor2: Union[int, 'qp.Quint', 'qp.QuintMod'],
+                            *,
+                            control: 'qp.Qubit.Control' = True,
+                            forward: bool = True):
+    """Adds (or subtracts) `factor1 * factor2 / R` into a modular register, using the register's modulus."""
+    assert isinstance(target, qp.QuintMod)
+    factor1 = _unwrap_mod(factor1, target.modulus)
+    factor2 = _unwrap_mod(factor2, target.modulus)
+    do_plus_product_montgomery(
+        control=control,
+        lvalue=target[:],
+        factor1=factor1,
+        factor2=factor2,
+        modulus=target.modulus,
+        forward=forward)
+
+
+def to_montgomery(target: 'qp.QuintMod', *, forward: bool = True):
+    """Converts a modular register into Montgomery form, or out of it when `forward` is False."""
+    assert isinstance(target, qp.QuintMod)
+    do_to_montgomery(lvalue=target[:], modulus=target.modulus, forward=forward)
+
+
+def _unwrap_mod(value: Union[int, 'qp.Quint', 'qp.QuintMod'], modulus: int) -> Union[int, 'qp.Quint']:
+    if isinstance(value, qp.QuintMod):
+        assert value.modulus == modulus, 'Modulus mismatch.'
+        return value[:]
+    return value
+
+
+def _plus_product_montgomery(*,
+                             control: 'qp.QubitIntersection',
+                             lvalue: 'qp.Quint',
+                             factor1: 'qp.Quint',
+                             factor2: Union[int, 'qp.Quint'],
+                             modulus: int,
+                             forward: bool):
+    assert modulus > 0 and modulus & 1
+    n = (modulus - 1).bit_length()
+    assert len(lvalue) >= n
+    assert len(factor1) <= n
+    if isinstance(factor2, int):
+        factor2 %= modulus
+
+    with qp.qalloc(len=2 * n + 1, name='_mont_acc') as acc:
+        with qp.qalloc(len=n, name='_mont_quotient') as quotient:
+            _montgomery_reduction_steps(acc, quotient, factor1, factor2, modulus, forward=True)
+
+            # The reduced product is in the high half of the accumulator, and is less than 2*modulus.
+            t = acc[n:]
+            with qp.qalloc(name='_mont_cmp') as c:
+                c.init(t >= modulus)
+                t -= modulus & qp.controlled_by(c)
+                qp.arithmetic_mod.do_plus_mod(
+                    control=control,
+                    lvalue=lvalue,
+                    offset=t[:n],
+                    modulus=modulus,
+                    forward=forward)
+                t += modulus & qp.controlled_by(c)
+                c.clear(t >= modulus)
+
+            _montgomery_reduction_steps(acc, quotient, factor1, factor2, modulus, forward=False)
+
+
+def _montgomery_reduction_steps(acc: 'qp.Quint',
+                                quotient: 'qp.Quint',
+                                factor1: 'qp.Quint',
+                                factor2: Union[int, 'qp.Quint'],
+                                modulus: int,
+                                forward: bool):
+    """Accumulates `factor1 * factor2 + quotient * modulus` into `acc`, choosing quotient bits to zero its low half."""
+    n = len(quotient)
+    steps = range(n) if forward else range(n)[::-1]
+    for i in steps:
+        segment = acc[i:i + n + 2]
+        if forward:
+            if i < len(factor1):
+                segment += factor2 & qp.controlled_by(factor1[i])
+            quotient[i] ^= acc[i]
+            segment += modulus & qp.controlled_by(quotient[i])
+        else:
+            segment -= modulus & qp.controlled_by(quotient[i])
+            quotient[i] ^= acc[i]
+            if i < len(factor1):
+                segment -= factor2 & qp.controlled_by(factor1[i])
@@ -0,0 +1,71 @@
+import random
+
+import quantumpseudocode as qp
+
+
+def _random_odd_modulus():
+    return random.randint(1, 31) * 2 + 1
+
+
+def test_quantum_classical_consistent():
+    qp.testing.assert_semi_quantum_func_is_consistent(
+        qp.arithmetic_mod.do_plus_product_montgomery,
+        fuzz_space={
+            'modulus': _random_odd_modulus,
+            'lvalue': lambda modulus: qp.IntBuf.random_mod(modulus),
+            'factor1': lambda modulus: random.randint(0, modulus - 1),
+            'factor2': lambda modulus: random.randint(0, modulus - 1),
+            'forward': [False, True],
+        },
+        fuzz_count=50)
+
+    qp.testing.assert_semi_quantum_func_is_consistent(
+        qp.arithmetic_mod.do_to_montgomery,
+        fuzz_space={
+            'modulus': _random_odd_modulus,
+            'lvalue': lambda modulus: qp.IntBuf.random_mod(modulus),
+            'forward': [False, True],
+        },
+        fuzz_count=50)
+
+
+def test_montgomery_round_trip():
+    modulus = 53
+    r = qp.arithmetic_mod.montgomery_radix(modulus)
+    assert r == 64
+    for x, y in [(0, 5), (7, 11), (52, 52)]:
+        with qp.Sim():
+            a = qp.qalloc(len=6, name='a')
+            b = qp.qalloc(len=6, name='b')
+            out = qp.qalloc(len=6, name='out')
+            a ^= x
+            b ^= y
+            qp.arithmetic_mod.do_to_montgomery(lvalue=a, modulus=modulus)
+            qp.arithmetic_mod.do_to_montgomery(lvalue=b, modulus=modulus)
+            assert qp.measure(a) == x * r % modulus
+            qp.arithmetic_mod.do_plus_product_montgomery(lvalue=out, factor1=a, factor2=b, modulus=modulus)
+            qp.arithmetic_mod.do_to_montgomery(lvalue=out, modulus=modulus, forward=False)
+            assert qp.measure(out) == x * y % modulus
+            qp.qfree(a, dirty=True)
+            qp.qfree(b, dirty=True)
+            qp.qfree(out, dirty=True)
+
+
+def test_quint_mod_wrappers():
+    modulus = 53
+    r = qp.arithmetic_mod.montgomery_radix(modulus)
+    with qp.Sim():
+        a = qp.qalloc(modulus=modulus, name='a')
+        y = qp.qalloc(len=4, name='y')
+        out = qp.qalloc(modulus=modulus, name='out')
+        a.init(7)
+        y.init(11)
+        qp.arithmetic_mod.to_montgomery(a)
+        assert qp.measure(a) == 7 * r % modulus
+        qp.arithmetic_mod.plus_product_montgomery(out, y, a)
+        assert qp.measure(out) == 7 * 11 % modulus
+        qp.arithmetic_mod.plus_product_montgomery(out, y, 5 * r % modulus, forward=False)
+        assert qp.measure(out) == (7 * 11 - 5 * 11) % modulus
+        qp.qfree(a, dirty=True)
+        qp.qfree(y, dirty=True)
+        qp.qfree(out, dirty=True)
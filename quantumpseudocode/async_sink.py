@@ -0,0 +1,130 @@
+import queue
+import threading
+from typing import Any, List, Optional, Sequence, Tuple
+
+import quantumpseudocode as qp
+from quantumpseudocode import sink
+
+_STOP = object()
+
+
+class AsyncSink(sink.Sink):
+    """Forwards observed operations to a wrapped observer sink, which processes them on a background thread.
+
+    Slow observers (e.g. `qp.LogCirqCircuit`) otherwise make every operation wait for them before the program can
+    continue. Events are handed over in chunks of `batch_size` through a queue holding at most `max_pending`
+    chunks; when the queue is full the program blocks until the worker catches up. Everything is flushed into the
+    wrapped sink when the context exits, or when `flush` is called.
+
+    The wrapped sink only observes. Allocations, measurements and measurement based uncomputation results still
+    come synchronously from the primary sink, so an `AsyncSink` can't be the primary sink.
+
+    Usage:
+        with qp.Sim():
+            with qp.AsyncSink(qp.LogCirqCircuit()) as circuit:
+                ...
+    """
+
+    def __init__(self, wrapped: 'qp.Sink', *, max_pending: int = 64, batch_size: int = 256):
+        super().__init__()
+        assert max_pending > 0 and batch_size > 0
+        self.wrapped = wrapped
+        self.batch_size = batch_size
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._chunk: List[Tuple[str, tuple]] = []
+        self._thread: Optional[threading.Thread] = None
+        self._error: Optional[BaseException] = None
+
+    def _push(self, method: str, args: tuple):
+        self._chunk.append((method, args))
+        if len(self._chunk) >= self.batch_size:
+            self._send()
+
+    def _send(self):
+        if self._error is not None:
+            raise RuntimeError('The wrapped sink of an AsyncSink failed.') from self._error
+        if self._chunk:
+            self._queue.put(self._chunk)
+            self._chunk = []
+
+    def _drain(self):
+        wrapped = self.wrapped
+        while True:
+            chunk = self._queue.get()
+            try:
+                if chunk is _STOP:
+                    return
+                if self._error is None:
+                    for method, args in chunk:
+                        getattr(wrapped, method)(*args)
+            except BaseException as ex:
+                self._error = ex
+            finally:
+                self._queue.task_done()
+
+    def flush(self):
+        """Blocks until the wrapped sink has processed every operation observed so far."""
+        self._send()
+        self._queue.join()
+        if self._error is not None:
+            raise RuntimeError('The wrapped sink of an AsyncSink failed.') from self._error
+
+    def did_allocate(self, args: 'qp.AllocArgs', qureg: 'qp.Qureg'):
+        self._push('did_allocate', (args, qureg))
+
+    def do_release(self, op: 'qp.ReleaseQuregOperation'):
+        self._push('do_release', (op,))
+
+    def do_phase_flip(self, controls: 'qp.QubitIntersection'):
+        self._push('do_phase_flip', (controls,))
+
+    def do_toggle(self, targets: 'qp.Qureg', controls: 'qp.QubitIntersection'):
+        self._push('do_toggle', (targets, controls))
+
+    def do_phase_flip_batch(self, ops: Sequence['qp.QubitIntersection']):
+        self._push('do_phase_flip_batch', (list(ops),))
+
+    def do_toggle_batch(self, ops: Sequence[Tuple['qp.Qureg', 'qp.QubitIntersection']]):
+        self._push('do_toggle_batch', (list(ops),))
+
+    def do_measure(self, qureg: 'qp.Qureg', reset: bool) -> int:
+        raise NotImplementedError('An AsyncSink only observes. Measurements come from the primary sink.')
+
+    def did_measure(self, qureg: 'qp.Qureg', reset: bool, result: int):
+        self._push('did_measure', (qureg, reset, result))
+
+    def do_start_measurement_based_uncomputation(self, qureg: 'qp.Qureg') -> 'qp.StartMeasurementBasedUncomputationResult':
+        raise NotImplementedError('An AsyncSink only observes. Measurements come from the primary sink.')
+
+    def did_start_measurement_based_uncomputation(self, qureg: 'qp.Qureg', result: 'qp.StartMeasurementBasedUncomputationResult'):
+        self._push('did_start_measurement_based_uncomputation', (qureg, result))
+
+    def do_end_measurement_based_uncomputation(self, qureg: 'qp.Qureg', start: 'qp.StartMeasurementBasedUncomputationResult'):
+        self._push('do_end_measurement_based_uncomputation', (qureg, start))
+
+    def supports_measurement_based_uncomputation(self) -> bool:
+        return self.wrapped.supports_measurement_based_uncomputation()
+
+    def _val(self) -> Any:
+        return self.wrapped._val()
+
+    def __enter__(self):
+        assert not self.wrapped.used
+        self.wrapped.used = True
+        self._thread = threading.Thread(target=self._drain, name='qp.AsyncSink', daemon=True)
+        self._thread.start()
+        return super().__enter__()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        try:
+            if exc_type is None:
+                self._send()
+            self._queue.put(_STOP)
+            self._thread.join()
+        finally:
+            super().__exit__(exc_type, exc_val, exc_tb)
+
+    def _succeeded(self):
+        if self._error is not None:
+            raise RuntimeError('The wrapped sink of an AsyncSink failed.') from self._error
+        self.wrapped._succeeded()
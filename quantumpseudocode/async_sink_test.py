@@ -0,0 +1,77 @@
+import pytest
+
+import quantumpseudocode as qp
+
+
+def _program():
+    a = qp.qalloc(len=4, name='a')
+    b = qp.qalloc(len=4, name='b')
+    a.init(5)
+    b += a
+    b[0] ^= a[1] & a[2]
+    qp.phase_flip(a[0] & b[3])
+    result = qp.measure(b, reset=True)
+    qp.qfree(b)
+    a.clear(5)
+    qp.qfree(a)
+    return result
+
+
+def test_matches_synchronous_observer():
+    with qp.Sim(phase_fixup_bias=True):
+        with qp.LogCirqCircuit() as expected:
+            expected_result = _program()
+
+    with qp.Sim(phase_fixup_bias=True):
+        with qp.AsyncSink(qp.LogCirqCircuit(), max_pending=1, batch_size=1) as actual:
+            actual_result = _program()
+
+    assert actual_result == expected_result == 5
+    assert str(actual) == str(expected)
+
+
+def test_flush():
+    counter = qp.CountNots()
+    with qp.Sim():
+        async_sink = qp.AsyncSink(counter)
+        with async_sink as counts:
+            a = qp.qalloc(len=4)
+            a ^= 15
+            async_sink.flush()
+            assert counts[0] == 4
+            a ^= 15
+            qp.qfree(a)
+    assert counts is counter.counts
+    assert counts[0] == 8
+
+
+
+def test_capture_lens_returns_its_list():
+    out = []
+    with qp.Sim(phase_fixup_bias=True):
+        with qp.capture() as expected:
+            _program()
+        with qp.AsyncSink(qp.CaptureLens(out)) as ops:
+            _program()
+    assert ops is out
+    assert [k for k, _ in out] == [k for k, _ in expected]
+
+def test_observer_failure_propagates():
+    class Broken(qp.CountNots):
+        def do_toggle(self, targets, controls):
+            raise ValueError('broken')
+
+    with pytest.raises(RuntimeError, match='wrapped sink'):
+        with qp.Sim():
+            with qp.AsyncSink(Broken(), batch_size=1):
+                q = qp.qalloc()
+                q ^= 1
+                q ^= 1
+                qp.qfree(q)
+
+
+def test_cannot_be_primary():
+    with pytest.raises(NotImplementedError):
+        with qp.AsyncSink(qp.CountNots()):
+            q = qp.qalloc()
+            qp.measure(q)
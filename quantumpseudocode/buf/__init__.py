@@ -3,5 +3,9 @@ from .int_buffer import (
     IntBuf,
     RawConcatBuffer,
     RawIntBuffer,
+    RawRopeBuffer,
+    RawUncheckedIntBuffer,
+    RawUncheckedWindowBuffer,
     RawWindowBuffer,
+    UncheckedIntBuf,
 )
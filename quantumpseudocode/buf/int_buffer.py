@@ -1,5 +1,6 @@
+import bisect
 import random
-from typing import Iterable, Sequence, Union
+from typing import Iterable, Iterator, List, Sequence, Tuple, Union
 
 
 class Buffer:
@@ -190,22 +191,29 @@ class RawWindowBuffer(Buffer):
         self._start = start
         self._stop = stop
 
+    def _index(self, item: int) -> int:
+        n = self._stop - self._start
+        if item < 0:
+            item += n
+        if not 0 <= item < n:
+            raise IndexError(item)
+        return self._start + item
+
     def __getitem__(self, item) -> int:
         if isinstance(item, int):
-            index = range(self._start, self._stop)[item]
-            return self._buf[index]
+            return self._buf[self._index(item)]
 
         if isinstance(item, slice):
             assert item.step is None
-            span = range(self._start, self._stop)[item]
-            assert span.start <= span.stop
-            return self._buf[span.start:span.stop]
+            start, stop, _ = item.indices(self._stop - self._start)
+            assert start <= stop
+            return self._buf[self._start + start:self._start + stop]
 
         return NotImplemented
 
     def __setitem__(self, key, value):
         if isinstance(key, int):
-            index = range(self._start, self._stop)[key]
+            index = self._index(key)
             self._buf[index] = value
             assert self._buf[index] == value
             return value
@@ -215,8 +223,7 @@ class RawWindowBuffer(Buffer):
             assert 0 <= key.start <= key.stop <= len(self)
             n = key.stop - key.start
             assert 0 <= value < 1 << n
-            span = range(self._start, self._stop)[key]
-            self._buf[span.start:span.stop] = value
+            self._buf[self._start + key.start:self._start + key.stop] = value
             return value
 
         return NotImplemented
@@ -236,12 +243,209 @@ class RawWindowBuffer(Buffer):
         return 'RawWindowBuffer({!r}, {!r}, {!r})'.format(self._buf, self._start, self._stop)
 
 
+class RawUncheckedIntBuffer(RawIntBuffer):
+    """A RawIntBuffer that skips argument validation. Used by `qp.UncheckedIntBuf`."""
+
+    def __getitem__(self, item):
+        if isinstance(item, int):
+            return (self._val >> item) & 1
+
+        if isinstance(item, slice):
+            return (self._val >> item.start) & ~(-1 << (item.stop - item.start))
+
+        return NotImplemented
+
+    def __setitem__(self, key, value):
+        if isinstance(key, int):
+            if value:
+                self._val |= 1 << key
+            else:
+                self._val &= ~(1 << key)
+            return value
+
+        if isinstance(key, slice):
+            mask = ~(-1 << (key.stop - key.start))
+            written = value & mask
+            self._val = (self._val & ~(mask << key.start)) | (written << key.start)
+            return written
+
+        return NotImplemented
+
+    def __repr__(self):
+        return 'RawUncheckedIntBuffer(0b{}, {!r})'.format(str(self), self._len)
+
+
+class RawUncheckedWindowBuffer(RawWindowBuffer):
+    """A RawWindowBuffer that skips argument validation and doesn't re-read written values."""
+
+    def __new__(cls, buf: Buffer, start: int, stop: int):
+        return Buffer.__new__(cls)
+
+    def __init__(self, buf: Buffer, start: int, stop: int):
+        if isinstance(buf, RawWindowBuffer):
+            buf, start, stop = buf._buf, buf._start + start, buf._start + stop
+        self._buf = buf
+        self._start = start
+        self._stop = stop
+
+    def __getitem__(self, item) -> int:
+        if isinstance(item, int):
+            return self._buf[self._start + item]
+
+        if isinstance(item, slice):
+            return self._buf[self._start + item.start:self._start + item.stop]
+
+        return NotImplemented
+
+    def __setitem__(self, key, value):
+        if isinstance(key, int):
+            self._buf[self._start + key] = value
+            return value
+
+        if isinstance(key, slice):
+            self._buf[self._start + key.start:self._start + key.stop] = value
+            return value
+
+        return NotImplemented
+
+    def __repr__(self):
+        return 'RawUncheckedWindowBuffer({!r}, {!r}, {!r})'.format(self._buf, self._start, self._stop)
+
+
+class RawRopeBuffer(Buffer):
+    """Exposes many buffers as one concatenated buffer, without nesting.
+
+    Parts are flattened into segments of underlying `RawIntBuffer`s, with a prefix sum of segment lengths used to
+    find the segment holding an index by binary search. Slices touch each covered segment once.
+    """
+
+    def __init__(self, parts: Sequence[Buffer]):
+        segments: List[Tuple[RawIntBuffer, int, int]] = []
+        for part in parts:
+            for raw, offset, length in _flat_segments(part, 0, len(part)):
+                if segments:
+                    prev_raw, prev_offset, prev_length = segments[-1]
+                    if prev_raw is raw and prev_offset + prev_length == offset:
+                        segments[-1] = (raw, prev_offset, prev_length + length)
+                        continue
+                segments.append((raw, offset, length))
+        self._segments = segments
+        self._starts = []
+        total = 0
+        for _, _, length in segments:
+            self._starts.append(total)
+            total += length
+        self._len = total
+
+    def _locate(self, index: int) -> int:
+        return bisect.bisect_right(self._starts, index) - 1
+
+    def __getitem__(self, item):
+        if isinstance(item, int):
+            assert 0 <= item < self._len
+            k = self._locate(item)
+            raw, offset, _ = self._segments[k]
+            return (raw._val >> (offset + item - self._starts[k])) & 1
+
+        if isinstance(item, slice):
+            assert item.step is None
+            assert 0 <= item.start <= item.stop <= self._len
+            result = 0
+            shift = 0
+            for raw, lo, hi in self._touched(item.start, item.stop):
+                result |= ((raw._val >> lo) & ~(-1 << (hi - lo))) << shift
+                shift += hi - lo
+            return result
+
+        return NotImplemented
+
+    def __setitem__(self, key, value):
+        if isinstance(key, int):
+            assert value in [False, True, 0, 1]
+            assert 0 <= key < self._len
+            k = self._locate(key)
+            raw, offset, _ = self._segments[k]
+            raw[offset + key - self._starts[k]] = value
+            return value
+
+        if isinstance(key, slice):
+            assert key.step is None
+            assert 0 <= key.start <= key.stop <= self._len
+            n = key.stop - key.start
+            assert 0 <= value < 1 << n
+            rest = value
+            for raw, lo, hi in self._touched(key.start, key.stop):
+                mask = ~(-1 << (hi - lo))
+                raw._val = (raw._val & ~(mask << lo)) | ((rest & mask) << lo)
+                rest >>= hi - lo
+            return value
+
+        return NotImplemented
+
+    def _touched(self, start: int, stop: int) -> Iterator[Tuple[RawIntBuffer, int, int]]:
+        """Yields (raw buffer, low, high) bit ranges covering [start, stop) in order."""
+        if start >= stop:
+            return
+        k = self._locate(start)
+        while k < len(self._segments):
+            seg_start = self._starts[k]
+            if seg_start >= stop:
+                break
+            raw, offset, length = self._segments[k]
+            lo = max(start, seg_start) - seg_start
+            hi = min(stop, seg_start + length) - seg_start
+            yield raw, offset + lo, offset + hi
+            k += 1
+
+    def __eq__(self, other):
+        if isinstance(other, type(self)):
+            return len(self._segments) == len(other._segments) and all(
+                a is b and o1 == o2 and n1 == n2
+                for (a, o1, n1), (b, o2, n2) in zip(self._segments, other._segments))
+        return NotImplemented
+
+    def __len__(self):
+        return self._len
+
+    def __str__(self):
+        return ' '.join('{}[{}:{}]'.format(raw, offset, offset + length)
+                        for raw, offset, length in self._segments)
+
+    def __repr__(self):
+        return 'RawRopeBuffer({!r})'.format([
+            RawWindowBuffer(raw, offset, offset + length)
+            for raw, offset, length in self._segments
+        ])
+
+
+def _flat_segments(buf: Buffer, start: int, stop: int) -> Iterator[Tuple[RawIntBuffer, int, int]]:
+    """Yields (raw buffer, offset, length) segments covering [start, stop) of a buffer."""
+    if start >= stop:
+        return
+    if isinstance(buf, RawIntBuffer):
+        yield buf, start, stop - start
+    elif isinstance(buf, RawWindowBuffer):
+        yield from _flat_segments(buf._buf, buf._start + start, buf._start + stop)
+    elif isinstance(buf, RawConcatBuffer):
+        n = len(buf.buf0)
+        yield from _flat_segments(buf.buf0, min(start, n), min(stop, n))
+        yield from _flat_segments(buf.buf1, max(start, n) - n, max(stop, n) - n)
+    elif isinstance(buf, RawRopeBuffer):
+        for raw, lo, hi in buf._touched(start, stop):
+            yield raw, lo, hi - lo
+    else:
+        raise NotImplementedError('Unknown buffer type: {!r}'.format(buf))
+
+
 class IntBuf:
     """A fixed-width unsigned integer backed by a mutable bit buffer.
 
     Basically a complicated pointer into allocated memory.
     """
 
+    _raw_type = RawIntBuffer
+    _window_type = RawWindowBuffer
+
     def __init__(self, buffer: Buffer):
         self._buf = buffer
         assert isinstance(buffer, Buffer), 'Not a Buffer: {!r}'.format(buffer)
@@ -268,7 +472,7 @@ class IntBuf:
         return IntBuf.raw(length=length, val=random.randint(0, modulus - 1))
 
     def copy(self) -> 'IntBuf':
-        return IntBuf.raw(length=len(self), val=int(self))
+        return type(self).raw(length=len(self), val=int(self))
 
     def __len__(self):
         """The number of bits in this fixed-width integer."""
@@ -287,32 +491,31 @@ class IntBuf:
         """
         if pad_len == 0:
             return self
-        return IntBuf(RawConcatBuffer(self._buf, RawIntBuffer(0, pad_len)))
+        return type(self)(RawRopeBuffer([self._buf, self._raw_type(0, pad_len)]))
 
     @classmethod
     def zero(cls, length: int) -> 'IntBuf':
         """Returns a fresh zero'd IntBuf with the given length."""
-        return IntBuf(RawIntBuffer(0, length))
+        return cls(cls._raw_type(0, length))
 
     @classmethod
     def raw(cls, *, val: int, length: int) -> 'IntBuf':
         """Returns a fresh IntBuf with the given length and starting value."""
-        return IntBuf(RawIntBuffer(val, length))
+        return cls(cls._raw_type(val, length))
 
     @classmethod
     def concat(cls, bufs: Iterable['IntBuf']) -> 'IntBuf':
         """An IntBuf backed by the concatenated buffers of the given IntBufs."""
         frozen = list(bufs)
         if not frozen:
-            return IntBuf.zero(0)
-        seed = frozen[0]
-        for buf in frozen[1:]:
-            seed = seed.then(buf)
-        return seed
+            return cls.zero(0)
+        if len(frozen) == 1:
+            return frozen[0]
+        return cls(RawRopeBuffer([buf._buf for buf in frozen]))
 
     def then(self, other: 'IntBuf') -> 'IntBuf':
         """An IntBuf backed by the concatenated buffers of the given IntBufs."""
-        return IntBuf(RawConcatBuffer(self._buf, other._buf))
+        return type(self)(RawRopeBuffer([self._buf, other._buf]))
 
     def __getitem__(self, item):
         """Get a bit or mutable window into this IntBuf."""
@@ -325,7 +528,7 @@ class IntBuf:
             assert item.step is None
             span = range(0, len(self._buf))[item]
             assert span.start <= span.stop
-            return IntBuf(RawWindowBuffer(self._buf, span.start, span.stop))
+            return type(self)(self._window_type(self._buf, span.start, span.stop))
 
         return NotImplemented
 
@@ -397,3 +600,39 @@ class IntBuf:
 
     def __repr__(self):
         return 'IntBuf({!r})'.format(self._buf)
+
+
+class UncheckedIntBuf(IntBuf):
+    """An IntBuf that skips bounds checks and doesn't re-read written values to verify them.
+
+    Used by `qp.Sim(checked=False)` to speed up long simulations of code that is already tested.
+    """
+
+    _raw_type = RawUncheckedIntBuffer
+    _window_type = RawUncheckedWindowBuffer
+
+    def __getitem__(self, item):
+        if isinstance(item, int):
+            return self._buf[item if item >= 0 else item + len(self._buf)]
+
+        if isinstance(item, slice):
+            start, stop, _ = item.indices(len(self._buf))
+            return UncheckedIntBuf(RawUncheckedWindowBuffer(self._buf, start, stop))
+
+        return NotImplemented
+
+    def __setitem__(self, key, value):
+        if isinstance(key, int):
+            self._buf[key if key >= 0 else key + len(self._buf)] = value
+            return value
+
+        if isinstance(key, slice):
+            start, stop, _ = key.indices(len(self._buf))
+            written = int(value) & ~(-1 << (stop - start))
+            self._buf[start:stop] = written
+            return written
+
+        return NotImplemented
+
+    def __repr__(self):
+        return 'UncheckedIntBuf({!r})'.format(self._buf)
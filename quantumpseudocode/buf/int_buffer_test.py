@@ -90,3 +90,62 @@ def test_window_flatten():
     b = qp.RawWindowBuffer(a, 1, 5)
     c = qp.RawWindowBuffer(b, 1, 3)
     assert repr(c) == 'RawWindowBuffer(RawIntBuffer(0b101101, 6), 2, 4)'
+
+
+def test_rope_buffer():
+    a = qp.RawIntBuffer(0b10110, 5)
+    b = qp.RawIntBuffer(0b011, 3)
+    c = qp.RawIntBuffer(0b1, 1)
+    rope = qp.RawRopeBuffer([
+        qp.RawWindowBuffer(a, 1, 4),
+        qp.RawConcatBuffer(b, c),
+        qp.RawWindowBuffer(a, 4, 5),
+    ])
+    assert len(rope) == 8
+    assert rope[0:8] == 0b11011011
+    assert [rope[i] for i in range(8)] == [1, 1, 0, 1, 1, 0, 1, 1]
+    assert rope[2:6] == 0b0110
+
+    rope[2:6] = 0b1001
+    assert a[0:5] == 0b11110
+    assert b[0:3] == 0b100
+    assert c[0] == 1
+    rope[7] = 0
+    assert a[0:5] == 0b01110
+
+
+def test_rope_flattens_and_merges():
+    a = qp.RawIntBuffer(0, 10)
+    b = qp.RawIntBuffer(0, 10)
+    inner = qp.RawRopeBuffer([qp.RawWindowBuffer(a, 0, 3), b])
+    outer = qp.RawRopeBuffer([inner, qp.RawWindowBuffer(a, 3, 10)])
+    assert repr(outer) == ('RawRopeBuffer([RawWindowBuffer(RawIntBuffer(0b0000000000, 10), 0, 3), '
+                           'RawWindowBuffer(RawIntBuffer(0b0000000000, 10), 0, 10), '
+                           'RawWindowBuffer(RawIntBuffer(0b0000000000, 10), 3, 10)])')
+    merged = qp.RawRopeBuffer([qp.RawWindowBuffer(a, 0, 3), qp.RawWindowBuffer(a, 3, 10)])
+    assert merged == qp.RawRopeBuffer([a])
+
+    e = qp.IntBuf.concat([qp.IntBuf.raw(val=3, length=2)] + [qp.IntBuf.raw(val=k % 16, length=4) for k in range(100)])
+    assert len(e) == 402
+    assert int(e[2:6]) == 0
+    assert int(e[6:10]) == 1
+    e[6:10] = 9
+    assert int(e[6:10]) == 9
+    assert int(e.padded(5)) == int(e)
+
+
+def test_unchecked_int_buf():
+    e = qp.UncheckedIntBuf.zero(10)
+    e += 33
+    f = e[2:]
+    assert isinstance(f, qp.UncheckedIntBuf)
+    f -= 1
+    assert int(e) == 29
+    e[-1] = 1
+    assert int(e) == 29 + 512
+    assert int(e.padded(3)) == 29 + 512
+    assert isinstance(e.copy(), qp.UncheckedIntBuf)
+    g = qp.UncheckedIntBuf.concat([e[:5], qp.UncheckedIntBuf.raw(val=3, length=2)])
+    g[3:7] = 0b1111
+    assert int(g) == 0b1111101
+    assert int(e[:5]) == 0b11101
@@ -0,0 +1,268 @@
+import concurrent.futures
+import dataclasses
+import itertools
+import json
+import os
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+import quantumpseudocode as qp
+from quantumpseudocode import sink
+
+
+@dataclasses.dataclass
+class CircuitCost:
+    """Costs accumulated by a `qp.CountCosts` sink."""
+    toffolis: int = 0
+    qubits: int = 0
+    depth: int = 0
+    measurements: int = 0
+
+    def volume(self) -> int:
+        """Spacetime volume: peak live qubits times depth."""
+        return self.qubits * self.depth
+
+
+COST_OBJECTIVES: Dict[str, Callable[[CircuitCost], float]] = {
+    'toffolis': lambda cost: cost.toffolis,
+    'qubits': lambda cost: cost.qubits,
+    'depth': lambda cost: cost.depth,
+    'volume': lambda cost: cost.volume(),
+}
+
+
+class CountCosts(qp.Sink):
+    """Counts Toffolis, peak live qubits, and ASAP depth of the operations it observes.
+
+    Depth is computed by placing each operation one layer after the latest operation touching any of its qubits.
+    Use as an observer under a `qp.RandomSim` (or `qp.Sim`) to cost a program without tracking its state.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.cost = CircuitCost()
+        self._live = 0
+        self._times: Dict[Tuple[str, Optional[int]], int] = {}
+
+    def _val(self):
+        return self.cost
+
+    def _touch(self, keys: Iterable[Tuple[str, Optional[int]]]):
+        times = self._times
+        keys = list(keys)
+        t = 1 + max((times.get(k, 0) for k in keys), default=0)
+        for k in keys:
+            times[k] = t
+        if t > self.cost.depth:
+            self.cost.depth = t
+
+    def did_allocate(self, args: 'qp.AllocArgs', qureg: 'qp.Qureg'):
+        self._live += len(qureg)
+        if self._live > self.cost.qubits:
+            self.cost.qubits = self._live
+
+    def do_release(self, op: 'qp.ReleaseQuregOperation'):
+        self._live -= len(op.qureg)
+
+    def do_phase_flip(self, controls: 'qp.QubitIntersection'):
+        if controls.bit and controls.qubits:
+            self.cost.toffolis += max(0, len(controls.qubits) - 2)
+            self._touch((q.name, q.index) for q in controls.qubits)
+
+    def do_toggle(self, targets: 'qp.Qureg', controls: 'qp.QubitIntersection'):
+        if controls.bit and len(targets):
+            self.cost.toffolis += max(0, len(controls.qubits) - 1)
+            self._touch((q.name, q.index) for q in itertools.chain(targets, controls.qubits))
+
+    def do_measure(self, qureg: 'qp.Qureg', reset: bool) -> int:
+        raise NotImplementedError()
+
+    def did_measure(self, qureg: 'qp.Qureg', reset: bool, result: int):
+        self.cost.measurements += len(qureg)
+        self._touch((q.name, q.index) for q in qureg)
+
+    def do_start_measurement_based_uncomputation(self, qureg: 'qp.Qureg') -> 'qp.StartMeasurementBasedUncomputationResult':
+        raise NotImplementedError()
+
+    def did_start_measurement_based_uncomputation(self,
+                                                  qureg: 'qp.Qureg',
+                                                  result: 'qp.StartMeasurementBasedUncomputationResult'):
+        self.did_measure(qureg, False, result.measurement)
+
+    def do_end_measurement_based_uncomputation(self,
+                                               qureg: 'qp.Qureg',
+                                               start: 'qp.StartMeasurementBasedUncomputationResult'):
+        pass
+
+    def supports_measurement_based_uncomputation(self) -> bool:
+        return True
+
+
+def count_costs(program: Callable[..., Any], *args, **kwargs) -> CircuitCost:
+    """Runs `program(*args, **kwargs)` without tracking state and returns the cost of its operations.
+
+    Measurements return 1s, so that data-dependent fixups are included in the count.
+    """
+    assert not sink.global_sink.sinks, "count_costs can't be nested inside an active simulation."
+    with qp.RandomSim(measure_bias=1):
+        with CountCosts() as cost:
+            program(*args, **kwargs)
+    return cost
+
+
+def tune_windows(program: Callable[..., Any],
+                 window_ranges: Dict[str, Iterable[int]],
+                 objective: Union[str, Callable[[CircuitCost], float]] = 'toffolis',
+                 *,
+                 cache_key: Optional[str] = None,
+                 cache_path: Optional[str] = None) -> Dict[str, int]:
+    """Finds the window sizes minimizing a cost objective.
+
+    Args:
+        program: Called with one keyword argument per entry of `window_ranges`. Must allocate its own registers.
+        window_ranges: The candidate values of each window size. Every combination is tried.
+        objective: One of 'toffolis', 'qubits', 'depth', 'volume' or a function of a `qp.CircuitCost`. Ties are
+            broken by Toffoli count. Functions are identified in the cache by their qualified name, so lambdas
+            can't be cached.
+        cache_key: Identifies the program and problem size (e.g. its bit width) in the on-disk cache. Results are
+            memoized per (cache_key, objective, window_ranges).
+        cache_path: A json file to memoize results in. Nothing is cached when this or `cache_key` is None.
+
+    Returns:
+        The best window sizes, keyed like `window_ranges`.
+    """
+    use_cache = cache_key is not None and cache_path is not None
+    if isinstance(objective, str):
+        objective_name = objective
+        objective = COST_OBJECTIVES[objective]
+    else:
+        objective_name = '{}.{}'.format(objective.__module__, objective.__qualname__)
+        if use_cache and '<lambda>' in objective_name:
+            raise ValueError('Lambda objectives all have the same name, so they would share cache entries. '
+                             'Use a named function, or a cache_key of None.')
+
+    names = sorted(window_ranges)
+    candidates = {name: list(window_ranges[name]) for name in names}
+
+    cache = None
+    entry = None
+    if use_cache:
+        entry = '{}|{}|{}'.format(cache_key, objective_name, json.dumps(candidates, sort_keys=True))
+        cache = {}
+        if os.path.exists(cache_path):
+            with open(cache_path) as f:
+                cache = json.load(f)
+        if entry in cache:
+            return cache[entry]
+
+    best = None
+    best_score = None
+    for values in itertools.product(*[candidates[name] for name in names]):
+        windows = dict(zip(names, values))
+        cost = count_costs(program, **windows)
+        score = (objective(cost), cost.toffolis)
+        if best_score is None or score < best_score:
+            best, best_score = windows, score
+    assert best is not None, 'No candidate windows.'
+
+    if cache is not None:
+        cache[entry] = best
+        os.makedirs(os.path.dirname(os.path.abspath(cache_path)), exist_ok=True)
+        with open(cache_path, 'w') as f:
+            json.dump(cache, f, indent=2, sort_keys=True)
+    return best
+
+
+def sweep(program: Callable[..., Any],
+          grid: Dict[str, Iterable[Any]],
+          *,
+          processes: Optional[int] = None,
+          cache_key: Optional[str] = None,
+          cache_path: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Counts the costs of a program at every point of a parameter grid, in parallel.
+
+    Each point runs `count_costs(program, **params)` in a worker process, which has its own sink stack.
+
+    Args:
+        program: Called with one keyword argument per entry of `grid`. Must allocate its own registers. When running
+            in a process pool this must be picklable (e.g. a module level function).
+        grid: The candidate values of each parameter. Every combination is run. Values must be json serializable
+            when caching, or a ValueError is raised before anything runs.
+        processes: The number of worker processes. Defaults to the number of cpus. Use 1 to run every point in
+            the current process.
+        cache_key: Identifies the program in the on-disk cache.
+        cache_path: A jsonl file that finished points are appended to as they complete. Points already in the file
+            (under the same cache_key) are not run again, so an interrupted sweep resumes where it left off. Nothing
+            is cached when this or `cache_key` is None.
+
+    Returns:
+        One row per grid point, in grid order, holding the point's parameters and its `qp.CircuitCost` fields.
+    """
+    assert not sink.global_sink.sinks, "sweep can't be nested inside an active simulation."
+    names = sorted(grid)
+    points = [dict(zip(names, values))
+              for values in itertools.product(*[list(grid[name]) for name in names])]
+
+    use_cache = cache_key is not None and cache_path is not None
+    if use_cache:
+        for params in points:
+            try:
+                json.dumps(params)
+            except TypeError:
+                raise ValueError(f'Cached sweep parameters must be json serializable, but got {params!r}.')
+    done: Dict[str, Dict[str, Any]] = {}
+    if use_cache and os.path.exists(cache_path):
+        with open(cache_path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if record['key'] == cache_key:
+                    done[_point_id(record['params'])] = record['cost']
+
+    pending: Dict[str, Dict[str, Any]] = {}
+    for params in points:
+        point_id = _point_id(params)
+        if point_id not in done:
+            pending.setdefault(point_id, params)
+
+    cache_file = open(cache_path, 'a') if use_cache and pending else None
+    try:
+        def finish(point_id: str, cost: Dict[str, Any]):
+            done[point_id] = cost
+            if cache_file is not None:
+                cache_file.write(json.dumps({'key': cache_key, 'params': pending[point_id], 'cost': cost},
+                                            sort_keys=True) + '\n')
+                cache_file.flush()
+
+        if processes == 1 or len(pending) <= 1:
+            for point_id, params in pending.items():
+                finish(point_id, _sweep_point(program, params))
+        else:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=processes) as pool:
+                futures = {pool.submit(_sweep_point, program, params): point_id
+                           for point_id, params in pending.items()}
+                try:
+                    for future in concurrent.futures.as_completed(futures):
+                        finish(futures[future], future.result())
+                except BaseException:
+                    # Don't start the remaining points. Leaving the `with` block waits for the running ones.
+                    for future in futures:
+                        future.cancel()
+                    raise
+    finally:
+        if cache_file is not None:
+            cache_file.close()
+
+    return [{**params, **done[_point_id(params)]} for params in points]
+
+
+def _point_id(params: Dict[str, Any]) -> str:
+    # Uncached sweeps may use parameters that aren't json serializable.
+    try:
+        return json.dumps(params, sort_keys=True)
+    except TypeError:
+        return repr(sorted(params.items()))
+
+
+def _sweep_point(program: Callable[..., Any], params: Dict[str, Any]) -> Dict[str, Any]:
+    return dataclasses.asdict(count_costs(program, **params))
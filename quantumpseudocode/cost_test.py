@@ -0,0 +1,126 @@
+import json
+import os
+
+import pytest
+
+import quantumpseudocode as qp
+
+
+def test_count_costs():
+    def program():
+        a = qp.qalloc(len=3, name='a')
+        b = qp.qalloc(len=2, name='b')
+        b[0] ^= a[0] & a[1]
+        b[1] ^= a[2]
+        b[1] ^= b[0] & a[2]
+        qp.qfree(b, dirty=True)
+        c = qp.qalloc(len=1, name='c')
+        qp.phase_flip(a[0] & a[1] & c[0])
+        qp.qfree(c, dirty=True)
+        qp.qfree(a, dirty=True)
+
+    cost = qp.count_costs(program)
+    assert cost.toffolis == 3
+    assert cost.qubits == 5
+    assert cost.depth == 2
+    assert cost.volume() == 10
+
+
+def test_tune_windows(tmp_path):
+    calls = []
+
+    def program(a: int, b: int):
+        calls.append((a, b))
+        q = qp.qalloc(len=abs(a - 2) + abs(b - 3))
+        qp.qfree(q)
+
+    path = str(tmp_path / 'windows.json')
+    assert qp.tune_windows(
+        program,
+        {'a': range(1, 5), 'b': range(1, 5)},
+        'qubits',
+        cache_key='test',
+        cache_path=path) == {'a': 2, 'b': 3}
+    assert len(calls) == 16
+
+    # Second lookup hits the cache.
+    assert qp.tune_windows(
+        program,
+        {'a': range(1, 5), 'b': range(1, 5)},
+        'qubits',
+        cache_key='test',
+        cache_path=path) == {'a': 2, 'b': 3}
+    assert len(calls) == 16
+
+
+def test_tune_windows_cache_entries(tmp_path, monkeypatch):
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'xdg'))
+    calls = []
+
+    def program(a: int):
+        calls.append(a)
+        qp.qfree(qp.qalloc(len=a))
+
+    def qubits(cost: qp.CircuitCost) -> int:
+        return cost.qubits
+
+    # Nothing is written without a cache_path.
+    assert qp.tune_windows(program, {'a': [3, 1, 2]}, qubits, cache_key='test') == {'a': 1}
+    assert not os.path.exists(tmp_path / 'xdg')
+
+    path = str(tmp_path / 'windows.json')
+    assert qp.tune_windows(program, {'a': [3, 1, 2]}, qubits, cache_key='test', cache_path=path) == {'a': 1}
+    with open(path) as f:
+        assert list(json.load(f)) == ['test|{}.{}|{{"a": [3, 1, 2]}}'.format(__name__, qubits.__qualname__)]
+
+    # Different candidates don't reuse the cached answer.
+    del calls[:]
+    assert qp.tune_windows(program, {'a': [3, 2]}, qubits, cache_key='test', cache_path=path) == {'a': 2}
+    assert calls == [3, 2]
+
+    with pytest.raises(ValueError, match='Lambda'):
+        qp.tune_windows(program, {'a': [1]}, lambda cost: cost.depth, cache_key='test', cache_path=path)
+    assert qp.tune_windows(program, {'a': [3, 1]}, lambda cost: cost.qubits, cache_key=None) == {'a': 1}
+
+
+def _sweep_program(width: int, window: int):
+    a = qp.qalloc(len=width)
+    b = qp.qalloc(len=width)
+    for i in range(0, width, window):
+        b[i] ^= a[i] & a[(i + 1) % width]
+    qp.qfree(a, dirty=True)
+    qp.qfree(b, dirty=True)
+
+
+def test_sweep(tmp_path):
+    path = str(tmp_path / 'sweep.jsonl')
+    grid = {'width': [4, 6], 'window': [1, 2, 3]}
+    table = qp.sweep(_sweep_program, grid, processes=2, cache_key='test', cache_path=path)
+    assert [(row['width'], row['window']) for row in table] == [
+        (4, 1), (4, 2), (4, 3), (6, 1), (6, 2), (6, 3)]
+    for row in table:
+        assert row['toffolis'] == len(range(0, row['width'], row['window']))
+        assert row['qubits'] == 2 * row['width']
+    with open(path) as f:
+        assert len(f.readlines()) == 6
+
+    # Finished points are read back instead of being run again.
+    calls = []
+
+    def program(width: int, window: int):
+        calls.append((width, window))
+        _sweep_program(width, window)
+
+    grid['window'].append(4)
+    resumed = qp.sweep(program, grid, processes=1, cache_key='test', cache_path=path)
+    assert resumed[:3] == table[:3]
+    assert sorted(calls) == [(4, 4), (6, 4)]
+    with open(path) as f:
+        assert len(f.readlines()) == 8
+
+
+def test_sweep_rejects_unserializable_cached_params(tmp_path):
+    path = str(tmp_path / 'sweep.jsonl')
+    with pytest.raises(ValueError, match='json serializable'):
+        qp.sweep(_sweep_program, {'width': [4], 'window': [object()]}, processes=1, cache_key='test', cache_path=path)
+    assert not os.path.exists(path)
@@ -1,6 +1,6 @@
 import collections
 import random
-from typing import List, Union, Callable, Any, Optional, Tuple
+from typing import List, Union, Callable, Any, Optional, Tuple, Sequence
 
 import cirq
 import quantumpseudocode as qp
@@ -142,6 +142,17 @@ class CountNots(qp.Sink):
             else:
                 self.counts[len(controls.qubits)] += len(targets)
 
+    def do_toggle_batch(self, ops: Sequence[Tuple['qp.Qureg', 'qp.QubitIntersection']]):
+        counts = self.counts
+        for targets, controls in ops:
+            if controls.bit:
+                n = len(controls.qubits)
+                if n > 1:
+                    counts[1] += 2 * (len(targets) - 1)
+                    counts[n] += 1
+                else:
+                    counts[n] += len(targets)
+
     def do_measure(self, qureg: 'qp.Qureg', reset: bool) -> int:
         raise NotImplementedError()
 
@@ -157,3 +168,6 @@ class CountNots(qp.Sink):
 
     def do_end_measurement_based_uncomputation(self, qureg: 'qp.Qureg', start: 'qp.StartMeasurementBasedUncomputationResult'):
         pass
+
+    def supports_measurement_based_uncomputation(self) -> bool:
+        return True
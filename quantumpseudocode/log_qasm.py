@@ -0,0 +1,172 @@
+import os
+import re
+from typing import Dict, List, Optional, TextIO, Union
+
+import quantumpseudocode as qp
+from quantumpseudocode import sink
+
+
+class LogQasm3(sink.Sink):
+    """Streams the operations it observes into an OpenQASM 3 program, as they happen.
+
+    Each allocated register is declared (and reset) when it is allocated, so the sink only remembers the registers
+    that are currently alive. Toggles become `x`, `cx`, `ccx` or `ctrl(k) @ x` statements, phase flips become `z`,
+    `cz` or `ctrl(k) @ z` statements, and measurements write into freshly declared bit registers.
+
+    Measurement based uncomputation of a single qubit becomes an X basis measurement into a bit, and the phase
+    fixups performed by the program inside the uncomputation block are emitted classically controlled on that bit
+    (e.g. `if (mx_3[0]) cz a_0[0], b_1[0];`). The sink only sees the fixups for the outcome that occurred while
+    recording, so the recording must observe the outcome 1 (e.g. under `qp.Sim(phase_fixup_bias=True)` or
+    `qp.RandomSim(measure_bias=1)`); otherwise a `ValueError` is raised. Uncomputing larger registers by
+    measurement raises `NotImplementedError`, because their fixups can't be recovered from a single outcome.
+
+    Usage:
+        with qp.Sim(phase_fixup_bias=True):
+            with qp.LogQasm3('circuit.qasm'):
+                ...
+    """
+
+    def __init__(self, destination: Union[str, os.PathLike, TextIO]):
+        super().__init__()
+        self.destination = destination
+        self._out: Optional[TextIO] = None
+        self._owns_file = False
+        self._registers: Dict[str, str] = {}
+        self._conditions: List[str] = []
+        self._counter = 0
+
+    def __enter__(self):
+        if isinstance(self.destination, (str, os.PathLike)):
+            self._out = open(self.destination, 'w')
+            self._owns_file = True
+        else:
+            self._out = self.destination
+        self._out.write('OPENQASM 3.0;\ninclude "stdgates.inc";\n')
+        return super().__enter__()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        try:
+            if self._owns_file:
+                self._out.close()
+            else:
+                self._out.flush()
+        finally:
+            super().__exit__(exc_type, exc_val, exc_tb)
+
+    def _fresh(self, name: str) -> str:
+        base = re.sub(r'\W', '_', name).strip('_') or 'q'
+        if base[0].isdigit():
+            base = 'q' + base
+        result = f'{base}_{self._counter}'
+        self._counter += 1
+        return result
+
+    def _emit(self, statement: str):
+        if self._conditions:
+            statement = f'if ({" && ".join(self._conditions)}) {statement}'
+        self._out.write(statement + '\n')
+
+    def _qubit(self, qubit: 'qp.Qubit') -> str:
+        ident = self._registers.get(qubit.name)
+        if ident is None:
+            raise ValueError(f'{qubit} was not allocated while the OpenQASM sink was active.')
+        return f'{ident}[{qubit.index or 0}]'
+
+    def _operands(self, qureg: 'qp.Qureg') -> List[str]:
+        """Whole registers are broadcast over by a single statement. Otherwise one operand per qubit."""
+        if isinstance(qureg, qp.NamedQureg) and qureg.name in self._registers:
+            return [self._registers[qureg.name]]
+        return [self._qubit(q) for q in qureg]
+
+    def did_allocate(self, args: 'qp.AllocArgs', qureg: 'qp.Qureg'):
+        if not len(qureg):
+            return
+        assert isinstance(qureg, qp.NamedQureg)
+        ident = self._fresh(qureg.name)
+        self._registers[qureg.name] = ident
+        self._out.write(f'qubit[{len(qureg)}] {ident};\n')
+        self._out.write(f'reset {ident};\n')
+        if args.x_basis:
+            self._out.write(f'h {ident};\n')
+
+    def do_release(self, op: 'qp.ReleaseQuregOperation'):
+        if not len(op.qureg):
+            return
+        if op.x_basis or op.dirty:
+            for operand in self._operands(op.qureg):
+                self._emit(f'reset {operand};')
+        if isinstance(op.qureg, qp.NamedQureg):
+            self._registers.pop(op.qureg.name, None)
+
+    def do_phase_flip(self, controls: 'qp.QubitIntersection'):
+        if not controls.bit:
+            return
+        qubits = [self._qubit(q) for q in controls.qubits]
+        if not qubits:
+            self._emit('gphase(pi);')
+        elif len(qubits) == 1:
+            self._emit(f'z {qubits[0]};')
+        elif len(qubits) == 2:
+            self._emit(f'cz {qubits[0]}, {qubits[1]};')
+        else:
+            self._emit(f'ctrl({len(qubits) - 1}) @ z {", ".join(qubits)};')
+
+    def do_toggle(self, targets: 'qp.Qureg', controls: 'qp.QubitIntersection'):
+        if not controls.bit or not len(targets):
+            return
+        ctrls = [self._qubit(q) for q in controls.qubits]
+        if not ctrls:
+            gate = 'x'
+        elif len(ctrls) == 1:
+            gate = 'cx'
+        elif len(ctrls) == 2:
+            gate = 'ccx'
+        else:
+            gate = f'ctrl({len(ctrls)}) @ x'
+        for target in self._operands(targets):
+            self._emit(f'{gate} {", ".join(ctrls + [target])};')
+
+    def _measure_into(self, prefix: str, qureg: 'qp.Qureg') -> str:
+        bits = self._fresh(prefix)
+        self._out.write(f'bit[{len(qureg)}] {bits};\n')
+        if isinstance(qureg, qp.NamedQureg) and qureg.name in self._registers:
+            self._emit(f'{bits} = measure {self._registers[qureg.name]};')
+        else:
+            for i, q in enumerate(qureg):
+                self._emit(f'{bits}[{i}] = measure {self._qubit(q)};')
+        return bits
+
+    def do_measure(self, qureg: 'qp.Qureg', reset: bool) -> int:
+        raise NotImplementedError()
+
+    def did_measure(self, qureg: 'qp.Qureg', reset: bool, result: int):
+        if not len(qureg):
+            return
+        self._measure_into('m', qureg)
+        if reset:
+            for operand in self._operands(qureg):
+                self._emit(f'reset {operand};')
+
+    def do_start_measurement_based_uncomputation(self, qureg: 'qp.Qureg') -> 'qp.StartMeasurementBasedUncomputationResult':
+        raise NotImplementedError()
+
+    def did_start_measurement_based_uncomputation(self, qureg: 'qp.Qureg', result: 'qp.StartMeasurementBasedUncomputationResult'):
+        if not len(qureg):
+            self._conditions.append('true')
+            return
+        if len(qureg) > 1:
+            raise NotImplementedError(
+                'OpenQASM export of measurement based uncomputation is only supported for single qubits, '
+                f'but {qureg} has {len(qureg)} qubits.')
+        if result.measurement != 1:
+            raise ValueError(
+                f'Measurement based uncomputation of {qureg} observed no phase fixup, so the fixup can not be '
+                'exported. Record under qp.Sim(phase_fixup_bias=True) or qp.RandomSim(measure_bias=1).')
+        operand, = self._operands(qureg)
+        self._emit(f'h {operand};')
+        bits = self._measure_into('mx', qureg)
+        self._emit(f'reset {operand};')
+        self._conditions.append(f'{bits}[0]')
+
+    def do_end_measurement_based_uncomputation(self, qureg: 'qp.Qureg', start: 'qp.StartMeasurementBasedUncomputationResult'):
+        self._conditions.pop()
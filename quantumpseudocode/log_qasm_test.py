@@ -0,0 +1,85 @@
+import io
+
+import pytest
+
+import quantumpseudocode as qp
+
+
+def test_statements():
+    out = io.StringIO()
+    with qp.Sim(phase_fixup_bias=True):
+        with qp.LogQasm3(out):
+            a = qp.qalloc(len=3, name='a')
+            t = qp.qalloc(name='t')
+            a ^= 5
+            t.init(a[0] & a[2])
+            qp.phase_flip(a[0] & a[1] & t)
+            a[1] ^= a[0] & a[2] & t
+            qp.qfree(t, dirty=True)
+            assert qp.measure(a, reset=True) == 7
+            qp.qfree(a)
+    lines = out.getvalue().splitlines()
+    assert lines[:2] == ['OPENQASM 3.0;', 'include "stdgates.inc";']
+    assert lines[2:] == [
+        'qubit[3] a_0;',
+        'reset a_0;',
+        'qubit[1] t_1;',
+        'reset t_1;',
+        'x a_0[0];',
+        'x a_0[2];',
+        'ccx a_0[0], a_0[2], t_1;',
+        'ctrl(2) @ z a_0[0], a_0[1], t_1[0];',
+        'ctrl(3) @ x a_0[0], a_0[2], t_1[0], a_0[1];',
+        'reset t_1;',
+        'bit[3] m_2;',
+        'm_2 = measure a_0;',
+        'reset a_0;',
+    ]
+
+
+def test_measurement_based_uncomputation_is_classically_controlled():
+    out = io.StringIO()
+    with qp.Sim(phase_fixup_bias=True):
+        with qp.LogQasm3(out):
+            a = qp.qalloc(len=2, name='a')
+            with qp.hold(a[0] & a[1], name='t'):
+                pass
+            qp.qfree(a)
+    lines = out.getvalue().splitlines()
+    assert lines[-6:] == [
+        'ccx a_0[0], a_0[1], t_1;',
+        'h t_1;',
+        'bit[1] mx_2;',
+        'mx_2 = measure t_1;',
+        'reset t_1;',
+        'if (mx_2[0]) cz a_0[0], a_0[1];',
+    ]
+
+
+def test_unknown_qubit():
+    with qp.Sim():
+        a = qp.qalloc(name='a')
+        with pytest.raises(ValueError, match='not allocated'):
+            with qp.LogQasm3(io.StringIO()):
+                a ^= 1
+        qp.qfree(a, dirty=True)
+
+
+def test_measurement_based_uncomputation_requires_observed_fixup():
+    with qp.Sim(phase_fixup_bias=False):
+        t = qp.qalloc(name='t')
+        with pytest.raises(ValueError, match='phase_fixup_bias'):
+            with qp.LogQasm3(io.StringIO()):
+                with qp.measurement_based_uncomputation(t):
+                    pass
+        qp.qfree(t)
+
+
+def test_measurement_based_uncomputation_of_register_is_not_supported():
+    with qp.Sim(phase_fixup_bias=True):
+        t = qp.qalloc(len=2, name='t')
+        with pytest.raises(NotImplementedError, match='single qubits'):
+            with qp.LogQasm3(io.StringIO()):
+                with qp.measurement_based_uncomputation(t):
+                    pass
+        qp.qfree(t)
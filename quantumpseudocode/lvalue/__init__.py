@@ -3,6 +3,7 @@ from .qubit import (
 )
 
 from .qureg import (
+    ConcatQureg,
     NamedQureg,
     Qureg,
     RangeQureg,
@@ -17,6 +18,10 @@ from .quint_mod import (
     QuintMod,
 )
 
+from .quint_coset import (
+    QuintCoset,
+)
+
 from .padded import (
     pad,
     pad_all,
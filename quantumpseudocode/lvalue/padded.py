@@ -43,7 +43,7 @@ class PaddedQureg:
             name='{}_pad'.format(sub_name),
             len=self.min_len - len(self.base)
         )
-        return self.wrapper(qp.RawQureg(list(self.base) + list(self.padded)))
+        return self.wrapper(qp.ConcatQureg([self.base, self.padded]))
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         if len(self.base) >= self.min_len:
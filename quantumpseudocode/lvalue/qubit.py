@@ -24,7 +24,7 @@ class Qubit:
         return qp.RawQureg([qp.Qubit(self.name, self.index)])
 
     def resolve(self, sim_state: 'qp.ClassicalSimState', allow_mutate: bool):
-        buf = sim_state.quint_buf(qp.Quint(self.qureg))
+        buf = sim_state.quint_buf(qp.Quint(self.qureg), allow_mutate)
         return buf if allow_mutate else bool(int(buf))
 
     def _value_equality_values_(self):
@@ -10,7 +10,7 @@ class Quint:
         self.qureg = qureg
 
     def resolve(self, sim_state: 'qp.ClassicalSimState', allow_mutate: bool):
-        buf = sim_state.quint_buf(self)
+        buf = sim_state.quint_buf(self, allow_mutate)
         return buf if allow_mutate else int(buf)
 
     def hold_padded_to(self, min_len: int) -> ContextManager['qp.Quint']:
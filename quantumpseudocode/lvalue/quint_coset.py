@@ -0,0 +1,142 @@
+from typing import Optional, Union
+
+import cirq
+
+import quantumpseudocode as qp
+
+
+@cirq.value_equality
+class QuintCoset:
+    """A modular quint stored in the coset representation.
+
+    The register holds a uniform superposition over `value + k*modulus` for all `k < 2**padding`, which is (up to an
+    error shrinking exponentially in the padding) unchanged by adding the modulus. So modular additions are plain
+    additions into the whole register, with no comparisons or corrections. Each addition that wraps around the
+    register contributes deviation of about `2**-padding`, tracked by `approximation_error`.
+    """
+
+    def __init__(self, qureg: 'qp.Qureg', modulus: int, padding: int):
+        assert modulus > 0
+        assert padding >= 0
+        assert len(qureg) == (modulus - 1).bit_length() + padding
+        self.qureg = qureg
+        self.modulus = modulus
+        self.padding = padding
+        self.additions = 0
+
+    def _value_equality_values_(self):
+        return self.qureg, self.modulus, self.padding
+
+    def __len__(self):
+        return len(self.qureg)
+
+    def __getitem__(self, item):
+        if isinstance(item, int):
+            return self.qureg[item]
+        return qp.Quint(self.qureg[item])
+
+    def __setitem__(self, key, value):
+        if value != self[key]:
+            raise NotImplementedError(
+                "QuintCoset.__setitem__ is only for in-place syntax on the raw register, like q[0] ^= 1 or "
+                "q[2:] += 5. Don't know how to write {!r} into {!r} of QuintCoset {!r}.".format(
+                    value, key, self))
+        return value
+
+    def approximation_error(self, additions: Optional[int] = None) -> float:
+        """Bounds the deviation from a perfect modular register after the given number of additions.
+
+        Args:
+            additions: Number of additions to account for. Defaults to the number performed on this object so far.
+        """
+        if additions is None:
+            additions = self.additions
+        return min(1.0, additions * 2**-self.padding)
+
+    def init(self,
+             value: Union[int, 'qp.RValue[int]'],
+             controls: 'qp.QubitIntersection' = None):
+        """Adds a value into a register that is storing a coset of zero."""
+        if controls is None:
+            controls = qp.QubitIntersection.ALWAYS
+        self += value & qp.controlled_by(controls)
+
+    def clear(self,
+              value: Union[int, 'qp.RValue[int]'],
+              controls: 'qp.QubitIntersection' = None):
+        """Subtracts a value out of the register, leaving a coset of zero."""
+        if controls is None:
+            controls = qp.QubitIntersection.ALWAYS
+        self -= value & qp.controlled_by(controls)
+
+    def init_padding(self):
+        """Spreads a freshly allocated (zero'd) register over the coset of zero."""
+        reg = qp.Quint(self.qureg)
+        for i in range(self.padding):
+            offset = self.modulus << i
+            q = qp.qalloc(x_basis=True, name='_coset_pad')
+            reg += offset & qp.controlled_by(q)
+            qp.qfree(q, equivalent_expression=reg >= offset)
+
+    def clear_padding(self):
+        """Inverse of `init_padding`. The register must be storing a coset of zero."""
+        reg = qp.Quint(self.qureg)
+        for i in range(self.padding)[::-1]:
+            offset = self.modulus << i
+            q = qp.qalloc(name='_coset_pad')
+            q ^= reg >= offset
+            reg -= offset & qp.controlled_by(q)
+            # The qubit is now unentangled and in the |+> state, so it is released in the X basis. Its computational
+            # basis value is still a random bit, so it is also marked dirty.
+            qp.qfree(q, dirty=True, x_basis=True)
+
+    def __iadd__(self, other):
+        return self._add(other, forward=True)
+
+    def __isub__(self, other):
+        return self._add(other, forward=False)
+
+    def _add(self, other, forward: bool):
+        other, controls = qp.ControlledRValue.split(other)
+        if controls == qp.QubitIntersection.NEVER:
+            return self
+        target = qp.Quint(self.qureg)
+
+        if isinstance(other, int):
+            offset = other % self.modulus if forward else -other % self.modulus
+            target += offset & qp.controlled_by(controls)
+            self.additions += 1
+            return self
+
+        if isinstance(other, qp.ScaledIntRValue):
+            # Add one reduced table entry per window, instead of unreduced multiples of the constant.
+            factor = other.constant % self.modulus
+            if not forward:
+                factor = -factor % self.modulus
+            coherent = other.coherent
+            window = qp.arithmetic.mult_add.default_window_size(len(self))
+            for i in range(0, len(coherent), window):
+                w = coherent[i:i + window]
+                table = qp.LookupTable([
+                    j * factor * 2**i % self.modulus
+                    for j in range(2**len(w))
+                ])
+                target += table[w] & qp.controlled_by(controls)
+                self.additions += 1
+            return self
+
+        if isinstance(other, (qp.Quint, qp.RValue)):
+            if forward:
+                target += other & qp.controlled_by(controls)
+            else:
+                target -= other & qp.controlled_by(controls)
+            self.additions += 1
+            return self
+
+        return NotImplemented
+
+    def __str__(self):
+        return '{} (mod {}, coset padding {})'.format(self.qureg, self.modulus, self.padding)
+
+    def __repr__(self):
+        return 'qp.QuintCoset({!r}, {!r}, {!r})'.format(self.qureg, self.modulus, self.padding)
@@ -0,0 +1,67 @@
+import random
+
+import pytest
+
+import quantumpseudocode as qp
+
+
+@pytest.mark.parametrize('modulus,padding', [(5, 20), (13, 24), (21, 30)])
+def test_arithmetic(modulus: int, padding: int):
+    for _ in range(5):
+        v = random.randrange(modulus)
+        k = random.randrange(modulus)
+        f = random.randrange(1 << 4)
+        with qp.Sim():
+            a = qp.qalloc(modulus=modulus, coset_padding=padding, name='a')
+            assert len(a) == (modulus - 1).bit_length() + padding
+            a.init(v)
+            a += k
+            with qp.hold(f, name='f') as q:
+                a += q
+                a -= q * 3
+            a -= 2 * k
+            expected = (v - k + f - 3 * f) % modulus
+            assert qp.measure(a) == expected
+            a.clear(expected)
+            qp.qfree(a)
+
+
+def test_approximation_error():
+    with qp.Sim():
+        a = qp.qalloc(modulus=7, coset_padding=10)
+        assert a.approximation_error() == 0
+        a += 3
+        a -= 3
+        assert a.approximation_error() == 2 / 1024
+        assert a.approximation_error(additions=4096) == 1
+        qp.qfree(a)
+
+
+def test_addition_cost_is_plain_adder():
+    def coset_add(modulus: int):
+        a = qp.qalloc(modulus=modulus, coset_padding=4)
+        with qp.hold(5, name='b') as b:
+            with qp.CountCosts() as during:
+                a += b
+        qp.qfree(a, dirty=True)
+        return during
+
+    def mod_add(modulus: int):
+        a = qp.qalloc(modulus=modulus)
+        with qp.hold(5, name='b') as b:
+            with qp.CountCosts() as during:
+                a += b
+        qp.qfree(a, dirty=True)
+        return during
+
+    costs = {}
+    qp.count_costs(lambda: costs.setdefault('coset', coset_add(1001)))
+    qp.count_costs(lambda: costs.setdefault('mod', mod_add(1001)))
+    assert costs['coset'].toffolis < costs['mod'].toffolis
+
+
+def test_setitem_only_accepts_in_place_updates():
+    a = qp.QuintCoset(qp.NamedQureg('a', 5), modulus=5, padding=2)
+    a[1] = a[1]
+    with pytest.raises(NotImplementedError, match='QuintCoset.__setitem__'):
+        a[1:3] = 2
@@ -124,23 +124,23 @@ def test_iadd_isub():
     with qp.RandomSim(measure_bias=0.5):
         with qp.capture() as out:
             q += 5
-    assert qp.ccz_count(out) == 18
+    assert qp.ccz_count(out) == 16
 
     with qp.RandomSim(measure_bias=0.5):
         with qp.capture() as out:
             q += 4
-    assert qp.ccz_count(out) == 14
+    assert qp.ccz_count(out) == 12
 
     with qp.RandomSim(measure_bias=0.5):
         with qp.capture() as out:
             q -= 3
-    assert qp.ccz_count(out) == 18
+    assert qp.ccz_count(out) == 16
 
     q2 = qp.Quint(qp.NamedQureg('test2', 5))
     with qp.RandomSim(measure_bias=0.5):
         with qp.capture() as out:
             q += q2
-    assert qp.ccz_count(out) == 18
+    assert qp.ccz_count(out) == 9
 
     # Classes can specify custom behavior via __riadd__.
     class Riadd:
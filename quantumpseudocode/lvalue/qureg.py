@@ -1,4 +1,6 @@
-from typing import Optional, Iterable, Union
+import bisect
+import itertools
+from typing import Optional, Iterable, Union, List, Tuple
 
 import cirq
 
@@ -12,6 +14,10 @@ class Qureg:
     def __getitem__(self, item):
         raise NotImplementedError()
 
+    def runs(self) -> List[Tuple[str, range]]:
+        """The qubits of the register as maximal (register name, contiguous index range) pieces, in order."""
+        return _fuse_runs(self)
+
     def resolve(self, sim_state: 'qp.ClassicalSimState', allow_mutate: bool):
         if not allow_mutate:
             return [q.resolve(sim_state, False) for q in self]
@@ -64,6 +70,9 @@ class NamedQureg(Qureg):
             return RangeQureg(self, r)
         return NotImplemented
 
+    def runs(self) -> List[Tuple[str, range]]:
+        return [(self.name, range(self.length))] if self.length else []
+
     def __repr__(self):
         return 'qp.NamedQureg({!r}, {!r})'.format(self.name, self.length)
 
@@ -98,6 +107,11 @@ class RangeQureg(Qureg):
             return RangeQureg(self.sub, r)
         return NotImplemented
 
+    def runs(self) -> List[Tuple[str, range]]:
+        if self.range.step != 1:
+            return _fuse_runs(self)
+        return _cut_runs(self.sub.runs(), self.range.start, self.range.stop)
+
     def __repr__(self):
         return 'qp.RangeQureg({!r}, {!r})'.format(self.sub, self.range)
 
@@ -107,3 +121,111 @@ class RangeQureg(Qureg):
             '' if self.range.start == 0 else self.range.start,
             '' if self.range.stop == len(self.sub) else self.range.stop,
             '' if self.range.step == 1 else ':{}'.format(self.range.step))
+
+
+@cirq.value_equality
+class ConcatQureg(Qureg):
+    """The qubits of several registers, one register after another, without listing the individual qubits.
+
+    Indexing and slicing find the relevant parts by binary search over the prefix sums of the part lengths.
+    """
+
+    def __new__(cls, parts: Iterable[Union[Qureg, 'qp.Qubit']]):
+        flat = _flatten_parts(parts)
+        if len(flat) == 1:
+            return flat[0]
+        result = super().__new__(cls)
+        result.parts = flat
+        return result
+
+    def __init__(self, parts: Iterable[Union[Qureg, 'qp.Qubit']]):
+        offsets = [0]
+        for part in self.parts:
+            offsets.append(offsets[-1] + len(part))
+        self._offsets = offsets
+
+    def _value_equality_values_(self):
+        return self.parts
+
+    def __len__(self):
+        return self._offsets[-1]
+
+    def __iter__(self):
+        return itertools.chain.from_iterable(self.parts)
+
+    def __getitem__(self, item):
+        r = range(len(self))[item]
+        if isinstance(r, int):
+            i = bisect.bisect_right(self._offsets, r) - 1
+            return self.parts[i][r - self._offsets[i]]
+        if isinstance(r, range):
+            if r.step != 1:
+                return RangeQureg(self, r)
+            if not len(r):
+                return RawQureg([])
+            pieces = []
+            i = bisect.bisect_right(self._offsets, r.start) - 1
+            while i < len(self.parts) and self._offsets[i] < r.stop:
+                offset = self._offsets[i]
+                part = self.parts[i]
+                pieces.append(part[max(r.start - offset, 0):min(r.stop - offset, len(part))])
+                i += 1
+            return ConcatQureg(pieces)
+        return NotImplemented
+
+    def runs(self) -> List[Tuple[str, range]]:
+        result: List[Tuple[str, range]] = []
+        for part in self.parts:
+            for name, r in part.runs():
+                _append_run(result, name, r)
+        return result
+
+    def __repr__(self):
+        return 'qp.ConcatQureg({!r})'.format(list(self.parts))
+
+    def __str__(self):
+        return ' + '.join(str(part) for part in self.parts)
+
+
+def _flatten_parts(parts: Iterable[Union[Qureg, 'qp.Qubit']]) -> Tuple[Qureg, ...]:
+    result = []
+    for part in parts:
+        if isinstance(part, qp.Qubit):
+            part = part.qureg
+        if isinstance(part, ConcatQureg):
+            result.extend(part.parts)
+        elif len(part):
+            result.append(part)
+    if not result:
+        result.append(RawQureg([]))
+    return tuple(result)
+
+
+def _append_run(runs: List[Tuple[str, range]], name: str, r: range):
+    if runs and runs[-1][0] == name and runs[-1][1].stop == r.start:
+        runs[-1] = (name, range(runs[-1][1].start, r.stop))
+    elif len(r):
+        runs.append((name, r))
+
+
+def _cut_runs(runs: List[Tuple[str, range]], start: int, stop: int) -> List[Tuple[str, range]]:
+    """The part of a list of runs covering the qubits from `start` (inclusive) to `stop` (exclusive)."""
+    result: List[Tuple[str, range]] = []
+    offset = 0
+    for name, r in runs:
+        lo = max(start - offset, 0)
+        hi = min(stop - offset, len(r))
+        if lo < hi:
+            _append_run(result, name, r[lo:hi])
+        offset += len(r)
+        if offset >= stop:
+            break
+    return result
+
+
+def _fuse_runs(qubits: Iterable['qp.Qubit']) -> List[Tuple[str, range]]:
+    result: List[Tuple[str, range]] = []
+    for q in qubits:
+        i = q.index or 0
+        _append_run(result, q.name, range(i, i + 1))
+    return result
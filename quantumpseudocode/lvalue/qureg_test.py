@@ -86,3 +86,71 @@ def test_range_qureg_repr():
     cirq.testing.assert_equivalent_repr(
         r,
         setup_code='import quantumpseudocode as qp')
+
+
+def test_concat_qureg_init():
+    eq = cirq.testing.EqualsTester()
+    a = qp.NamedQureg('a', 5)
+    b = qp.NamedQureg('b', 3)
+    eq.add_equality_group(qp.ConcatQureg([a, b]), qp.ConcatQureg([a, qp.ConcatQureg([b])]))
+    eq.add_equality_group(qp.ConcatQureg([b, a]))
+    assert qp.ConcatQureg([a]) is a
+    assert qp.ConcatQureg([a, qp.RawQureg([])]) is a
+    assert len(qp.ConcatQureg([])) == 0
+
+
+def test_concat_qureg_getitem_len():
+    a = qp.NamedQureg('a', 5)
+    b = qp.NamedQureg('b', 3)
+    c = qp.Qubit('c', 4)
+    q = qp.ConcatQureg([a, c, b])
+    flat = list(a) + [c] + list(b)
+    assert len(q) == 9
+    assert list(q) == flat
+    for i in range(-9, 9):
+        assert q[i] == flat[i]
+    with pytest.raises(IndexError):
+        _ = q[9]
+    assert q[:] == q
+    assert q[1:3] == a[1:3]
+    assert list(q[3:7]) == flat[3:7]
+    assert list(q[::2]) == flat[::2]
+    assert q[4:7] == qp.ConcatQureg([a[4:], c.qureg, b[:1]])
+
+
+def test_concat_qureg_runs():
+    a = qp.NamedQureg('a', 5)
+    b = qp.NamedQureg('b', 3)
+    q = qp.ConcatQureg([a[:2], a[2:4], b, qp.Qubit('c', 7), qp.Qubit('c', 8), a[::-1]])
+    assert q.runs() == [
+        ('a', range(0, 4)),
+        ('b', range(0, 3)),
+        ('c', range(7, 9)),
+        ('a', range(4, 5)),
+        ('a', range(3, 4)),
+        ('a', range(2, 3)),
+        ('a', range(1, 2)),
+        ('a', range(0, 1)),
+    ]
+    assert q[1:6].runs() == [('a', range(1, 4)), ('b', range(0, 2))]
+    assert qp.RangeQureg(q, range(3, 10)).runs() == [
+        ('a', range(3, 4)), ('b', range(0, 3)), ('c', range(7, 9)), ('a', range(4, 5))]
+
+
+def test_concat_qureg_repr():
+    cirq.testing.assert_equivalent_repr(
+        qp.ConcatQureg([qp.NamedQureg('a', 3), qp.NamedQureg('b', 2)[1:]]),
+        setup_code='import quantumpseudocode as qp')
+
+
+def test_concat_qureg_sim():
+    with qp.Sim():
+        a = qp.qalloc(len=4, name='a')
+        b = qp.qalloc(len=4, name='b')
+        q = qp.Quint(qp.ConcatQureg([a[2:], b, a[:2]]))
+        q ^= 0b10110101
+        assert qp.measure(a) == 0b0110
+        assert qp.measure(b) == 0b1101
+        q ^= 0b10110101
+        qp.qfree(a)
+        qp.qfree(b)
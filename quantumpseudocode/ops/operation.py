@@ -10,7 +10,7 @@ class ClassicalSimState:
     def measurement_based_uncomputation_result_chooser(self) -> Callable[[], bool]:
         raise NotImplementedError()
 
-    def quint_buf(self, quint: 'qp.Quint') -> 'qp.IntBuf':
+    def quint_buf(self, quint: 'qp.Quint', allow_mutate: bool = True) -> 'qp.IntBuf':
         raise NotImplementedError()
 
     def resolve_location(self, loc: Any, allow_mutate: bool) -> Any:
@@ -3,6 +3,7 @@ import inspect
 from typing import Union, Callable, get_type_hints, ContextManager, Dict, List, Optional, Any, NamedTuple
 
 import quantumpseudocode as qp
+from quantumpseudocode import profiler
 
 
 def semi_quantum(func: Callable = None,
@@ -105,18 +106,33 @@ def semi_quantum(func: Callable = None,
 
     # Assemble into a function body.
     func_name = f'_decorated_{func.__name__}'
-    lines = [
-        f'def {func_name}({", ".join(param_strings)}):',
+    call_lines = [
         *assignment_strings,
         f'{indent}return func({", ".join(arg_strings)})'
     ]
+    lines = [
+        f'def {func_name}({", ".join(param_strings)}):',
+        # Report to the active qp.Profiler, if there is one.
+        '    _profiler = _profiling._active.get()',
+        '    if _profiler is not None:',
+        f'        _profiler.push({func.__name__!r}, {alloc_prefix!r})',
+        '        try:',
+        *('        ' + line for line in call_lines),
+        '        finally:',
+        '            _profiler.pop()',
+        *call_lines,
+    ]
     body = '\n'.join(lines)
 
     # Evaluate generated function code.
     result = _eval_body_func(body,
                              func,
                              func_name,
-                             exec_globals={**type_string_map, **remap_string_map, 'func': func, 'qp': qp})
+                             exec_globals={**type_string_map,
+                                           **remap_string_map,
+                                           'func': func,
+                                           'qp': qp,
+                                           '_profiling': profiler})
     if classical is not None:
         result.classical = classical
         if 'control' in raw_type_hints and 'control' not in classical_type_hints:
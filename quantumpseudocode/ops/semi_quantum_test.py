@@ -65,17 +65,19 @@ global phase:                     pi
             v = f(rval)
             assert isinstance(v, qp.Quint)
     cirq.testing.assert_has_diagram(circuit, """
-_f_x[0]: ----------alloc-------------------------------------X------------------------------------------X-----------------------------Mxc---X---@---X-------------------Z-------------------------------------X---------@---------Mxc--------cxM---cxM---release---
-                   |                                         |                                          |                             |         |   |                   |                                     |         |                          |     |
-_f_x[1]: ----------alloc-------------------------------------|--------X---------------------------------X-----------------------------Mxc-------X---@-------------------|---Z---------------------------------@---Mxc---|---cxM--------------------cxM---release---
-                                                             |        |                                 |                                       |                       |   |                                           |
-_lookup_prefix: -----------alloc---X---X---alloc---@X---@X---@---@X---@---Mxc---@---cxM---release---X---@---Mxc-------cxM---release-------------|-------alloc---X---X---@---@---X---Mxc-------cxM---release-------------|------------------------------------------
-                                   |               |                            |                                                               |               |                                                       |
-a[0]: -----------------------------|---------------@----------------------------Z---------------------------------------------------------------@---------------|-------------------------------------------------------Z------------------------------------------
-                                   |                                                                                                                            |
-a[1]: -----------------------------@------------------------------------------------------------------------------Z---------------------------------------------@-------------------------Z------------------------------------------------------------------------
-
-global phase:                                                                                                                                                                                                                           pi
+_f_x[0]: ------------alloc-----------------------------------X-----------------------------------------X-----------------------------Mxc---X---@---X-------------------Z-------------------------------------X---------@---------Mxc--------cxM---cxM---release---
+                     |                                       |                                         |                             |         |   |                   |                                     |         |                          |     |
+_f_x[1]: ------------alloc-----------------------------------|-------X---------------------------------X-----------------------------Mxc-------X---@-------------------|---Z---------------------------------@---Mxc---|---cxM--------------------cxM---release---
+                                                             |       |                                 |                                       |                       |   |                                           |
+_lookup_prefix: -------------alloc---X---X-----------@---@---|---@---|---------@-------------------X---@---Mxc-------cxM---release-------------|-------alloc---X---X---@---@---X---Mxc-------cxM---release-------------|------------------------------------------
+                                     |               |   |   |   |   |         |                                                               |               |                                                       |
+_lookup_prefix_1: -------------------|-------alloc---X---X---@---X---@---Mxc---|---cxM---release-----------------------------------------------|---------------|-------------------------------------------------------|------------------------------------------
+                                     |               |                         |                                                               |               |                                                       |
+a[0]: -------------------------------|---------------@-------------------------Z---------------------------------------------------------------@---------------|-------------------------------------------------------Z------------------------------------------
+                                     |                                                                                                                         |
+a[1]: -------------------------------@---------------------------------------------------------------------------Z---------------------------------------------@-------------------------Z------------------------------------------------------------------------
+
+global phase:                                                                                                                                                                                                                          pi
             """, use_unicode_characters=False)
 
     with pytest.raises(TypeError, match='quantum integer expression'):
@@ -0,0 +1,286 @@
+import contextvars
+import re
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import quantumpseudocode as qp
+from quantumpseudocode import sink
+
+# The profiler that `semi_quantum` functions and `qp.hold` report to, if any. Each thread and asyncio task has its
+# own. Checked on every call, so disabled profiling costs one context variable lookup.
+_active: 'contextvars.ContextVar[Optional[Profiler]]' = contextvars.ContextVar('qp_profiler', default=None)
+
+_METRICS = (
+    'calls',
+    'wall_time',
+    'front_end_time',
+    'sink_time',
+    'toffolis',
+    'toggles',
+    'phase_flips',
+    'measurements',
+    'allocated_qubits',
+)
+_TIME_METRICS = ('wall_time', 'front_end_time', 'sink_time')
+
+
+class ProfileNode:
+    """Costs accumulated by one call stack of `semi_quantum` functions and held values.
+
+    Except for `calls` and `wall_time`, the counters only include work done directly in this frame and not in the
+    frames it called. Use `total` for inclusive values.
+    """
+
+    def __init__(self, name: str, alloc_prefix: str):
+        self.name = name
+        self.alloc_prefix = alloc_prefix
+        self.children: Dict[Tuple[str, str], 'ProfileNode'] = {}
+        self.calls = 0
+        self.wall_time = 0.0
+        self.sink_time = 0.0
+        self.toffolis = 0
+        self.toggles = 0
+        self.phase_flips = 0
+        self.measurements = 0
+        self.allocated_qubits = 0
+
+    @property
+    def label(self) -> str:
+        if self.alloc_prefix:
+            return f'{self.name}({self.alloc_prefix})'
+        return self.name
+
+    @property
+    def front_end_time(self) -> float:
+        """Time spent in python code of this frame, excluding sinks and the frames it called."""
+        return max(0.0, self.wall_time - self.sink_time - sum(c.wall_time for c in self.children.values()))
+
+    def total(self, metric: str) -> float:
+        if metric in ('calls', 'wall_time'):
+            return getattr(self, metric)
+        return getattr(self, metric) + sum(c.total(metric) for c in self.children.values())
+
+    def to_json(self) -> Dict[str, Any]:
+        """A tree of inclusive totals."""
+        result: Dict[str, Any] = {'name': self.name, 'alloc_prefix': self.alloc_prefix}
+        for metric in _METRICS:
+            result[metric] = self.total(metric)
+        result['children'] = [c.to_json() for c in self.children.values()]
+        return result
+
+    def __repr__(self):
+        return f'qp.ProfileNode({self.name!r}, {self.alloc_prefix!r})'
+
+
+class Profiler:
+    """Attributes time and gate counts to the stack of `semi_quantum` functions and held values that caused them.
+
+    While active, every `semi_quantum` call and every `qp.hold` initialization and uncomputation pushes a frame
+    keyed by its function name and allocation prefix. Each frame accumulates the wall time spent in the python
+    front end, the time spent inside sinks, and the operations it emitted. Results can be exported in the collapsed
+    stack format read by flame graph tools, or as a json tree.
+
+    A profiler only sees the thread or asyncio task that entered it. It times the sinks that were active when it was
+    entered; sinks entered inside of it still receive every operation, but their time counts as front end time.
+
+    Usage:
+        with qp.Sim():
+            with qp.Profiler() as profile:
+                ...
+        print(profile.collapsed('toffolis'))
+    """
+
+    def __init__(self):
+        self.root = ProfileNode('root', '')
+        self._stack: List[ProfileNode] = []
+        self._starts: List[float] = []
+        self._active_token: Optional[contextvars.Token] = None
+        self._sinks_token: Optional[contextvars.Token] = None
+
+    def push(self, name: str, alloc_prefix: str):
+        parent = self._stack[-1]
+        key = name, alloc_prefix
+        node = parent.children.get(key)
+        if node is None:
+            node = ProfileNode(name, alloc_prefix)
+            parent.children[key] = node
+        node.calls += 1
+        self._stack.append(node)
+        self._starts.append(time.perf_counter())
+
+    def pop(self):
+        self._stack.pop().wall_time += time.perf_counter() - self._starts.pop()
+
+    def __enter__(self) -> 'Profiler':
+        assert _active.get() is None, 'Profilers cannot be nested.'
+        assert sink.global_sink.sinks, 'Enter a qp.Profiler inside of the simulator or sinks it should time.'
+        self._active_token = _active.set(self)
+        self._stack = [self.root]
+        self._starts = [time.perf_counter()]
+        self.root.calls += 1
+        self._sinks_token = sink._sink_stack.set((_ProfilingSink(self, sink.global_sink.sinks),))
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        sink._sink_stack.reset(self._sinks_token)
+        _active.reset(self._active_token)
+        self._sinks_token = None
+        self._active_token = None
+        self.root.wall_time += time.perf_counter() - self._starts[0]
+        self._stack = []
+        self._starts = []
+
+    def nodes(self) -> List[Tuple[Tuple[str, ...], ProfileNode]]:
+        """Every call stack that was seen, as (labels from the root, node) pairs in depth first order."""
+        result = []
+
+        def visit(path: Tuple[str, ...], node: ProfileNode):
+            path += (node.label,)
+            result.append((path, node))
+            for child in node.children.values():
+                visit(path, child)
+
+        visit((), self.root)
+        return result
+
+    def collapsed(self, metric: str = 'front_end_time') -> str:
+        """Lines of `frame;frame;frame value` with the value of the given metric for exactly that stack.
+
+        Times are given in integer microseconds. The output can be fed into flamegraph.pl, speedscope, etc.
+        """
+        assert metric in _METRICS and metric != 'calls', f'Unknown metric {metric!r}.'
+        lines = []
+        for path, node in self.nodes():
+            v = getattr(node, metric)
+            if metric in _TIME_METRICS:
+                v = round(v * 1e6)
+            if v:
+                lines.append(';'.join(_collapsed_safe(e) for e in path) + f' {v}')
+        return '\n'.join(lines) + ('\n' if lines else '')
+
+    def to_json(self) -> Dict[str, Any]:
+        return self.root.to_json()
+
+
+def _collapsed_safe(label: str) -> str:
+    return re.sub(r'[;\s]', '_', label)
+
+
+def _count_toggle(node: ProfileNode, targets: 'qp.Qureg', controls: 'qp.QubitIntersection'):
+    if controls.bit and len(targets):
+        node.toggles += 1
+        node.toffolis += max(0, len(controls.qubits) - 1)
+
+
+def _count_phase_flip(node: ProfileNode, controls: 'qp.QubitIntersection'):
+    if controls.bit and controls.qubits:
+        node.phase_flips += 1
+        node.toffolis += max(0, len(controls.qubits) - 2)
+
+
+class _ProfilingSink(sink.Sink):
+    """Stands in for the sinks that were active when a `Profiler` was entered.
+
+    Forwards each operation to those sinks, adding the time they take and the operation's costs to the profiler's
+    current frame.
+    """
+
+    def __init__(self, profiler: Profiler, wrapped: Tuple['qp.Sink', ...]):
+        super().__init__()
+        self.used = True
+        self.profiler = profiler
+        self.wrapped = wrapped
+
+    def _add_sink_time(self, t0: float) -> ProfileNode:
+        node = self.profiler._stack[-1]
+        node.sink_time += time.perf_counter() - t0
+        return node
+
+    def do_allocate(self, args: 'qp.AllocArgs') -> 'qp.Qureg':
+        t0 = time.perf_counter()
+        result = self.wrapped[0].do_allocate(args)
+        for s in self.wrapped[1:]:
+            s.did_allocate(args, result)
+        self._add_sink_time(t0).allocated_qubits += args.qureg_length
+        return result
+
+    def did_allocate(self, args: 'qp.AllocArgs', qureg: 'qp.Qureg'):
+        t0 = time.perf_counter()
+        for s in self.wrapped:
+            s.did_allocate(args, qureg)
+        self._add_sink_time(t0).allocated_qubits += args.qureg_length
+
+    def do_release(self, op: 'qp.ReleaseQuregOperation'):
+        t0 = time.perf_counter()
+        for s in self.wrapped:
+            s.do_release(op)
+        self._add_sink_time(t0)
+
+    def do_phase_flip(self, controls: 'qp.QubitIntersection'):
+        t0 = time.perf_counter()
+        for s in self.wrapped:
+            s.do_phase_flip(controls)
+        _count_phase_flip(self._add_sink_time(t0), controls)
+
+    def do_toggle(self, targets: 'qp.Qureg', controls: 'qp.QubitIntersection'):
+        t0 = time.perf_counter()
+        for s in self.wrapped:
+            s.do_toggle(targets, controls)
+        _count_toggle(self._add_sink_time(t0), targets, controls)
+
+    def do_phase_flip_batch(self, ops: Sequence['qp.QubitIntersection']):
+        t0 = time.perf_counter()
+        for s in self.wrapped:
+            s.do_phase_flip_batch(ops)
+        node = self._add_sink_time(t0)
+        for controls in ops:
+            _count_phase_flip(node, controls)
+
+    def do_toggle_batch(self, ops: Sequence[Tuple['qp.Qureg', 'qp.QubitIntersection']]):
+        t0 = time.perf_counter()
+        for s in self.wrapped:
+            s.do_toggle_batch(ops)
+        node = self._add_sink_time(t0)
+        for targets, controls in ops:
+            _count_toggle(node, targets, controls)
+
+    def do_measure(self, qureg: 'qp.Qureg', reset: bool) -> int:
+        t0 = time.perf_counter()
+        result = self.wrapped[0].do_measure(qureg, reset)
+        for s in self.wrapped[1:]:
+            s.did_measure(qureg, reset, result)
+        self._add_sink_time(t0).measurements += len(qureg)
+        return result
+
+    def did_measure(self, qureg: 'qp.Qureg', reset: bool, result: int):
+        t0 = time.perf_counter()
+        for s in self.wrapped:
+            s.did_measure(qureg, reset, result)
+        self._add_sink_time(t0).measurements += len(qureg)
+
+    def do_start_measurement_based_uncomputation(self, qureg: 'qp.Qureg') -> 'qp.StartMeasurementBasedUncomputationResult':
+        t0 = time.perf_counter()
+        result = self.wrapped[0].do_start_measurement_based_uncomputation(qureg)
+        for s in self.wrapped[1:]:
+            s.did_start_measurement_based_uncomputation(qureg, result)
+        self._add_sink_time(t0).measurements += len(qureg)
+        return result
+
+    def did_start_measurement_based_uncomputation(self,
+                                                  qureg: 'qp.Qureg',
+                                                  result: 'qp.StartMeasurementBasedUncomputationResult'):
+        t0 = time.perf_counter()
+        for s in self.wrapped:
+            s.did_start_measurement_based_uncomputation(qureg, result)
+        self._add_sink_time(t0).measurements += len(qureg)
+
+    def do_end_measurement_based_uncomputation(self,
+                                               qureg: 'qp.Qureg',
+                                               start: 'qp.StartMeasurementBasedUncomputationResult'):
+        t0 = time.perf_counter()
+        for s in self.wrapped:
+            s.do_end_measurement_based_uncomputation(qureg, start)
+        self._add_sink_time(t0)
+
+    def supports_measurement_based_uncomputation(self) -> bool:
+        return bool(self.wrapped) and self.wrapped[0].supports_measurement_based_uncomputation()
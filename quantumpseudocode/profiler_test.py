@@ -0,0 +1,88 @@
+import threading
+
+import quantumpseudocode as qp
+from quantumpseudocode import profiler, sink
+
+
+def _program():
+    a = qp.qalloc(len=6, name='a')
+    b = qp.qalloc(len=6, name='b')
+    a.init(5)
+    b += a * 3
+    with qp.hold(a[0] & a[2], name='t') as t:
+        b[3] ^= t
+    qp.measure(b, reset=True)
+    a.clear(5)
+    qp.qfree(a)
+    qp.qfree(b)
+
+
+def test_counts_match_cost_counting():
+    with qp.RandomSim(measure_bias=1):
+        with qp.CountCosts() as cost:
+            with qp.Profiler() as profile:
+                _program()
+
+    assert profile.root.total('toffolis') == cost.toffolis
+    assert profile.root.total('measurements') == cost.measurements
+    assert profile.root.wall_time >= profile.root.total('sink_time')
+
+    labels = [path for path, _ in profile.nodes()]
+    assert ('root', 'do_plus_product(_plus_mul_)', 'do_addition(_do_addition_)') in labels
+    assert ('root', 'QubitIntersection.init_storage_location(t)') in labels
+    assert ('root', 'QubitIntersection.clear_storage_location(t)') in labels
+
+    addition = profile.root.children['do_plus_product', '_plus_mul_'].children['do_addition', '_do_addition_']
+    assert addition.calls >= 2
+    assert addition.total('toffolis') == profile.root.children['do_plus_product', '_plus_mul_'].total('toffolis')
+
+
+def test_output_formats():
+    with qp.Sim():
+        with qp.Profiler() as profile:
+            _program()
+
+    lines = profile.collapsed('toffolis').splitlines()
+    assert lines
+    total = 0
+    for line in lines:
+        stack, value = line.rsplit(' ', 1)
+        assert stack.startswith('root;') or stack == 'root'
+        assert ' ' not in stack
+        total += int(value)
+    assert total == profile.root.total('toffolis')
+
+    tree = profile.to_json()
+    assert tree['name'] == 'root'
+    assert tree['toffolis'] == total
+    assert sum(c['toffolis'] for c in tree['children']) <= total
+    assert all('children' in c for c in tree['children'])
+
+
+def test_disabled_after_exit():
+    with qp.Sim():
+        with qp.Profiler() as profile:
+            pass
+        assert all(not isinstance(e, profiler._ProfilingSink) for e in sink.global_sink.sinks)
+        _program()
+    assert not profile.root.children
+
+
+def test_profilers_in_other_threads_are_independent():
+    profiles = [None, None]
+
+    def run(i: int):
+        with qp.Sim(phase_fixup_bias=True):
+            with qp.Profiler() as profile:
+                for _ in range(i + 1):
+                    _program()
+        profiles[i] = profile
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    single, double = [p.root.total('toffolis') for p in profiles]
+    assert single > 0
+    assert double == 2 * single
@@ -22,6 +22,14 @@ def qalloc(*,
     pass
 
 
+@overload
+def qalloc(*,
+           modulus: int,
+           coset_padding: int,
+           name: Optional[str] = None) -> 'qp.QuintCoset':
+    pass
+
+
 @overload
 def qalloc(*,
            name: Optional[str] = None,
@@ -32,6 +40,7 @@ def qalloc(*,
 def qalloc(*,
            len: Optional[int] = None,
            modulus: Optional[int] = None,
+           coset_padding: Optional[int] = None,
            name: Optional[str] = None,
            x_basis: bool = False) -> 'Any':
     """Allocates new quantum objects.
@@ -39,16 +48,29 @@ def qalloc(*,
     If no arguments are given, allocates a qubit.
     If the `len` argument is given, allocates a quint.
     If the `modulus` argument is given, allocates a modular quint.
+    If the `modulus` and `coset_padding` arguments are given, allocates a coset-representation modular quint.
 
     Args:
         len: Causes a quint to be allocated. Number of qubits in the quint register.
         modulus: Causes a modular quint, storing values modulo this modulus, to be allocated.
+        coset_padding: Causes the modular quint to use the coset representation, with this many extra qubits.
         name: Debug information to associate with the allocated object.
         x_basis: If set, the register is initialized into a uniform superposition instead of into the zero state.
 
     Returns:
-        A qubit, quint, or modular quint.
+        A qubit, quint, modular quint, or coset modular quint.
     """
+    if coset_padding is not None:
+        if modulus is None or len is not None or x_basis:
+            raise ValueError('Incompatible argument combination.')
+        assert modulus > 0 and coset_padding >= 0
+        qureg = sink.global_sink.do_allocate(AllocArgs(
+            qureg_name=name or '',
+            qureg_length=(modulus - 1).bit_length() + coset_padding))
+        result = qp.QuintCoset(qureg, modulus, coset_padding)
+        result.init_padding()
+        return result
+
     if len is None and modulus is None:
         n = 1
         wrap = lambda e: e[0]
@@ -60,7 +82,7 @@ def qalloc(*,
         n = (modulus - 1).bit_length()
         wrap = lambda e: qp.QuintMod(e, modulus)
     else:
-        raise ValueError(f'Incompatible argument combination.')
+        raise ValueError('Incompatible argument combination.')
 
     qureg = sink.global_sink.do_allocate(AllocArgs(
         qureg_name=name or '',
@@ -70,9 +92,10 @@ def qalloc(*,
     return wrap(qureg)
 
 
-def qfree(target: Union[qp.Qubit, qp.Qureg, qp.Quint],
+def qfree(target: Union[qp.Qubit, qp.Qureg, qp.Quint, qp.QuintMod, qp.QuintCoset],
           equivalent_expression: 'Union[None, bool, int, qp.RValue[Any]]' = None,
-          dirty: bool = False):
+          dirty: bool = False,
+          x_basis: bool = False):
     """Deallocates quantum objects.
 
     Args:
@@ -80,6 +103,7 @@ def qfree(target: Union[qp.Qubit, qp.Qureg, qp.Quint],
         equivalent_expression: An entangled expression with the same computational basis value as the quantum object.
             Used to uncompute the quantum object before freeing it, to avoid revealing information.
         dirty: Indicates that the quantum object is not expected to be zero'd.
+        x_basis: Indicates that the quantum object is released by measuring it in the X basis, instead of the Z basis.
     """
 
     if equivalent_expression is not None:
@@ -95,10 +119,14 @@ def qfree(target: Union[qp.Qubit, qp.Qureg, qp.Quint],
         reg = target.qureg
     elif isinstance(target, qp.QuintMod):
         reg = target.qureg
+    elif isinstance(target, qp.QuintCoset):
+        if not dirty:
+            target.clear_padding()
+        reg = target.qureg
     else:
         raise NotImplementedError()
     if len(reg):
-        sink.global_sink.do_release(qp.ReleaseQuregOperation(reg, dirty=dirty))
+        sink.global_sink.do_release(qp.ReleaseQuregOperation(reg, x_basis=x_basis, dirty=dirty))
 
 
 class AllocArgs:
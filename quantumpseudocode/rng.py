@@ -0,0 +1,61 @@
+import random
+from typing import Optional
+
+# Bits of precision used when turning a bias into a mask of biased bits.
+_BIAS_PRECISION = 32
+
+
+class Rng:
+    """A seeded source of randomness owned by one simulator, with whole-register draws.
+
+    Simulators draw from their own `Rng` instead of the global `random` module, so that concurrent simulations
+    don't interfere and any run can be replayed by passing the same seed.
+    """
+
+    def __init__(self, seed: Optional[int] = None):
+        """
+        Args:
+            seed: Determines every value drawn. Defaults to a fresh seed from the global `random` module, which is
+                kept in `self.seed` so the run can be reproduced.
+        """
+        if seed is None:
+            seed = random.getrandbits(64)
+        self.seed = seed
+        self._random = random.Random(seed)
+
+    def getrandbits(self, n: int) -> int:
+        """An integer with `n` uniformly random bits."""
+        return self._random.getrandbits(n) if n else 0
+
+    def random(self) -> float:
+        """A uniformly random float in [0, 1)."""
+        return self._random.random()
+
+    def bernoulli_mask(self, n: int, bias: float) -> int:
+        """An integer with `n` independent random bits, each set with probability `bias`.
+
+        Takes one `getrandbits(n)` call per significant bit of the bias (rounded to 32 bits of precision), instead
+        of one draw per bit of the result. Biases of 0, 1 and 1/2 take at most one call.
+        """
+        full = (1 << n) - 1
+        if n == 0 or bias <= 0:
+            return 0
+        if bias >= 1:
+            return full
+        p = round(bias * (1 << _BIAS_PRECISION))
+        if p == 0:
+            return 0
+        if p == 1 << _BIAS_PRECISION:
+            return full
+        # Process the binary digits of the bias from least to most significant. Or-ing with a fair mask maps a
+        # per-bit probability q to (1+q)/2 and and-ing maps it to q/2, which together build up the bias exactly.
+        digits = _BIAS_PRECISION
+        while not p & 1:
+            p >>= 1
+            digits -= 1
+        mask = 0
+        for _ in range(digits):
+            r = self._random.getrandbits(n)
+            mask = mask | r if p & 1 else mask & r
+            p >>= 1
+        return mask
@@ -0,0 +1,48 @@
+import pytest
+
+import quantumpseudocode as qp
+
+
+def test_seeded_draws_repeat():
+    a = qp.Rng(seed=123)
+    b = qp.Rng(seed=123)
+    assert [a.getrandbits(100) for _ in range(5)] == [b.getrandbits(100) for _ in range(5)]
+    assert a.bernoulli_mask(50, 0.3) == b.bernoulli_mask(50, 0.3)
+    assert qp.Rng().seed != qp.Rng().seed
+    assert qp.Rng(seed=5).getrandbits(0) == 0
+
+
+@pytest.mark.parametrize('bias', [0.1, 0.25, 1 / 3, 0.5, 0.9])
+def test_bernoulli_mask_bias(bias: float):
+    n = 200000
+    mask = qp.Rng(seed=1).bernoulli_mask(n, bias)
+    assert mask < 1 << n
+    assert abs(bin(mask).count('1') / n - bias) < 0.01
+
+
+def test_bernoulli_mask_extremes():
+    rng = qp.Rng(seed=2)
+    assert rng.bernoulli_mask(10, 0) == 0
+    assert rng.bernoulli_mask(10, 1) == 1023
+    assert rng.bernoulli_mask(0, 0.5) == 0
+
+
+def test_simulators_replay_from_seed():
+    def run(seed: int):
+        results = []
+        with qp.Sim(seed=seed) as sim:
+            a = qp.qalloc(len=20, x_basis=True, name='a')
+            results.append(qp.measure(a, reset=True))
+            qp.qfree(a)
+            b = qp.qalloc(len=20, name='b')
+            sim.randomize_location(b)
+            results.append(qp.measure(b, reset=True))
+            qp.qfree(b)
+        with qp.RandomSim(measure_bias=0.5, seed=seed):
+            c = qp.qalloc(len=20, name='c')
+            results.append(qp.measure(c))
+            qp.qfree(c, dirty=True)
+        return results
+
+    assert run(7) == run(7)
+    assert run(7) != run(8)
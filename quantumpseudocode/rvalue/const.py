@@ -80,13 +80,9 @@ class IntRValue(RValue[bool]):
             return other
 
         if isinstance(other, qp.Quint):
-            if self.val == 0:
-                return other
-            k = qp.leading_zero_bit_count(self.val)
-            qp.arithmetic.do_addition(
-                lvalue=other[k:],
-                offset=self.val >> k,
-                carry_in=False,
+            qp.arithmetic.do_plus_const(
+                lvalue=other,
+                offset=self.val,
                 control=controls)
             return other
         return NotImplemented
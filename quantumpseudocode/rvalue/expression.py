@@ -1,3 +1,4 @@
+import contextvars
 from typing import Optional, Tuple, Iterable, Any
 
 import cirq
@@ -90,10 +91,14 @@ class QubitIntersection(RValue[bool]):
     ALWAYS = None # type: QubitIntersection
     NEVER = None # type: QubitIntersection
 
+    # Whether to validate constructor arguments. Turned off in the context of an active `qp.Sim(checked=False)`.
+    checked: 'contextvars.ContextVar[bool]' = contextvars.ContextVar('qp_check_intersections', default=True)
+
     def __init__(self, qubits: Tuple['qp.Qubit', ...] = (), bit: bool = True):
-        assert all(isinstance(e, qp.Qubit) for e in qubits)
         self.qubits = tuple(qubits) if bit else ()
-        assert len(self.qubits) == len(set(self.qubits))
+        if QubitIntersection.checked.get():
+            assert all(isinstance(e, qp.Qubit) for e in qubits)
+            assert len(self.qubits) == len(set(self.qubits))
         self.bit = bool(bit)
 
     def resolve(self, sim_state: 'qp.ClassicalSimState', allow_mutate: bool) -> bool:
@@ -1,6 +1,7 @@
 from typing import Optional, Any, Union, Generic, TypeVar, List, Tuple, Iterable, overload
 
 import quantumpseudocode as qp
+from quantumpseudocode import profiler, sink
 
 
 T = TypeVar('T')
@@ -9,42 +10,48 @@ T = TypeVar('T')
 @overload
 def hold(val: 'qp.Qubit',
          name: Optional[str] = None,
-         controls: 'Optional[qp.QubitIntersection]' = None) -> 'qp.HeldRValueManager[bool]':
+         controls: 'Optional[qp.QubitIntersection]' = None,
+         reverse_tape: bool = False) -> 'qp.HeldRValueManager[bool]':
     pass
 
 
 @overload
 def hold(val: 'qp.Quint',
          name: Optional[str] = None,
-         controls: 'Optional[qp.QubitIntersection]' = None) -> 'qp.HeldRValueManager[int]':
+         controls: 'Optional[qp.QubitIntersection]' = None,
+         reverse_tape: bool = False) -> 'qp.HeldRValueManager[int]':
     pass
 
 
 @overload
 def hold(val: 'int',
          name: Optional[str] = None,
-         controls: 'Optional[qp.QubitIntersection]' = None) -> 'qp.HeldRValueManager[int]':
+         controls: 'Optional[qp.QubitIntersection]' = None,
+         reverse_tape: bool = False) -> 'qp.HeldRValueManager[int]':
     pass
 
 
 @overload
 def hold(val: 'bool',
          name: Optional[str] = None,
-         controls: 'Optional[qp.QubitIntersection]' = None) -> 'qp.HeldRValueManager[bool]':
+         controls: 'Optional[qp.QubitIntersection]' = None,
+         reverse_tape: bool = False) -> 'qp.HeldRValueManager[bool]':
     pass
 
 
 @overload
 def hold(val: 'qp.RValue[T]',
          name: Optional[str] = None,
-         controls: 'Optional[qp.QubitIntersection]' = None) -> 'qp.HeldRValueManager[T]':
+         controls: 'Optional[qp.QubitIntersection]' = None,
+         reverse_tape: bool = False) -> 'qp.HeldRValueManager[T]':
     pass
 
 
 def hold(val: Union[T, 'qp.RValue[T]', 'qp.Qubit', 'qp.Quint'],
          *,
          name: str = '',
-         controls: 'Optional[qp.QubitIntersection]' = None
+         controls: 'Optional[qp.QubitIntersection]' = None,
+         reverse_tape: bool = False
          ) -> 'qp.HeldRValueManager[T]':
     """Returns a context manager that ensures the given rvalue is allocated.
 
@@ -60,6 +67,13 @@ def hold(val: Union[T, 'qp.RValue[T]', 'qp.Qubit', 'qp.Quint'],
         name: Optional name to use when allocating space for the value.
         controls: If any of these are not set, the result is a default value
             (e.g. False or 0) instead of the rvalue.
+        reverse_tape: Records the operations that initialize the value, and
+            uncomputes it by emitting their inverses in reverse order instead
+            of calling the rvalue's `clear_storage_location`. If the recorded
+            operations include measurements (e.g. measurement based
+            uncomputation), falls back to `clear_storage_location`. Note that
+            the inverse costs as much as the initialization, which can be more
+            than a measurement based uncomputation would have cost.
 
     Returns:
         A qp.HeldRValueManager wrapping the given value.
@@ -67,16 +81,20 @@ def hold(val: Union[T, 'qp.RValue[T]', 'qp.Qubit', 'qp.Quint'],
     return qp.HeldRValueManager(
         qp.rval(val),
         controls=qp.QubitIntersection.ALWAYS if controls is None else controls,
-        name=name)
+        name=name,
+        reverse_tape=reverse_tape)
 
 
 class HeldRValueManager(Generic[T]):
     def __init__(self, rvalue: 'qp.RValue[T]',
                  *,
                  controls: 'qp.QubitIntersection' = None,
-                 name: str = ''):
+                 name: str = '',
+                 reverse_tape: bool = False):
         assert isinstance(name, str)
         self.name = name
+        self.reverse_tape = reverse_tape
+        self.tape = None  # type: Optional[List[Tuple[str, Any]]]
         self.rvalue = rvalue
         self.controls = controls if controls is not None else qp.QubitIntersection.ALWAYS
         self.location = None  # type: Optional[Any]
@@ -93,10 +111,117 @@ class HeldRValueManager(Generic[T]):
             self.location = self.rvalue.alloc_storage_location(self.name)
             self.qalloc = self.location
             self.qalloc.__enter__()
-            self.rvalue.init_storage_location(self.location, self.controls)
+            active = profiler._active.get()
+            if active is None:
+                self._init()
+            else:
+                active.push(f'{type(self.rvalue).__name__}.init_storage_location', self.name)
+                try:
+                    self._init()
+                finally:
+                    active.pop()
         return self.location
 
+    def _init(self):
+        if self.reverse_tape:
+            # Pick the adder before the lens is pushed, so recording doesn't change it.
+            strategy = qp.arithmetic.add._default_addition_strategy()
+            with qp.capture() as tape:
+                with qp.arithmetic.default_addition_strategy(strategy):
+                    self.rvalue.init_storage_location(self.location, self.controls)
+            if _is_reversible_tape(tape):
+                self.tape = tape
+        else:
+            self.rvalue.init_storage_location(self.location, self.controls)
+
     def __exit__(self, exc_type, exc_val, exc_tb):
         if self.qalloc is not None and exc_type is None:
-            self.rvalue.clear_storage_location(self.location, self.controls)
+            active = profiler._active.get()
+            if active is None:
+                self._clear()
+            else:
+                active.push(f'{type(self.rvalue).__name__}.clear_storage_location', self.name)
+                try:
+                    self._clear()
+                finally:
+                    active.pop()
             self.qalloc.__exit__(exc_type, exc_val, exc_tb)
+
+    def _clear(self):
+        if self.tape is not None:
+            _emit_inverse_tape(self.tape)
+            self.tape = None
+        else:
+            self.rvalue.clear_storage_location(self.location, self.controls)
+
+
+def _is_reversible_tape(tape: List[Tuple[str, Any]]) -> bool:
+    for kind, op in tape:
+        if kind in ('toggle', 'phase_flip'):
+            continue
+        if kind == 'alloc' and not op[0].x_basis:
+            continue
+        if kind == 'release' and not op.x_basis and not op.dirty:
+            continue
+        return False
+    return True
+
+
+def _emit_inverse_tape(tape: List[Tuple[str, Any]]):
+    """Emits the inverse of recorded operations, in reverse order.
+
+    Registers that were released during the recording are re-allocated, and renamed if the sink picks a new name.
+    """
+    renames = {}
+
+    def qubit(q: 'qp.Qubit') -> 'qp.Qubit':
+        name = renames.get(q.name)
+        return q if name is None else qp.Qubit(name, q.index)
+
+    def qureg(r: 'qp.Qureg') -> 'qp.Qureg':
+        if not renames:
+            return r
+        if isinstance(r, qp.NamedQureg):
+            return qp.NamedQureg(renames.get(r.name, r.name), len(r))
+        return qp.RawQureg(qubit(q) for q in r)
+
+    def controls(c: 'qp.QubitIntersection') -> 'qp.QubitIntersection':
+        if not renames:
+            return c
+        return qp.QubitIntersection(tuple(qubit(q) for q in c.qubits), c.bit)
+
+    toggles = []
+    flips = []
+
+    def flush():
+        if toggles:
+            sink.global_sink.do_toggle_batch(list(toggles))
+            toggles.clear()
+        if flips:
+            sink.global_sink.do_phase_flip_batch(list(flips))
+            flips.clear()
+
+    for kind, op in reversed(tape):
+        if kind == 'toggle':
+            if flips:
+                flush()
+            targets, cs = op
+            toggles.append((qureg(targets), controls(cs)))
+        elif kind == 'phase_flip':
+            if toggles:
+                flush()
+            flips.append(controls(op))
+        elif kind == 'release':
+            flush()
+            old = op.qureg
+            new = sink.global_sink.do_allocate(qp.AllocArgs(qureg_name=old.name, qureg_length=len(old)))
+            if new.name != old.name:
+                renames[old.name] = new.name
+        elif kind == 'alloc':
+            flush()
+            _, old = op
+            sink.global_sink.do_release(qp.ReleaseQuregOperation(qureg(old)))
+            renames.pop(old.name, None)
+        else:
+            raise NotImplementedError(kind)
+    flush()
@@ -0,0 +1,44 @@
+import quantumpseudocode as qp
+
+
+def test_reverse_tape_emits_exact_inverse():
+    with qp.Sim():
+        with qp.hold(13, name='a') as a:
+            for rval in [a == 13, a[0] & a[2]]:
+                with qp.capture() as ops:
+                    with qp.hold(rval, name='p', reverse_tape=True) as p:
+                        n = len(ops)
+                        assert qp.measure(p)
+                inner = ops[1:n]
+                undo = ops[n + 1:-1]
+                assert len(inner) > 0
+                assert undo == inner[::-1]
+
+
+def test_reverse_tape_falls_back_on_measurement():
+    with qp.Sim():
+        with qp.hold(13, name='a') as a:
+            with qp.arithmetic.default_addition_strategy('temp_and'):
+                with qp.capture() as ops:
+                    with qp.hold(a * 7, name='p', reverse_tape=True) as p:
+                        assert qp.measure(p) == 91
+    kinds = [k for k, _ in ops]
+    assert kinds.count('start_measurement_based_uncomputation') > 0
+
+
+def test_reverse_tape_restores_state():
+    for v in range(16):
+        with qp.Sim():
+            with qp.hold(v, name='a') as a:
+                with qp.hold(a == 6, name='e', reverse_tape=True) as e:
+                    assert qp.measure(e) == (v == 6)
+                assert qp.measure(a) == v
+
+
+def test_reverse_tape_keeps_default_addition_strategy():
+    def program(reverse_tape):
+        with qp.hold(13, name='a') as a:
+            with qp.hold(a * 7, name='p', reverse_tape=reverse_tape):
+                pass
+
+    assert qp.count_costs(program, True) == qp.count_costs(program, False)
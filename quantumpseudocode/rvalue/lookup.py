@@ -47,7 +47,7 @@ class LookupTable:
             return LookupTable(self.values[item])
         if isinstance(item, tuple):
             if all(isinstance(e, qp.Quint) for e in item):
-                reg = qp.RawQureg(q for e in item[::-1] for q in e)
+                reg = qp.ConcatQureg(e.qureg for e in item[::-1])
                 return qp.LookupRValue(self, qp.Quint(reg))
         if isinstance(item, qp.Quint):
             return qp.LookupRValue(self, item)
@@ -1,18 +1,27 @@
 import random
 
 import math
+from typing import Dict, Optional
 
 from quantumpseudocode import *
 
 
-def measure_pow_mod(base: int, exponent: Quint, modulus: int) -> int:
-    """Measure `base**exponent % modulus`, and nothing else."""
+def measure_pow_mod(base: int,
+                    exponent: Quint,
+                    modulus: int,
+                    exp_window: Optional[int] = None,
+                    mul_window: Optional[int] = None) -> int:
+    """Measure `base**exponent % modulus`, and nothing else.
+
+    The window sizes default to a fixed heuristic. Use `tune_measure_pow_mod_windows` to pick them for a cost
+    objective.
+    """
     assert modular_multiplicative_inverse(base, modulus) is not None
 
     n = ceil_lg2(modulus)  # Problem size in bits.
     g = ceil_lg2(n) // 3 + 1  # Group size for lookups.
-    g0 = g
-    g1 = g
+    g0 = g if exp_window is None else exp_window
+    g1 = g if mul_window is None else mul_window
     coset_len = n + 2 * ceil_lg2(n) + 10  # Extra bits to suppress deviation.
 
     # Initialize coset registers to starting state (a=1, b=0).
@@ -53,19 +62,37 @@ def measure_pow_mod(base: int, exponent: Quint, modulus: int) -> int:
     qfree(a, dirty=True)
     qfree(b, dirty=True)
 
-    return result % modulus
+    return result
 
 
-def make_coset_register(value: int, length: int, modulus: int) -> Quint:
-    reg = qalloc(len=length, name='coset')
-    reg ^= value % modulus
+def make_coset_register(value: int, length: int, modulus: int) -> QuintCoset:
+    reg = qalloc(modulus=modulus, coset_padding=length - (modulus - 1).bit_length(), name='coset')
+    reg.init(value)
+    return reg
 
-    # Add coherent multiple of modulus into reg.
-    pad_bits = length - modulus.bit_length()
-    for i in range(pad_bits):
-        offset = modulus << i
-        q = qalloc(x_basis=True)
-        reg += offset & controlled_by(q)
-        qfree(q, equivalent_expression=reg >= offset)
 
-    return reg
+def tune_measure_pow_mod_windows(exponent_len: int,
+                                 modulus_len: int,
+                                 objective: str = 'toffolis',
+                                 cache_path: Optional[str] = None,
+                                 max_window: Optional[int] = None) -> Dict[str, int]:
+    """Picks `exp_window` and `mul_window` arguments for `measure_pow_mod` at the given sizes.
+
+    The result is memoized in the json file at `cache_path`, if one is given.
+    """
+    if max_window is None:
+        max_window = ceil_lg2(modulus_len) + 1
+    modulus = (1 << (modulus_len - 1)) | 1
+    base = 3 if modulus % 3 else 5
+
+    def program(exp_window: int, mul_window: int):
+        exponent = qalloc(len=exponent_len, name='exponent')
+        measure_pow_mod(base, exponent, modulus, exp_window=exp_window, mul_window=mul_window)
+        qfree(exponent, dirty=True)
+
+    return tune_windows(
+        program,
+        {'exp_window': range(1, max_window + 1), 'mul_window': range(1, max_window + 1)},
+        objective,
+        cache_key='measure_pow_mod:{}:{}'.format(exponent_len, modulus_len),
+        cache_path=cache_path)
@@ -1,5 +1,4 @@
-import random
-from typing import List, Union, Callable, Any, Optional, Tuple, Set, Dict, Iterable
+from typing import List, Union, Callable, Any, Optional, Tuple, Set, Dict, Iterable, Sequence
 
 import quantumpseudocode as qp
 import quantumpseudocode.ops.operation
@@ -9,19 +8,66 @@ def _toggle_targets(lvalue: 'qp.Qureg') -> 'qp.Qureg':
     return lvalue
 
 
+class SimCheckpoint:
+    """A saved `qp.Sim` state. Created by `Sim.snapshot` and consumed by `Sim.restore`."""
+
+    def __init__(self,
+                 int_state: Dict[str, 'qp.IntBuf'],
+                 phase_degrees: int,
+                 anon_alloc_counter: int):
+        self._int_state = int_state
+        self._phase_degrees = phase_degrees
+        self._anon_alloc_counter = anon_alloc_counter
+
+
 class Sim(quantumpseudocode.sink.Sink, quantumpseudocode.ops.operation.ClassicalSimState):
     def __init__(self,
                  enforce_release_at_zero: bool = True,
                  phase_fixup_bias: Optional[bool] = None,
-                 emulate_additions: bool = False):
+                 emulate_additions: bool = False,
+                 checked: bool = True,
+                 seed: Optional[int] = None):
+        """
+        Args:
+            enforce_release_at_zero: Raise an error when a register is released without being zero'd.
+            phase_fixup_bias: Fixes the result of X basis measurements instead of picking them at random.
+            emulate_additions: Use classical emulation for additions instead of simulating their operations.
+            checked: When False, state is stored in `qp.UncheckedIntBuf`s and sanity checks on buffer writes,
+                toggles and qubit intersections are skipped. Faster, but errors may go unnoticed.
+            seed: Seeds the simulator's `qp.Rng`, which makes every random choice (X basis allocations,
+                measurement based uncomputation results, `randomize_location`). Available afterwards as
+                `self.rng.seed`.
+        """
         super().__init__()
+        self.checked = checked
+        self._buf_type = qp.IntBuf if checked else qp.UncheckedIntBuf
+        self._intersection_checks_token = None
         self._int_state: Dict[str, 'qp.IntBuf'] = {}
         self.enforce_release_at_zero = enforce_release_at_zero
         self.phase_fixup_bias = phase_fixup_bias
         self.emulate_additions = emulate_additions
+        self.rng = qp.Rng(seed)
         self._phase_degrees = 0
         self._anon_alloc_counter = 0
 
+        # Copy-on-write bookkeeping. After a snapshot the state dict and its buffers are shared with the checkpoint;
+        # the dict is copied on the first structural change and each buffer on its first write.
+        self._cow = False
+        self._dict_shared = False
+        self._owned: Set[str] = set()
+
+    def __enter__(self):
+        result = super().__enter__()
+        if not self.checked:
+            self._intersection_checks_token = qp.QubitIntersection.checked.set(False)
+        return result
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if not self.checked:
+            qp.QubitIntersection.checked.reset(self._intersection_checks_token)
+            self._intersection_checks_token = None
+        super().__exit__(exc_type, exc_val, exc_tb)
+
     @property
     def phase_degrees(self):
         return self._phase_degrees
@@ -30,23 +76,58 @@ class Sim(quantumpseudocode.sink.Sink, quantumpseudocode.ops.operation.Classical
     def phase_degrees(self, new_value):
         self._phase_degrees = new_value % 360
 
-    def snapshot(self):
-        return dict(self._int_state)
+    def snapshot(self) -> SimCheckpoint:
+        """Saves the current state in O(1) time.
+
+        Buffers are shared with the returned checkpoint, and only copied when they are next written to.
+        """
+        self._cow = True
+        self._dict_shared = True
+        self._owned = set()
+        return SimCheckpoint(self._int_state, self._phase_degrees, self._anon_alloc_counter)
+
+    def restore(self, checkpoint: SimCheckpoint):
+        """Returns to a state saved by `snapshot`. The checkpoint can be restored again later."""
+        self._int_state = checkpoint._int_state
+        self._phase_degrees = checkpoint._phase_degrees
+        self._anon_alloc_counter = checkpoint._anon_alloc_counter
+        self._cow = True
+        self._dict_shared = True
+        self._owned = set()
+
+    def _thaw(self):
+        if self._dict_shared:
+            self._int_state = dict(self._int_state)
+            self._dict_shared = False
+
+    def _own(self, name: str) -> 'qp.IntBuf':
+        """Returns the buffer for a register, first copying it if it is shared with a checkpoint."""
+        if not self._cow or name in self._owned:
+            return self._int_state[name]
+        self._thaw()
+        buf = self._int_state[name].copy()
+        self._int_state[name] = buf
+        self._owned.add(name)
+        return buf
+
+    def _peek(self, name: str) -> 'qp.IntBuf':
+        """Returns the buffer for a register without copying it. The result must not be mutated."""
+        return self._int_state[name]
 
     def _read_qubit(self, qubit: 'qp.Qubit') -> bool:
-        return self._int_state[qubit.name][qubit.index or 0]
+        return self._peek(qubit.name)[qubit.index or 0]
 
     def _write_qubit(self, qubit: 'qp.Qubit', new_val: bool):
-        self._int_state[qubit.name][qubit.index or 0] = new_val
+        self._own(qubit.name)[qubit.index or 0] = new_val
 
-    def quint_buf(self, quint: 'qp.Quint') -> qp.IntBuf:
+    def quint_buf(self, quint: 'qp.Quint', allow_mutate: bool = True) -> qp.IntBuf:
         if len(quint) == 0:
             return qp.IntBuf.raw(val=0, length=0)
+        get = self._own if allow_mutate else self._peek
         if isinstance(quint.qureg, qp.NamedQureg):
-            return self._int_state[quint.qureg.name]
-        fused = _fuse(quint.qureg)
-        return qp.IntBuf(qp.RawConcatBuffer.balanced_concat([
-            self._int_state[name][rng]._buf for name, rng in fused
+            return get(quint.qureg.name)
+        return self._buf_type(qp.RawRopeBuffer([
+            get(name)[r.start:r.stop]._buf for name, r in quint.qureg.runs()
         ]))
 
     def resolve_location(self, loc: Any, allow_mutate: bool = True):
@@ -60,13 +141,11 @@ class Sim(quantumpseudocode.sink.Sink, quantumpseudocode.ops.operation.Classical
 
     def randomize_location(self, loc: Union[qp.Quint, qp.Qubit, qp.Qureg]):
         if isinstance(loc, qp.Qubit):
-            self._write_qubit(loc, random.random() < 0.5)
+            self._write_qubit(loc, bool(self.rng.getrandbits(1)))
         elif isinstance(loc, qp.Qureg):
-            for q in loc:
-                self._write_qubit(q, random.random() < 0.5)
+            self.quint_buf(qp.Quint(loc))[:] = self.rng.getrandbits(len(loc))
         elif isinstance(loc, qp.Quint):
-            for q in loc:
-                self._write_qubit(q, random.random() < 0.5)
+            self.quint_buf(loc)[:] = self.rng.getrandbits(len(loc))
         elif isinstance(loc, qp.ControlledRValue):
             if self.resolve_location(loc.controls):
                 self.randomize_location(loc.rvalue)
@@ -77,7 +156,7 @@ class Sim(quantumpseudocode.sink.Sink, quantumpseudocode.ops.operation.Classical
     def measurement_based_uncomputation_result_chooser(self) -> Callable[[], bool]:
         if self.phase_fixup_bias is not None:
             return lambda: self.phase_fixup_bias
-        return lambda: random.random() < 0.5
+        return lambda: bool(self.rng.getrandbits(1))
 
     def do_allocate(self, args: 'qp.AllocArgs') -> 'qp.Qureg':
         if args.qureg_name is None:
@@ -95,8 +174,10 @@ class Sim(quantumpseudocode.sink.Sink, quantumpseudocode.ops.operation.Classical
                 k += 1
             name = candidate
         result = qp.NamedQureg(name=name, length=args.qureg_length)
-        self._int_state[result.name] = qp.IntBuf.raw(
-            val=random.randint(0, (1 << args.qureg_length) - 1) if args.x_basis else 0,
+        self._thaw()
+        self._owned.add(result.name)
+        self._int_state[result.name] = self._buf_type.raw(
+            val=self.rng.getrandbits(args.qureg_length) if args.x_basis else 0,
             length=args.qureg_length)
         return result
 
@@ -111,10 +192,12 @@ class Sim(quantumpseudocode.sink.Sink, quantumpseudocode.ops.operation.Classical
 
         assert isinstance(op.qureg, qp.NamedQureg)
         assert op.qureg.name in self._int_state
+        self._thaw()
+        self._owned.discard(op.qureg.name)
         del self._int_state[op.qureg.name]
 
     def do_measure(self, qureg: 'qp.Qureg', reset: bool) -> int:
-        reg = self.quint_buf(qp.Quint(qureg))
+        reg = self.quint_buf(qp.Quint(qureg), allow_mutate=reset)
         result = int(reg)
         if reset:
             reg[:] = 0
@@ -128,12 +211,10 @@ class Sim(quantumpseudocode.sink.Sink, quantumpseudocode.ops.operation.Classical
         z_result = self.do_measure(qureg, reset=True)
 
         # Simulate X basis measurements.
-        chooser = self.measurement_based_uncomputation_result_chooser()
-        x_result = 0
-        for i in range(len(qureg))[::-1]:
-            x_result <<= 1
-            if chooser():
-                x_result |= 1
+        if self.phase_fixup_bias is None:
+            x_result = self.rng.getrandbits(len(qureg))
+        else:
+            x_result = (1 << len(qureg)) - 1 if self.phase_fixup_bias else 0
         if qp.popcnt(x_result & z_result) & 1:
             self.phase_degrees += 180
 
@@ -146,34 +227,41 @@ class Sim(quantumpseudocode.sink.Sink, quantumpseudocode.ops.operation.Classical
         if self.phase_degrees != start.context:
             raise AssertionError('Failed to uncompute. Measurement based uncomputation failed to fix phase flips.')
 
+    def supports_measurement_based_uncomputation(self) -> bool:
+        return True
+
     def do_phase_flip(self, controls: 'qp.QubitIntersection'):
         if self.resolve_location(controls, allow_mutate=False):
             self.phase_degrees += 180
 
     def do_toggle(self, targets: 'qp.Qureg', controls: 'qp.QubitIntersection'):
-        assert set(targets).isdisjoint(controls.qubits)
+        if self.checked:
+            assert set(targets).isdisjoint(controls.qubits)
         if controls.bit and all(self._read_qubit(q) for q in controls.qubits):
             for t in targets:
                 self._write_qubit(t, not self._read_qubit(t))
 
+    def do_phase_flip_batch(self, ops: Sequence['qp.QubitIntersection']):
+        state = self._int_state
+        flips = 0
+        for controls in ops:
+            if controls.bit and all(state[q.name][q.index or 0] for q in controls.qubits):
+                flips += 1
+        if flips & 1:
+            self.phase_degrees += 180
 
-def _fuse(qubits: Iterable[qp.Qubit]) -> List[Tuple[str, slice]]:
-    result: List[Tuple[str, slice]] = []
-    cur_name = None
-    cur_start = None
-    cur_end = None
-
-    def flush():
-        if cur_name is not None and cur_end > cur_start:
-            result.append((cur_name, slice(cur_start, cur_end)))
-
-    for q in qubits:
-        if q.name == cur_name and q.index == cur_end:
-            cur_end += 1
-        else:
-            flush()
-            cur_name = q.name
-            cur_start = q.index or 0
-            cur_end = cur_start + 1
-    flush()
-    return result
+    def do_toggle_batch(self, ops: Sequence[Tuple['qp.Qureg', 'qp.QubitIntersection']]):
+        self._thaw()
+        state = self._int_state
+        own = self._own if self._cow else state.__getitem__
+        checked = self.checked
+        for targets, controls in ops:
+            if not controls.bit:
+                continue
+            if checked:
+                assert set(targets).isdisjoint(controls.qubits)
+            if all(state[q.name][q.index or 0] for q in controls.qubits):
+                for t in targets:
+                    buf = own(t.name)
+                    i = t.index or 0
+                    buf[i] = not buf[i]
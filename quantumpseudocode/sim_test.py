@@ -1,3 +1,7 @@
+import threading
+
+import pytest
+
 import quantumpseudocode as qp
 
 
@@ -31,3 +35,109 @@ def test_count():
     assert counts[0] > 0
     assert counts[1] > 0
     assert 0 < counts[2] <= 1000
+
+
+def test_toggle_batch():
+    with qp.Sim() as sim:
+        with qp.CountNots() as counts:
+            with qp.capture() as out:
+                with qp.qalloc(len=3, name='a') as a:
+                    qp.sink.global_sink.do_toggle_batch([
+                        (a[0].qureg, qp.QubitIntersection.ALWAYS),
+                        (a[1].qureg, qp.QubitIntersection((a[0],))),
+                        (a[2].qureg, a[0] & a[1]),
+                        (a[0].qureg, qp.QubitIntersection.NEVER),
+                    ])
+                    assert qp.measure(a) == 7
+                    qp.sink.global_sink.do_phase_flip_batch([
+                        a[0] & a[1],
+                        qp.QubitIntersection((a[2],)),
+                        qp.QubitIntersection.ALWAYS,
+                    ])
+                    assert sim.phase_degrees == 180
+                    qp.measure(a, reset=True)
+    assert counts == {0: 2, 1: 2, 2: 1}
+    assert [e for e, _ in out].count('toggle') == 4
+    assert [e for e, _ in out].count('phase_flip') == 3
+
+
+def test_snapshot_restore():
+    with qp.Sim(enforce_release_at_zero=False) as sim:
+        a = qp.qalloc(len=8, name='a')
+        b = qp.qalloc(len=8, name='b')
+        a ^= 5
+        b += a * 3
+        checkpoint = sim.snapshot()
+
+        for k in range(1, 4):
+            a += k
+            b ^= a
+            c = qp.qalloc(len=4, name='c')
+            c ^= k
+            qp.qfree(b, dirty=True)
+            assert qp.measure(a) == 5 + k
+            assert qp.measure(c) == k
+            sim.restore(checkpoint)
+            assert qp.measure(a) == 5
+            assert qp.measure(b) == 15
+
+        # Windows spanning several registers also copy before writing.
+        sim.restore(checkpoint)
+        mixed = qp.Quint(qp.RawQureg([a[0], b[0], a[1]]))
+        mixed ^= 7
+        assert qp.measure(a) == 6
+        assert qp.measure(b) == 14
+        sim.restore(checkpoint)
+        assert qp.measure(a) == 5
+        assert qp.measure(b) == 15
+
+
+def test_snapshot_reads_do_not_copy():
+    with qp.Sim(enforce_release_at_zero=False) as sim:
+        a = qp.qalloc(len=8, name='a')
+        b = qp.qalloc(len=8, name='b')
+        a ^= 5
+        checkpoint = sim.snapshot()
+
+        assert qp.measure(a) == 5
+        b ^= a
+        b[7] ^= a[0] & a[2]
+        assert qp.measure(b) == 133
+        assert sim._int_state['a'] is checkpoint._int_state['a']
+        assert sim._int_state['b'] is not checkpoint._int_state['b']
+
+
+def test_unchecked_sim():
+    for checked in [False, True]:
+        with qp.Sim(checked=checked) as sim:
+            assert qp.QubitIntersection.checked.get() == checked
+            with qp.hold(val=15, name='a') as a:
+                with qp.qalloc(len=10, name='out') as out:
+                    assert isinstance(sim.quint_buf(out), qp.UncheckedIntBuf) != checked
+                    out += a * 235
+                    out += 4
+                    assert qp.measure(out, reset=True) == (15 * 235 + 4) & 1023
+        assert qp.QubitIntersection.checked.get()
+
+
+def test_unchecked_sim_does_not_leak_into_other_threads():
+    seen = []
+    with qp.Sim(checked=False):
+        thread = threading.Thread(target=lambda: seen.append(qp.QubitIntersection.checked.get()))
+        thread.start()
+        thread.join()
+        assert not qp.QubitIntersection.checked.get()
+    assert seen == [True]
+    assert qp.QubitIntersection.checked.get()
+
+
+def test_x_basis_release_is_checked():
+    with qp.Sim():
+        q = qp.qalloc(name='q')
+        q ^= 1
+        with pytest.raises(ValueError, match='Failed to uncompute'):
+            qp.qfree(q, x_basis=True)
+    with qp.Sim():
+        q = qp.qalloc(name='q')
+        q ^= 1
+        qp.qfree(q, x_basis=True, dirty=True)
@@ -1,7 +1,7 @@
 import abc
+import contextvars
 import dataclasses
-import random
-from typing import List, Optional, ContextManager, cast, Tuple, Union, Any
+from typing import List, Optional, ContextManager, cast, Tuple, Union, Any, Sequence
 
 import quantumpseudocode as qp
 
@@ -52,6 +52,25 @@ class Sink(metaclass=abc.ABCMeta):
     def do_toggle(self, targets: 'qp.Qureg', controls: 'qp.QubitIntersection'):
         pass
 
+    def do_phase_flip_batch(self, ops: Sequence['qp.QubitIntersection']):
+        """Applies several phase flips, in order.
+
+        Sinks that can process many phase flips at once should override this. The default implementation
+        forwards each phase flip to `do_phase_flip`.
+        """
+        for controls in ops:
+            self.do_phase_flip(controls)
+
+    def do_toggle_batch(self, ops: Sequence[Tuple['qp.Qureg', 'qp.QubitIntersection']]):
+        """Applies several toggles, in order.
+
+        Arithmetic routines use this to emit whole sweeps (e.g. the carry sweep of an adder) in one call. Sinks that
+        can process a sweep at once should override this. The default implementation forwards each
+        `(targets, controls)` pair to `do_toggle`.
+        """
+        for targets, controls in ops:
+            self.do_toggle(targets, controls)
+
     @abc.abstractmethod
     def do_measure(self, qureg: 'qp.Qureg', reset: bool) -> int:
         pass
@@ -72,6 +91,16 @@ class Sink(metaclass=abc.ABCMeta):
     def do_end_measurement_based_uncomputation(self, qureg: 'qp.Qureg', start: 'qp.StartMeasurementBasedUncomputationResult'):
         pass
 
+    def supports_measurement_based_uncomputation(self) -> bool:
+        """Whether arithmetic may uncompute ancillae with X basis measurements and phase fixups under this sink.
+
+        Constructions that rely on measurement based uncomputation for their cost (e.g. temporary-AND adders) are
+        only chosen by default when the primary sink (the first one entered, which performs the operations) returns
+        True. Observers entered after it record whatever circuit it runs, so they can't change the program.
+        Defaults to False. Simulators override this.
+        """
+        return False
+
     def _val(self):
         return self
 
@@ -81,26 +110,41 @@ class Sink(metaclass=abc.ABCMeta):
     def __enter__(self):
         assert not self.used
         self.used = True
-        global_sink.sinks.append(self)
+        global_sink.push(self)
         return self._val()
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        assert global_sink.sinks[-1] is self
-        global_sink.sinks.pop()
+        global_sink.pop(self)
         if exc_type is None:
             self._succeeded()
 
 
 class RandomSim(Sink):
-    def __init__(self, measure_bias: float):
+    def __init__(self, measure_bias: float, seed: Optional[int] = None):
         super().__init__()
         self.measure_bias = measure_bias
+        self.rng = qp.Rng(seed)
+        self._live_names = set()
+
+    def do_allocate(self, args: 'qp.AllocArgs') -> 'qp.Qureg':
+        # Registers that are alive at the same time need distinct names.
+        name = args.qureg_name or ''
+        if name in self._live_names:
+            k = 1
+            while f'{name}_{k}' in self._live_names:
+                k += 1
+            name = f'{name}_{k}'
+        self._live_names.add(name)
+        result = qp.NamedQureg(name, length=args.qureg_length)
+        self.did_allocate(args, result)
+        return result
 
     def did_allocate(self, args: 'qp.AllocArgs', qureg: 'qp.Qureg'):
         pass
 
     def do_release(self, op: 'qp.ReleaseQuregOperation'):
-        pass
+        if isinstance(op.qureg, qp.NamedQureg):
+            self._live_names.discard(op.qureg.name)
 
     def do_phase_flip(self, controls: 'qp.QubitIntersection'):
         pass
@@ -108,9 +152,14 @@ class RandomSim(Sink):
     def do_toggle(self, targets: 'qp.Qureg', controls: 'qp.QubitIntersection'):
         pass
 
+    def do_phase_flip_batch(self, ops: Sequence['qp.QubitIntersection']):
+        pass
+
+    def do_toggle_batch(self, ops: Sequence[Tuple['qp.Qureg', 'qp.QubitIntersection']]):
+        pass
+
     def do_measure(self, qureg: 'qp.Qureg', reset: bool) -> int:
-        bits = tuple(random.random() < self.measure_bias for _ in range(len(qureg)))
-        result = qp.little_endian_int(bits)
+        result = self.rng.bernoulli_mask(len(qureg), self.measure_bias)
         self.did_measure(qureg, reset, result)
         return result
 
@@ -126,14 +175,16 @@ class RandomSim(Sink):
     def do_end_measurement_based_uncomputation(self, qureg: 'qp.Qureg', start: 'qp.StartMeasurementBasedUncomputationResult'):
         pass
 
+    def supports_measurement_based_uncomputation(self) -> bool:
+        return True
+
 
 class CaptureLens(Sink):
     def __init__(self, out: List[Tuple[str, Any]]):
         super().__init__()
         self.out = out
 
-    def __enter__(self):
-        super().__enter__()
+    def _val(self):
         return self.out
 
     def did_allocate(self, args: 'qp.AllocArgs', qureg: 'qp.Qureg'):
@@ -148,6 +199,12 @@ class CaptureLens(Sink):
     def do_toggle(self, targets: 'qp.Qureg', controls: 'qp.QubitIntersection'):
         self.out.append(('toggle', (targets, controls)))
 
+    def do_phase_flip_batch(self, ops: Sequence['qp.QubitIntersection']):
+        self.out.extend(('phase_flip', controls) for controls in ops)
+
+    def do_toggle_batch(self, ops: Sequence[Tuple['qp.Qureg', 'qp.QubitIntersection']]):
+        self.out.extend(('toggle', op) for op in ops)
+
     def do_measure(self, qureg: 'qp.Qureg', reset: bool) -> int:
         raise NotImplementedError()
 
@@ -164,56 +221,90 @@ class CaptureLens(Sink):
         self.out.append(('end_measurement_based_uncomputation', (qureg, start)))
 
 
+# The entered sinks, innermost last. Each thread and asyncio task has its own stack. Tasks start with the stack of
+# the code that created them, but sinks they enter are not seen outside of them.
+_sink_stack: 'contextvars.ContextVar[Tuple[qp.Sink, ...]]' = contextvars.ContextVar('qp_sink_stack', default=())
+
+
 class _GlobalSink(Sink):
-    def __init__(self):
-        super().__init__()
-        self.sinks: List['qp.Sink'] = []
+    """Forwards operations to the sinks entered by the current thread or asyncio task."""
+
+    @property
+    def sinks(self) -> Tuple['qp.Sink', ...]:
+        return _sink_stack.get()
+
+    def push(self, sink: 'qp.Sink'):
+        _sink_stack.set(_sink_stack.get() + (sink,))
+
+    def pop(self, sink: 'qp.Sink'):
+        stack = _sink_stack.get()
+        assert stack and stack[-1] is sink
+        _sink_stack.set(stack[:-1])
 
     def do_allocate(self, args: 'qp.AllocArgs') -> 'qp.Qureg':
-        result = self.sinks[0].do_allocate(args)
-        for sink in self.sinks[1:]:
+        sinks = _sink_stack.get()
+        result = sinks[0].do_allocate(args)
+        for sink in sinks[1:]:
             sink.did_allocate(args, result)
         return result
 
     def did_allocate(self, args: 'qp.AllocArgs', qureg: 'qp.Qureg'):
-        for sink in self.sinks:
+        for sink in _sink_stack.get():
             sink.did_allocate(args, qureg)
 
     def do_release(self, op: 'qp.ReleaseQuregOperation'):
-        for sink in self.sinks:
+        for sink in _sink_stack.get():
             sink.do_release(op)
 
     def do_phase_flip(self, controls: 'qp.QubitIntersection'):
-        for sink in self.sinks:
+        for sink in _sink_stack.get():
             sink.do_phase_flip(controls)
 
     def do_toggle(self, targets: 'qp.Qureg', controls: 'qp.QubitIntersection'):
-        for sink in self.sinks:
+        for sink in _sink_stack.get():
             sink.do_toggle(targets, controls)
 
+    def do_phase_flip_batch(self, ops: Sequence['qp.QubitIntersection']):
+        if not ops:
+            return
+        for sink in _sink_stack.get():
+            sink.do_phase_flip_batch(ops)
+
+    def do_toggle_batch(self, ops: Sequence[Tuple['qp.Qureg', 'qp.QubitIntersection']]):
+        if not ops:
+            return
+        for sink in _sink_stack.get():
+            sink.do_toggle_batch(ops)
+
     def do_measure(self, qureg: 'qp.Qureg', reset: bool) -> int:
-        result = self.sinks[0].do_measure(qureg, reset)
-        for sink in self.sinks[1:]:
+        sinks = _sink_stack.get()
+        result = sinks[0].do_measure(qureg, reset)
+        for sink in sinks[1:]:
             sink.did_measure(qureg, reset, result)
         return result
 
     def did_measure(self, qureg: 'qp.Qureg', reset: bool, result: int):
-        for sink in self.sinks:
+        for sink in _sink_stack.get():
             sink.did_measure(qureg, reset, result)
 
     def do_start_measurement_based_uncomputation(self, qureg: 'qp.Qureg') -> 'qp.StartMeasurementBasedUncomputationResult':
-        result = self.sinks[0].do_start_measurement_based_uncomputation(qureg)
-        for sink in self.sinks[1:]:
+        sinks = _sink_stack.get()
+        result = sinks[0].do_start_measurement_based_uncomputation(qureg)
+        for sink in sinks[1:]:
             sink.did_start_measurement_based_uncomputation(qureg, result)
         return result
 
     def did_start_measurement_based_uncomputation(self, qureg: 'qp.Qureg', result: 'qp.StartMeasurementBasedUncomputationResult'):
-        for sink in self.sinks:
+        for sink in _sink_stack.get():
             sink.did_start_measurement_based_uncomputation(qureg, result)
 
     def do_end_measurement_based_uncomputation(self, qureg: 'qp.Qureg', start: 'qp.StartMeasurementBasedUncomputationResult'):
-        for sink in self.sinks:
+        for sink in _sink_stack.get():
             sink.do_end_measurement_based_uncomputation(qureg, start)
 
+    def supports_measurement_based_uncomputation(self) -> bool:
+        sinks = _sink_stack.get()
+        return bool(sinks) and sinks[0].supports_measurement_based_uncomputation()
+
 
 global_sink = _GlobalSink()
@@ -0,0 +1,81 @@
+import asyncio
+import threading
+
+import quantumpseudocode as qp
+from quantumpseudocode import sink
+
+
+def test_threads_have_separate_stacks():
+    barrier = threading.Barrier(2)
+    results = {}
+
+    def run(k: int):
+        with qp.Sim():
+            a = qp.qalloc(len=8, name='a')
+            a.init(k)
+            barrier.wait()
+            for _ in range(20):
+                a += k
+            barrier.wait()
+            results[k] = qp.measure(a, reset=True)
+            qp.qfree(a)
+
+    threads = [threading.Thread(target=run, args=(k,)) for k in [3, 5]]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == {3: 3 * 21 % 256, 5: 5 * 21 % 256}
+    assert not sink.global_sink.sinks
+
+
+def test_asyncio_tasks_have_separate_stacks():
+    async def run(k: int) -> int:
+        with qp.Sim():
+            a = qp.qalloc(len=8, name='a')
+            a.init(k)
+            for _ in range(5):
+                await asyncio.sleep(0)
+                a += k
+            result = qp.measure(a, reset=True)
+            qp.qfree(a)
+            return result
+
+    async def main():
+        return await asyncio.gather(run(3), run(7))
+
+    assert asyncio.run(main()) == [18, 42]
+    assert not sink.global_sink.sinks
+
+
+def test_tasks_inherit_enclosing_sinks():
+    async def child():
+        q = qp.qalloc(name='q')
+        q ^= 1
+        result = qp.measure(q, reset=True)
+        qp.qfree(q)
+        return result
+
+    async def main():
+        with qp.Sim():
+            with qp.CountNots() as counts:
+                result = await asyncio.create_task(child())
+                assert len(sink.global_sink.sinks) == 2
+        return result, counts
+
+    result, counts = asyncio.run(main())
+    assert result
+    assert counts[0] == 1
+
+
+def test_random_sim_gives_live_registers_distinct_names():
+    with qp.RandomSim(measure_bias=1):
+        a = qp.qalloc(len=2, name='t')
+        b = qp.qalloc(len=2, name='t')
+        assert a.qureg != b.qureg
+        assert not set(a.qureg) & set(b.qureg)
+        qp.qfree(a)
+        c = qp.qalloc(len=2, name='t')
+        assert not set(b.qureg) & set(c.qureg)
+        qp.qfree(b)
+        qp.qfree(c)
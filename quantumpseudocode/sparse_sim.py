@@ -0,0 +1,275 @@
+import math
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+import quantumpseudocode as qp
+from quantumpseudocode import sink
+
+
+class SparseSim(sink.Sink):
+    """Simulates a superposition of computational basis states, stored as a sparse map from state to amplitude.
+
+    Each basis state is a row of bit-packed 64 bit words, with every live qubit stored in one bit. Toggles permute
+    the rows and phase flips negate amplitudes, over all branches at once using vectorized operations. Programs
+    that only branch a little (e.g. by allocating a few registers in the X basis) can be checked on every branch at
+    the same time, instead of on one sampled branch like `qp.Sim`.
+
+    Measurement based uncomputation is verified: if the measured register was a function of the rest of the
+    state, the phase fixups must exactly restore the amplitudes from before the measurement.
+    """
+
+    def __init__(self,
+                 enforce_release_at_zero: bool = True,
+                 phase_fixup_bias: Optional[bool] = None,
+                 atol: float = 1e-8,
+                 seed: Optional[int] = None):
+        super().__init__()
+        self.rng = qp.Rng(seed)
+        self.enforce_release_at_zero = enforce_release_at_zero
+        self.phase_fixup_bias = phase_fixup_bias
+        self.atol = atol
+        self._keys = np.zeros((1, 1), dtype=np.uint64)
+        self._amps = np.ones(1, dtype=np.complex128)
+        self._layout: Dict[str, Tuple[int, int]] = {}
+        self._used = 0
+        self._anon_alloc_counter = 0
+
+    def branch_count(self) -> int:
+        """The number of basis states with non-zero amplitude."""
+        return len(self._amps)
+
+    def amplitudes(self, quint: 'qp.Quint') -> Dict[int, complex]:
+        """The total amplitude of each value of the given quint, for a state where it isn't entangled."""
+        positions = self._positions(quint.qureg)
+        result: Dict[int, complex] = {}
+        for row, a in zip(self._keys, self._amps):
+            v = _extract(row, positions)
+            result[v] = result.get(v, 0) + complex(a)
+        return result
+
+    def _positions(self, qureg: 'qp.Qureg') -> List[int]:
+        if isinstance(qureg, qp.NamedQureg):
+            offset, length = self._layout[qureg.name]
+            assert len(qureg) == length
+            return list(range(offset, offset + length))
+        layout = self._layout
+        return [layout[name][0] + i for name, r in qureg.runs() for i in r]
+
+    def _words(self, positions: Iterable[int]) -> np.ndarray:
+        m = 0
+        for p in positions:
+            m |= 1 << p
+        return self._words_of(m)
+
+    def _words_of(self, m: int) -> np.ndarray:
+        w = self._keys.shape[1]
+        return np.array([(m >> (64 * i)) & 0xFFFFFFFFFFFFFFFF for i in range(w)], dtype=np.uint64)
+
+    def _qubit_words(self, qubits: Iterable['qp.Qubit']) -> np.ndarray:
+        layout = self._layout
+        return self._words(layout[q.name][0] + (q.index or 0) for q in qubits)
+
+    def _hit(self, c: np.ndarray) -> Optional[np.ndarray]:
+        """Which rows have all of the given bits set. None means all of them."""
+        hit = None
+        for i in np.flatnonzero(c):
+            h = (self._keys[:, i] & c[i]) == c[i]
+            hit = h if hit is None else hit & h
+        return hit
+
+    def _merge(self, keys: np.ndarray, amps: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Combines the amplitudes of duplicate rows and drops negligible ones."""
+        _, index, inverse = np.unique(_row_ids(keys), return_index=True, return_inverse=True)
+        keys = keys[index]
+        merged = np.zeros(len(keys), dtype=np.complex128)
+        np.add.at(merged, inverse, amps)
+        keep = np.abs(merged) > self.atol
+        return keys[keep], merged[keep]
+
+    def _set_state(self, keys: np.ndarray, amps: np.ndarray):
+        norm = float(np.sum(np.abs(amps)**2))
+        if abs(norm - 1) > 1e-12:
+            amps = amps / math.sqrt(norm)
+        self._keys = keys
+        self._amps = amps
+
+    def do_allocate(self, args: 'qp.AllocArgs') -> 'qp.Qureg':
+        if args.qureg_name is None:
+            name = f'_anon_{self._anon_alloc_counter}'
+            self._anon_alloc_counter += 1
+        else:
+            name = args.qureg_name
+        if name in self._layout:
+            k = 1
+            while f'{name}_{k}' in self._layout:
+                k += 1
+            name = f'{name}_{k}'
+
+        n = args.qureg_length
+        block = (1 << n) - 1
+        offset = 0
+        while (self._used >> offset) & block:
+            offset += 1
+        self._layout[name] = (offset, n)
+        self._used |= block << offset
+
+        words_needed = max(1, -(-(offset + n) // 64))
+        if words_needed > self._keys.shape[1]:
+            extra = words_needed - self._keys.shape[1]
+            self._keys = np.hstack([self._keys, np.zeros((len(self._keys), extra), dtype=np.uint64)])
+
+        if args.x_basis and n:
+            values = np.array([self._words_of(v << offset) for v in range(1 << n)], dtype=np.uint64)
+            keys = np.repeat(self._keys, 1 << n, axis=0) | np.tile(values, (len(self._keys), 1))
+            amps = np.repeat(self._amps, 1 << n) / math.sqrt(1 << n)
+            self._keys, self._amps = keys, amps
+        return qp.NamedQureg(name=name, length=n)
+
+    def did_allocate(self, args: 'qp.AllocArgs', qureg: 'qp.Qureg'):
+        pass
+
+    def do_release(self, op: 'qp.ReleaseQuregOperation'):
+        assert isinstance(op.qureg, qp.NamedQureg)
+        offset, n = self._layout[op.qureg.name]
+        m = self._words(range(offset, offset + n))
+
+        if op.x_basis:
+            # Project onto the |+> state.
+            keys, amps = self._merge(self._keys & ~m, self._amps / math.sqrt(1 << n))
+            norm = float(np.sum(np.abs(amps)**2))
+            if self.enforce_release_at_zero and not op.dirty and abs(norm - 1) > self.atol:
+                raise ValueError(f'Failed to uncompute {op.qureg!r} before X basis release. '
+                                 f'Its overlap with |+> had squared norm {norm}.')
+            self._set_state(keys, amps)
+        else:
+            if self.enforce_release_at_zero and not op.dirty:
+                dirty_rows = np.flatnonzero(np.any(self._keys & m, axis=1))
+                if len(dirty_rows):
+                    v = _extract(self._keys[dirty_rows[0]], range(offset, offset + n))
+                    raise ValueError(f'Failed to uncompute {op.qureg!r} before release. '
+                                     f'It had value {v} in some branch.')
+            else:
+                self.do_measure(op.qureg, reset=True)
+
+        del self._layout[op.qureg.name]
+        self._used &= ~(((1 << n) - 1) << offset)
+
+    def do_phase_flip(self, controls: 'qp.QubitIntersection'):
+        if not controls.bit:
+            return
+        hit = self._hit(self._qubit_words(controls.qubits))
+        if hit is None:
+            self._amps = -self._amps
+        else:
+            self._amps[hit] *= -1
+
+    def do_toggle(self, targets: 'qp.Qureg', controls: 'qp.QubitIntersection'):
+        if not controls.bit or not len(targets):
+            return
+        c = self._qubit_words(controls.qubits)
+        t = self._qubit_words(targets)
+        assert not np.any(c & t)
+        hit = self._hit(c)
+        keys = self._keys
+        for i in np.flatnonzero(t):
+            if hit is None:
+                keys[:, i] ^= t[i]
+            else:
+                keys[hit, i] ^= t[i]
+
+    def do_measure(self, qureg: 'qp.Qureg', reset: bool) -> int:
+        positions = self._positions(qureg)
+        m = self._words(positions)
+        masked = self._keys & m
+        _, index, inverse = np.unique(_row_ids(masked), return_index=True, return_inverse=True)
+        outcomes = masked[index]
+        probabilities = np.bincount(inverse, weights=np.abs(self._amps)**2, minlength=len(outcomes))
+        j = int(np.searchsorted(np.cumsum(probabilities), self.rng.random() * probabilities.sum(), side='right'))
+        j = min(j, len(outcomes) - 1)
+
+        keep = inverse == j
+        keys = self._keys[keep]
+        if reset:
+            keys &= ~m
+        self._set_state(keys, self._amps[keep])
+        return _extract(outcomes[j], positions)
+
+    def did_measure(self, qureg: 'qp.Qureg', reset: bool, result: int):
+        pass
+
+    def do_start_measurement_based_uncomputation(self, qureg: 'qp.Qureg') -> 'qp.StartMeasurementBasedUncomputationResult':
+        positions = self._positions(qureg)
+        n = len(positions)
+        m = self._words(positions)
+        rest = self._keys & ~m
+
+        # Remember the state to return to, if the register is a function of the other qubits.
+        ids = _row_ids(rest)
+        order = np.argsort(ids, kind='stable')
+        ids = ids[order]
+        deterministic = not np.any(ids[1:] == ids[:-1])
+        expected = (rest[order], self._amps[order]) if deterministic else None
+
+        if self.phase_fixup_bias is not None:
+            x_result = (1 << n) - 1 if self.phase_fixup_bias else 0
+        else:
+            x_result = self.rng.getrandbits(n)
+
+        # Phase kickback of the X basis measurement.
+        x = self._words(p for i, p in enumerate(positions) if x_result >> i & 1)
+        parity = np.zeros(len(rest), dtype=np.uint64)
+        for i in np.flatnonzero(x):
+            parity ^= _parity64(self._keys[:, i] & x[i])
+        signs = 1 - 2 * parity.astype(np.float64)
+        if deterministic:
+            keys, amps = rest, self._amps * signs
+        else:
+            keys, amps = self._merge(rest, self._amps * signs)
+        if not len(amps):
+            raise ValueError(f'Impossible X basis measurement result {x_result} for {qureg!r}.')
+        self._set_state(keys, amps)
+
+        return qp.StartMeasurementBasedUncomputationResult(measurement=x_result, context=expected)
+
+    def did_start_measurement_based_uncomputation(self, qureg: 'qp.Qureg', result: 'qp.StartMeasurementBasedUncomputationResult'):
+        pass
+
+    def do_end_measurement_based_uncomputation(self, qureg: 'qp.Qureg', start: 'qp.StartMeasurementBasedUncomputationResult'):
+        if start.context is None:
+            return
+        expected_keys, expected_amps = start.context
+        keys, amps = _canonical(self._keys, self._amps)
+        if (keys.shape != expected_keys.shape
+                or not np.array_equal(keys, expected_keys)
+                or not np.allclose(amps, expected_amps, atol=self.atol)):
+            raise AssertionError('Failed to uncompute. Measurement based uncomputation failed to fix phase flips.')
+
+    def supports_measurement_based_uncomputation(self) -> bool:
+        return True
+
+
+def _row_ids(keys: np.ndarray) -> np.ndarray:
+    """One sortable, comparable value per row."""
+    if keys.shape[1] == 1:
+        return keys[:, 0]
+    keys = np.ascontiguousarray(keys)
+    return keys.view(np.dtype((np.void, keys.dtype.itemsize * keys.shape[1]))).reshape(-1)
+
+
+def _canonical(keys: np.ndarray, amps: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    order = np.argsort(_row_ids(keys), kind='stable')
+    return keys[order], amps[order]
+
+
+def _parity64(x: np.ndarray) -> np.ndarray:
+    for s in (32, 16, 8, 4, 2, 1):
+        x = x ^ (x >> np.uint64(s))
+    return x & np.uint64(1)
+
+
+def _extract(row: np.ndarray, positions: Iterable[int]) -> int:
+    v = 0
+    for i, p in enumerate(positions):
+        v |= ((int(row[p // 64]) >> (p % 64)) & 1) << i
+    return v
@@ -0,0 +1,392 @@
+import mmap
+import os
+import struct
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import quantumpseudocode as qp
+from quantumpseudocode import sink
+
+# File layout: the magic header, then chunks. Each chunk is a little endian uint32 giving its payload size, followed
+# by the payload: a sequence of records. A record is a tag byte followed by fields encoded as unsigned LEB128
+# varints. Names and qubits are interned by `_DEF_NAME` and `_DEF_QUBIT` records placed before their first use, and
+# are referred to by index (in order of definition) from then on.
+_MAGIC = b'QPTRACE\x01'
+_CHUNK_HEADER = struct.Struct('<I')
+
+_DEF_NAME = 0
+_DEF_QUBIT = 1
+_ALLOC = 2
+_RELEASE = 3
+_TOGGLE = 4
+_PHASE_FLIP = 5
+_MEASURE = 6
+_START_MBU = 7
+_END_MBU = 8
+
+_QUREG_NAMED = 0
+_QUREG_RANGE = 1
+_QUREG_RAW = 2
+
+
+class TraceWriter(sink.Sink):
+    """Streams observed operations into a compact binary trace file, which can be read back with `qp.TraceReader`.
+
+    Records are buffered in memory and written out in chunks of roughly `chunk_size` bytes. The file is completed
+    when the context exits, even if the program failed, so partial traces remain readable.
+
+    Usage:
+        with qp.Sim():
+            with qp.TraceWriter('shor.qptrace'):
+                ...
+    """
+
+    def __init__(self, destination: Union[str, os.PathLike, BinaryIO], *, chunk_size: int = 1 << 20):
+        super().__init__()
+        self.destination = destination
+        self.chunk_size = chunk_size
+        self._file: Optional[BinaryIO] = None
+        self._owns_file = False
+        self._buf = bytearray()
+        self._names: Dict[str, int] = {}
+        self._qubits: Dict[Tuple[str, Optional[int]], int] = {}
+
+    def __enter__(self):
+        if isinstance(self.destination, (str, os.PathLike)):
+            self._file = open(self.destination, 'wb')
+            self._owns_file = True
+        else:
+            self._file = self.destination
+        self._file.write(_MAGIC)
+        return super().__enter__()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        try:
+            self._write_chunk()
+            if self._owns_file:
+                self._file.close()
+            else:
+                self._file.flush()
+        finally:
+            super().__exit__(exc_type, exc_val, exc_tb)
+
+    def _write_chunk(self):
+        if self._buf:
+            self._file.write(_CHUNK_HEADER.pack(len(self._buf)))
+            self._file.write(self._buf)
+            self._buf = bytearray()
+
+    def _end_record(self):
+        if len(self._buf) >= self.chunk_size:
+            self._write_chunk()
+
+    def _uint(self, v: int):
+        buf = self._buf
+        while v >= 0x80:
+            buf.append((v & 0x7F) | 0x80)
+            v >>= 7
+        buf.append(v)
+
+    def _sint(self, v: int):
+        self._uint(v << 1 if v >= 0 else (-v << 1) - 1)
+
+    def _name(self, name: str) -> int:
+        i = self._names.get(name)
+        if i is None:
+            i = len(self._names)
+            self._names[name] = i
+            data = name.encode('utf8')
+            self._buf.append(_DEF_NAME)
+            self._uint(len(data))
+            self._buf.extend(data)
+        return i
+
+    def _qubit_ids(self, qubits: Sequence['qp.Qubit']) -> List[int]:
+        table = self._qubits
+        result = []
+        for q in qubits:
+            key = q.name, q.index
+            i = table.get(key)
+            if i is None:
+                i = len(table)
+                table[key] = i
+                name_id = self._name(q.name)
+                self._buf.append(_DEF_QUBIT)
+                self._uint(name_id)
+                self._uint(0 if q.index is None else q.index + 1)
+            result.append(i)
+        return result
+
+    def _define(self, qureg: 'qp.Qureg'):
+        """Writes the definitions needed by `_qureg` for the given register, before the record using it starts."""
+        if isinstance(qureg, qp.NamedQureg):
+            self._name(qureg.name)
+        elif isinstance(qureg, qp.RangeQureg):
+            self._define(qureg.sub)
+        else:
+            self._qubit_ids(list(qureg))
+
+    def _qureg(self, qureg: 'qp.Qureg'):
+        if isinstance(qureg, qp.NamedQureg):
+            self._buf.append(_QUREG_NAMED)
+            self._uint(self._names[qureg.name])
+            self._uint(qureg.length)
+        elif isinstance(qureg, qp.RangeQureg):
+            self._buf.append(_QUREG_RANGE)
+            self._qureg(qureg.sub)
+            self._sint(qureg.range.start)
+            self._sint(qureg.range.stop)
+            self._sint(qureg.range.step)
+        else:
+            table = self._qubits
+            qubits = list(qureg)
+            self._buf.append(_QUREG_RAW)
+            self._uint(len(qubits))
+            for q in qubits:
+                self._uint(table[q.name, q.index])
+
+    def _controls(self, controls: 'qp.QubitIntersection') -> List[int]:
+        return self._qubit_ids(controls.qubits)
+
+    def _intersection(self, controls: 'qp.QubitIntersection', ids: List[int]):
+        self._buf.append(1 if controls.bit else 0)
+        self._uint(len(ids))
+        for i in ids:
+            self._uint(i)
+
+    def did_allocate(self, args: 'qp.AllocArgs', qureg: 'qp.Qureg'):
+        name_id = None if args.qureg_name is None else self._name(args.qureg_name)
+        self._define(qureg)
+        self._buf.append(_ALLOC)
+        self._buf.append((1 if args.x_basis else 0) | (2 if name_id is not None else 0))
+        if name_id is not None:
+            self._uint(name_id)
+        self._uint(args.qureg_length)
+        self._qureg(qureg)
+        self._end_record()
+
+    def do_release(self, op: 'qp.ReleaseQuregOperation'):
+        self._define(op.qureg)
+        self._buf.append(_RELEASE)
+        self._buf.append((1 if op.x_basis else 0) | (2 if op.dirty else 0))
+        self._qureg(op.qureg)
+        self._end_record()
+
+    def do_phase_flip(self, controls: 'qp.QubitIntersection'):
+        ids = self._controls(controls)
+        self._buf.append(_PHASE_FLIP)
+        self._intersection(controls, ids)
+        self._end_record()
+
+    def do_toggle(self, targets: 'qp.Qureg', controls: 'qp.QubitIntersection'):
+        self._define(targets)
+        ids = self._controls(controls)
+        self._buf.append(_TOGGLE)
+        self._qureg(targets)
+        self._intersection(controls, ids)
+        self._end_record()
+
+    def do_measure(self, qureg: 'qp.Qureg', reset: bool) -> int:
+        raise NotImplementedError()
+
+    def did_measure(self, qureg: 'qp.Qureg', reset: bool, result: int):
+        self._define(qureg)
+        self._buf.append(_MEASURE)
+        self._buf.append(1 if reset else 0)
+        self._qureg(qureg)
+        self._uint(result)
+        self._end_record()
+
+    def do_start_measurement_based_uncomputation(self, qureg: 'qp.Qureg') -> 'qp.StartMeasurementBasedUncomputationResult':
+        raise NotImplementedError()
+
+    def did_start_measurement_based_uncomputation(self, qureg: 'qp.Qureg', result: 'qp.StartMeasurementBasedUncomputationResult'):
+        self._define(qureg)
+        self._buf.append(_START_MBU)
+        self._qureg(qureg)
+        self._uint(result.measurement)
+        self._end_record()
+
+    def do_end_measurement_based_uncomputation(self, qureg: 'qp.Qureg', start: 'qp.StartMeasurementBasedUncomputationResult'):
+        self._define(qureg)
+        self._buf.append(_END_MBU)
+        self._qureg(qureg)
+        self._end_record()
+
+
+class TraceReader:
+    """Reads a trace file written by `qp.TraceWriter`, by memory-mapping it.
+
+    Iterating yields events in the same `(kind, payload)` format recorded by `qp.capture`. `replay` feeds the events
+    into the observer methods of a sink (e.g. `qp.CountCosts` or `qp.LogCirqCircuit`), so that a trace generated
+    once can be analysed many times. Measurement based uncomputation results are replayed without their sink
+    specific context.
+    """
+
+    def __init__(self, path: Union[str, os.PathLike]):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files can't be mapped.
+            self._map = b''
+        if self._map[:len(_MAGIC)] != _MAGIC:
+            self.close()
+            raise ValueError(f'{path!r} is not a quantumpseudocode trace file.')
+
+    def close(self):
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self) -> 'TraceReader':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def chunks(self) -> Iterator[memoryview]:
+        """The payloads of the chunks in the file, in order."""
+        data = memoryview(self._map)
+        pos = len(_MAGIC)
+        end = len(data)
+        try:
+            while pos < end:
+                if pos + _CHUNK_HEADER.size > end:
+                    raise ValueError('Truncated trace chunk header.')
+                n, = _CHUNK_HEADER.unpack_from(data, pos)
+                pos += _CHUNK_HEADER.size
+                if pos + n > end:
+                    raise ValueError('Truncated trace chunk.')
+                yield data[pos:pos + n]
+                pos += n
+        finally:
+            data.release()
+
+    def __iter__(self) -> Iterator[Tuple[str, Any]]:
+        names: List[str] = []
+        qubits: List['qp.Qubit'] = []
+        mbu_stack: List['qp.StartMeasurementBasedUncomputationResult'] = []
+
+        for chunk in self.chunks():
+            data = bytes(chunk)
+            chunk.release()
+            pos = 0
+
+            def uint() -> int:
+                nonlocal pos
+                result = 0
+                shift = 0
+                while True:
+                    b = data[pos]
+                    pos += 1
+                    result |= (b & 0x7F) << shift
+                    if b < 0x80:
+                        return result
+                    shift += 7
+
+            def sint() -> int:
+                v = uint()
+                return v >> 1 if not v & 1 else -((v + 1) >> 1)
+
+            def qureg() -> 'qp.Qureg':
+                nonlocal pos
+                kind = data[pos]
+                pos += 1
+                if kind == _QUREG_NAMED:
+                    name = names[uint()]
+                    return qp.NamedQureg(name, uint())
+                if kind == _QUREG_RANGE:
+                    sub = qureg()
+                    start = sint()
+                    stop = sint()
+                    return qp.RangeQureg(sub, range(start, stop, sint()))
+                if kind == _QUREG_RAW:
+                    return qp.RawQureg([qubits[uint()] for _ in range(uint())])
+                raise ValueError(f'Unknown qureg kind {kind} in trace.')
+
+            def intersection() -> 'qp.QubitIntersection':
+                nonlocal pos
+                bit = bool(data[pos])
+                pos += 1
+                return qp.QubitIntersection(tuple(qubits[uint()] for _ in range(uint())), bit)
+
+            while pos < len(data):
+                tag = data[pos]
+                pos += 1
+                if tag == _DEF_NAME:
+                    n = uint()
+                    names.append(data[pos:pos + n].decode('utf8'))
+                    pos += n
+                elif tag == _DEF_QUBIT:
+                    name = names[uint()]
+                    index = uint()
+                    qubits.append(qp.Qubit(name, None if index == 0 else index - 1))
+                elif tag == _TOGGLE:
+                    targets = qureg()
+                    yield 'toggle', (targets, intersection())
+                elif tag == _PHASE_FLIP:
+                    yield 'phase_flip', intersection()
+                elif tag == _ALLOC:
+                    flags = data[pos]
+                    pos += 1
+                    name = names[uint()] if flags & 2 else None
+                    args = qp.AllocArgs(qureg_length=uint(), qureg_name=name, x_basis=bool(flags & 1))
+                    yield 'alloc', (args, qureg())
+                elif tag == _RELEASE:
+                    flags = data[pos]
+                    pos += 1
+                    yield 'release', qp.ReleaseQuregOperation(qureg(), x_basis=bool(flags & 1), dirty=bool(flags & 2))
+                elif tag == _MEASURE:
+                    reset = bool(data[pos])
+                    pos += 1
+                    q = qureg()
+                    yield 'measure', (q, reset, uint())
+                elif tag == _START_MBU:
+                    q = qureg()
+                    start = qp.StartMeasurementBasedUncomputationResult(measurement=uint(), context=None)
+                    mbu_stack.append(start)
+                    yield 'start_measurement_based_uncomputation', (q, start)
+                elif tag == _END_MBU:
+                    yield 'end_measurement_based_uncomputation', (qureg(), mbu_stack.pop())
+                else:
+                    raise ValueError(f'Unknown record tag {tag} in trace.')
+
+    def replay(self, sink: 'qp.Sink'):
+        """Feeds the traced events into the observer methods of the given sink.
+
+        Runs of consecutive toggles (or phase flips) are forwarded as batches.
+        """
+        toggles = []
+        flips = []
+        for kind, payload in self:
+            if kind == 'toggle':
+                if flips:
+                    sink.do_phase_flip_batch(flips)
+                    flips = []
+                toggles.append(payload)
+                continue
+            if toggles:
+                sink.do_toggle_batch(toggles)
+                toggles = []
+            if kind == 'phase_flip':
+                flips.append(payload)
+                continue
+            if flips:
+                sink.do_phase_flip_batch(flips)
+                flips = []
+
+            if kind == 'alloc':
+                sink.did_allocate(*payload)
+            elif kind == 'release':
+                sink.do_release(payload)
+            elif kind == 'measure':
+                sink.did_measure(*payload)
+            elif kind == 'start_measurement_based_uncomputation':
+                sink.did_start_measurement_based_uncomputation(*payload)
+            elif kind == 'end_measurement_based_uncomputation':
+                sink.do_end_measurement_based_uncomputation(*payload)
+        if toggles:
+            sink.do_toggle_batch(toggles)
+        if flips:
+            sink.do_phase_flip_batch(flips)
@@ -0,0 +1,72 @@
+import pytest
+
+import quantumpseudocode as qp
+
+
+def _program():
+    a = qp.qalloc(len=5, name='a')
+    b = qp.qalloc(len=5, name='b')
+    a.init(11)
+    b += a
+    b[1] ^= a[0] & a[3]
+    b[1:4] ^= 5
+    qp.phase_flip(a[0] & b[4])
+    with qp.hold(a[1] & a[3], name='t') as t:
+        b[2] ^= t
+    result = qp.measure(b, reset=True)
+    qp.qfree(b)
+    a.clear(11)
+    qp.qfree(a)
+    return result
+
+
+def _normalize(events):
+    result = []
+    for kind, payload in events:
+        if kind == 'alloc':
+            args, qureg = payload
+            payload = (args.qureg_name, args.qureg_length, args.x_basis, qureg)
+        elif kind == 'start_measurement_based_uncomputation':
+            qureg, start = payload
+            payload = (qureg, start.measurement)
+        elif kind == 'end_measurement_based_uncomputation':
+            qureg, start = payload
+            payload = (qureg, start.measurement)
+        result.append((kind, payload))
+    return result
+
+
+@pytest.mark.parametrize('chunk_size', [1, 64, 1 << 20])
+def test_round_trip(tmp_path, chunk_size):
+    path = tmp_path / 'trace.qptrace'
+    with qp.Sim(phase_fixup_bias=True):
+        with qp.capture() as expected:
+            with qp.TraceWriter(path, chunk_size=chunk_size):
+                assert _program() == 7
+
+    with qp.TraceReader(path) as reader:
+        actual = list(reader)
+        assert len(list(reader.chunks())) >= 1
+    assert _normalize(actual) == _normalize(expected)
+    assert any(kind == 'start_measurement_based_uncomputation' for kind, _ in actual)
+
+
+def test_replay(tmp_path):
+    path = tmp_path / 'trace.qptrace'
+
+    def program():
+        with qp.TraceWriter(path):
+            _program()
+
+    expected = qp.count_costs(program)
+    counter = qp.CountCosts()
+    with qp.TraceReader(path) as reader:
+        reader.replay(counter)
+    assert counter.cost == expected
+
+
+def test_not_a_trace(tmp_path):
+    path = tmp_path / 'junk'
+    path.write_bytes(b'junk')
+    with pytest.raises(ValueError, match='not a quantumpseudocode trace'):
+        qp.TraceReader(path)